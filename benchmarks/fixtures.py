@@ -0,0 +1,66 @@
+"""
+Deterministic synthetic market data for the benchmark suite. Universes are
+built from SyntheticProvider bars ending on a fixed date, so every run and
+every machine times exactly the same inputs, without network.
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from strategies.data_provider import FIELDS, DataProvider, SyntheticProvider
+
+END = pd.Timestamp('2024-12-31')  # Last date of every fixture, so results do not drift with today
+TRADING_DAYS = 252
+
+
+def symbols(n_tickers: int) -> List[str]:
+    return [f"SYN{i:04d}" for i in range(n_tickers)]
+
+
+@lru_cache(maxsize=1)
+def synthetic_universe(n_tickers: int, years: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Panel of n_tickers tickers with years of daily bars up to END. Built
+    column by column straight into arrays: every synthetic ticker trades on
+    the same calendar, and concatenating thousands of frames would take
+    longer than the benchmarks. Only the last universe is kept, so callers
+    should loop over fixtures outermost.
+    """
+    provider = SyntheticProvider(seed=seed)
+    dates = provider.calendar(END + pd.Timedelta(days=1))
+    dates = dates[dates > END - pd.DateOffset(years=years)]
+    names = symbols(n_tickers)
+    values = np.empty((len(dates), len(FIELDS), n_tickers))
+    for i, symbol in enumerate(names):
+        data = provider.generate(symbol, END + pd.Timedelta(days=1))
+        values[:, :, i] = data.to_numpy()[-len(dates):]
+    columns = pd.MultiIndex.from_product([FIELDS, names], names=['field', 'symbol'])
+    panel = pd.DataFrame(values.reshape(len(dates), -1), index=dates, columns=columns)
+    panel.index.name = 'Date'
+    return panel
+
+
+def synthetic_frame(years: int, symbol: str = 'SYN0000', lower: bool = False, seed: int = 42) -> pd.DataFrame:
+    """One ticker's years of OHLCV bars, with lower-case columns for the strategies if lower"""
+    data = SyntheticProvider(seed=seed).generate(symbol, END + pd.Timedelta(days=1))
+    data = data[data.index > END - pd.DateOffset(years=years)]
+    if lower:
+        data.columns = [column.lower() for column in data.columns]
+    return data
+
+
+class PanelProvider(DataProvider):
+    """
+    Serves batches out of a prebuilt panel whatever the dates asked, so
+    end-to-end scans time the scanner rather than data generation
+    """
+
+    def __init__(self, panel: pd.DataFrame):
+        self.panel = panel
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> pd.DataFrame:
+        columns = pd.MultiIndex.from_product([FIELDS, symbols], names=['field', 'symbol'])
+        return self.panel.reindex(columns=columns)
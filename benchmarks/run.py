@@ -0,0 +1,244 @@
+"""
+Benchmark suite runner: times and memory-profiles every hot path on
+synthetic universes, stores the results and gates regressions.
+
+    python -m benchmarks.run                          # quick preset, saved under data/benchmarks
+    python -m benchmarks.run --save-baseline          # ... and make this run the baseline
+    python -m benchmarks.run --compare                # fail if slower than the baseline
+    python -m benchmarks.run --preset full -k scan    # 10 to 5,000 tickers, 1 to 20 years
+    python -m benchmarks.run --tickers 500 --years 5 --compare --threshold 0.1
+
+Times are the best of up to --repeat runs (fewer for cases slower than
+--max-time), which is the most stable statistic on a busy machine; the
+median is stored too. Peak memory is measured with tracemalloc in a
+separate run, so its overhead does not skew the timings.
+"""
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .suite import BENCHMARKS, Benchmark
+
+RESULTS_DIR = os.path.join('data', 'benchmarks')
+PRESETS = {
+    'quick': {'tickers': [10, 100], 'years': [1, 5]},
+    'full': {'tickers': [10, 500, 5000], 'years': [1, 5, 20]},
+}
+THRESHOLD = 0.2  # Relative slowdown (or memory growth) counted as a regression
+MIN_DELTA = 0.002  # Seconds; smaller slowdowns are timer noise whatever their ratio
+
+
+def case_id(bench: Benchmark, n_tickers: int, years: int) -> str:
+    return f"{bench.name}[{n_tickers}x{years}y]" if bench.universe else f"{bench.name}[{years}y]"
+
+
+def cases(benchmarks: List[Benchmark], tickers: List[int],
+          years: List[int]) -> Iterator[Tuple[str, Benchmark, int, int]]:
+    """Every (case id, benchmark, tickers, years) to run, grouped by fixture so each universe is built once"""
+    seen = set()
+    for n_years in years:
+        for n_tickers in tickers:
+            for bench in benchmarks:
+                key = case_id(bench, n_tickers, n_years)
+                if key not in seen:
+                    seen.add(key)
+                    yield key, bench, n_tickers, n_years
+
+
+def measure(func, repeat: int, max_time: float, memory: bool) -> Dict:
+    """Best and median wall time of func over up to repeat runs, and its peak traced memory"""
+    timings = []
+    while len(timings) < repeat:
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+        if sum(timings) > max_time:
+            break
+
+    result = {'runs': len(timings), 'min': min(timings), 'median': float(np.median(timings))}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_suite(benchmarks: List[Benchmark], tickers: List[int], years: List[int], repeat: int = 5,
+              max_time: float = 10.0, memory: bool = True, echo=print) -> Dict[str, Dict]:
+    results = {}
+    for key, bench, n_tickers, n_years in cases(benchmarks, tickers, years):
+        func = bench.setup(n_tickers, n_years)
+        func()  # Warm-up: lazy imports, caches, JIT compilation
+        result = measure(func, repeat, max_time, memory)
+        result.update(benchmark=bench.name, tickers=n_tickers if bench.universe else 1, years=n_years)
+        results[key] = result
+        echo(format_result(key, result))
+    return results
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def save(report: Dict, path: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict[str, Dict], current: Dict[str, Dict], threshold: float = THRESHOLD,
+            memory_threshold: float = THRESHOLD, min_delta: float = MIN_DELTA) -> List[Dict]:
+    """
+    Cases of current measured in the baseline too, with their time and
+    memory ratios and whether either regressed beyond its threshold
+    """
+    rows = []
+    for key, result in current.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        row = {'case': key, 'time_ratio': result['min'] / base['min'], 'regressions': []}
+        if row['time_ratio'] > 1 + threshold and result['min'] - base['min'] > min_delta:
+            row['regressions'].append('time')
+        if result.get('peak_memory') and base.get('peak_memory'):
+            row['memory_ratio'] = result['peak_memory'] / base['peak_memory']
+            if row['memory_ratio'] > 1 + memory_threshold:
+                row['regressions'].append('memory')
+        rows.append(row)
+    return rows
+
+
+def format_result(key: str, result: Dict) -> str:
+    memory = f"{result['peak_memory'] / 2 ** 20:9.1f} MiB" if 'peak_memory' in result else ''
+    return f"{key:<60} {result['min'] * 1000:10.2f} ms  (median {result['median'] * 1000:.2f}, " \
+           f"{result['runs']} runs) {memory}"
+
+
+def format_comparison(row: Dict) -> str:
+    memory = f"  memory x{row['memory_ratio']:.2f}" if 'memory_ratio' in row else ''
+    flag = f"  REGRESSION ({', '.join(row['regressions'])})" if row['regressions'] else ''
+    return f"{row['case']:<60} time x{row['time_ratio']:.2f}{memory}{flag}"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the trading bot's hot paths on synthetic data")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick',
+                        help="fixture sizes: 'quick' (10-100 tickers, 1-5 years) or 'full' (10-5,000, 1-20)")
+    parser.add_argument('--tickers', type=int, nargs='+', help="universe sizes, instead of the preset's")
+    parser.add_argument('--years', type=int, nargs='+', help="history lengths, instead of the preset's")
+    parser.add_argument('-k', dest='patterns', action='append',
+                        help="only run benchmarks whose name matches this glob or substring (repeatable)")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per case")
+    parser.add_argument('--max-time', type=float, default=10.0, help="stop repeating a case after this many seconds")
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help="skip the tracemalloc run")
+    parser.add_argument('--output', default=RESULTS_DIR, help="directory the results are saved in")
+    parser.add_argument('--baseline', help="baseline results file (default: <output>/baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="make this run the new baseline")
+    parser.add_argument('--compare', action='store_true', help="compare with the baseline, exit 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="relative slowdown counted as a regression (0.2 = 20%%)")
+    parser.add_argument('--memory-threshold', type=float, default=THRESHOLD,
+                        help="relative peak memory growth counted as a regression")
+    parser.add_argument('--list', action='store_true', help="list the benchmarks and exit")
+    return parser
+
+
+def select(patterns: List[str]) -> List[Benchmark]:
+    if not patterns:
+        return list(BENCHMARKS.values())
+    return [bench for name, bench in BENCHMARKS.items()
+            if any(fnmatch.fnmatch(name, pattern) or pattern in name for pattern in patterns)]
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # Synthetic tickers whose every simulated path ends up (empty downside slices) are expected
+    warnings.simplefilter('ignore', RuntimeWarning)
+    benchmarks = select(args.patterns)
+    if args.list:
+        for bench in benchmarks:
+            print(f"{bench.name:<50} {bench.description}")
+        return 0
+    if not benchmarks:
+        print("No benchmark matches")
+        return 2
+
+    tickers = args.tickers or PRESETS[args.preset]['tickers']
+    years = args.years or PRESETS[args.preset]['years']
+    baseline_path = args.baseline or os.path.join(args.output, 'baseline.json')
+
+    results = run_suite(benchmarks, tickers, years, args.repeat, args.max_time, args.memory)
+    report = {'environment': environment(), 'results': results}
+    path = os.path.join(args.output, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    save(report, path)
+    save(report, os.path.join(args.output, 'latest.json'))
+    print(f"Results saved to {path}")
+
+    status = 0
+    if args.compare:
+        if not os.path.exists(baseline_path):
+            print(f"No baseline at {baseline_path}; run with --save-baseline first")
+            status = 2
+        else:
+            rows = compare(load(baseline_path)['results'], results, args.threshold, args.memory_threshold)
+            print(f"\nAgainst {baseline_path} ({len(rows)} cases in common):")
+            for row in rows:
+                print(format_comparison(row))
+            regressions = [row for row in rows if row['regressions']]
+            if regressions:
+                print(f"FAIL: {len(regressions)} regression(s) beyond the threshold")
+                status = 1
+            else:
+                print("OK")
+    if args.save_baseline:
+        if os.path.exists(baseline_path):
+            # Keep the cases of the old baseline this run did not measure
+            merged = load(baseline_path)
+            merged['results'].update(results)
+            merged['environment'] = report['environment']
+            report = merged
+        save(report, baseline_path)
+        print(f"Baseline saved to {baseline_path}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Local stand-in for the Yahoo Finance chart API, serving SyntheticProvider
+bars, for testing and benchmarking market-data clients without network.
+
+    python -m benchmarks.stub_server --port 8765 --latency 0.05 --rate-limit 50
+
+then point a client at http://127.0.0.1:8765/v8/finance/chart. The server
+can add latency, answer 429 (with Retry-After) above a request rate, fail a
+share of requests with 500s, and 404 chosen tickers. It counts requests,
+responses per status and TCP connections, so pooling can be checked.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from strategies.data_provider import SyntheticProvider
+
+CHART_PATH = '/v8/finance/chart/'
+MARKET_OPEN = pd.Timedelta(hours=14, minutes=30)  # Bar timestamps are the UTC session open
+GMT_OFFSET = -5 * 3600
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so clients can reuse connections
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.startswith(CHART_PATH):
+            return self.reply(404, {'chart': {'result': None, 'error': {'code': 'Not Found'}}})
+        symbol = unquote(url.path[len(CHART_PATH):])
+        self.server.count('requests')
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if not self.server.admit():
+            return self.reply(429, {'error': 'Too Many Requests'}, {'Retry-After': str(self.server.retry_after)})
+        if self.server.error_rate and self.server.random.random() < self.server.error_rate:
+            return self.reply(500, {'error': 'Internal Server Error'})
+        if symbol in self.server.missing:
+            return self.reply(404, {'chart': {'result': None,
+                                              'error': {'code': 'Not Found', 'description': 'No data found'}}})
+
+        query = parse_qs(url.query)
+        start = pd.Timestamp(int(query['period1'][0]), unit='s')
+        end = pd.Timestamp(int(query['period2'][0]), unit='s')
+        self.reply(200, self.server.chart(symbol, start, end))
+
+    def reply(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.count(f'status_{status}')
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Chart API stand-in running in a background thread. Use as a context
+    manager; url is the base URL to give a MarketDataClient.
+    """
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, rate_limit: float = None, error_rate: float = 0.0,
+                 missing: Iterable[str] = (), retry_after: int = 1, seed: int = 0,
+                 provider: SyntheticProvider = None):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit  # Requests per second answered before 429s
+        self.error_rate = error_rate
+        self.missing = set(missing)
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.provider = provider or SyntheticProvider()
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._window = (0, 0)  # (second, requests admitted in it)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{CHART_PATH.rstrip('/')}"
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def admit(self) -> bool:
+        """Whether a request fits in the rate limit of the current second"""
+        if self.rate_limit is None:
+            return True
+        with self._lock:
+            second = int(time.monotonic())
+            start, admitted = self._window
+            if second != start:
+                start, admitted = second, 0
+            self._window = (start, admitted + 1)
+            return admitted < self.rate_limit
+
+    def chart(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> dict:
+        """Chart API response for a ticker's synthetic bars in [start, end)"""
+        data = self.provider.generate(symbol, end)
+        data = data[(data.index >= start.normalize()) & (data.index < end)]
+        timestamps = ((data.index + MARKET_OPEN - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).tolist()
+        quote = {field.lower(): np.round(data[field].to_numpy(), 4).tolist() for field in data.columns}
+        return {'chart': {'result': [{
+            'meta': {'symbol': symbol, 'gmtoffset': GMT_OFFSET},
+            'timestamp': timestamps,
+            'indicators': {'quote': [quote], 'adjclose': [{'adjclose': quote['close']}]}
+        }], 'error': None}}
+
+    def handle_error(self, request, client_address):
+        pass  # Clients dropping pooled connections is normal
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self.serve_forever, name='stub-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> 'StubServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Yahoo Finance chart API stand-in serving synthetic bars")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument('--rate-limit', type=float, help="requests per second before answering 429")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests failing with 500")
+    parser.add_argument('--missing', nargs='*', default=[], help="tickers answered with 404")
+    args = parser.parse_args()
+
+    server = StubServer(args.port, args.latency, args.rate_limit, args.error_rate, args.missing)
+    print(f"Serving synthetic bars at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(dict(server.counters))
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+The benchmarked hot paths. Each benchmark is a setup function registered
+with @benchmark: given a fixture size it prepares its inputs, untimed, and
+returns the zero-argument callable that is timed and memory-profiled.
+Benchmarks over a whole universe run for every (tickers, years) size,
+single-ticker ones once per years.
+"""
+from typing import Callable, Dict, NamedTuple
+
+import numpy as np
+
+from reinforcement_learning.environment import VectorTradingEnv
+from strategies.indicators import IndicatorEngine
+from strategies.mean_reversion import MeanReversion
+from strategies.monte_carlo import MonteCarloSimulator
+from strategies.scan_metrics import ScanMetrics
+from strategies.moving_average_crossover import MovingAverageCrossover
+from strategies.stock_scanner import StockScanner
+from strategies.trend_following import TrendFollowing
+
+from .fixtures import PanelProvider, synthetic_frame, synthetic_universe, symbols
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Callable[[int, int], Callable[[], object]]
+    universe: bool  # Sized by tickers and years, not by years alone
+    description: str
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, universe: bool = True):
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, universe, (setup.__doc__ or '').strip())
+        return setup
+    return register
+
+
+@benchmark('indicators.pandas')
+def indicators_pandas(n_tickers: int, years: int):
+    """StockScanner.calculate_technical_indicators, one pandas frame per ticker"""
+    panel = synthetic_universe(n_tickers, years)
+    scanner = StockScanner(provider=PanelProvider(panel))
+    frames = [panel.xs(symbol, axis=1, level='symbol') for symbol in symbols(n_tickers)]
+    return lambda: [scanner.calculate_technical_indicators(data) for data in frames]
+
+
+@benchmark('indicators.engine')
+def indicators_engine(n_tickers: int, years: int):
+    """IndicatorEngine compute and summarize on the whole panel"""
+    panel = synthetic_universe(n_tickers, years)
+    engine = IndicatorEngine()
+    close = panel['Close'].to_numpy(dtype=np.float64)
+    volume = panel['Volume'].to_numpy(dtype=np.float64)
+    return lambda: engine.summarize(engine.compute(close, volume))
+
+
+@benchmark('monte_carlo.simulate_prices', universe=False)
+def monte_carlo_simulate_prices(n_tickers: int, years: int):
+    """MonteCarloSimulator.simulate_prices: 1,000 one-year paths from a ticker's history"""
+    data = synthetic_frame(years)
+    simulator = MonteCarloSimulator(seed=0)
+    return lambda: simulator.simulate_prices(data)
+
+
+@benchmark('monte_carlo.simulate_summary', universe=False)
+def monte_carlo_simulate_summary(n_tickers: int, years: int):
+    """MonteCarloSimulator.simulate_prices in summary-only mode"""
+    data = synthetic_frame(years)
+    simulator = MonteCarloSimulator(seed=0, summary_only=True)
+    return lambda: simulator.simulate_prices(data)
+
+
+@benchmark('monte_carlo.simulate_many')
+def monte_carlo_simulate_many(n_tickers: int, years: int):
+    """MonteCarloSimulator.simulate_many over every ticker's closes, as in a scan"""
+    panel = synthetic_universe(n_tickers, years)
+    closes = list(panel['Close'].to_numpy(dtype=np.float64).T)
+    simulator = MonteCarloSimulator(seed=0)
+    return lambda: sum(1 for _ in simulator.simulate_many(closes))
+
+
+def _executed(strategy):
+    strategy.execute()
+    return strategy
+
+
+@benchmark('strategies.moving_average.risk_management', universe=False)
+def moving_average_risk_management(n_tickers: int, years: int):
+    """MovingAverageCrossover.apply_risk_management on its own signals"""
+    return _executed(MovingAverageCrossover(synthetic_frame(years, lower=True))).apply_risk_management
+
+
+@benchmark('strategies.mean_reversion.risk_management', universe=False)
+def mean_reversion_risk_management(n_tickers: int, years: int):
+    """MeanReversion.apply_risk_management on z-score signals (no model is trained)"""
+    strategy = MeanReversion(synthetic_frame(years, lower=True))
+    zscore = (strategy.data['close'] - strategy.features.rolling_mean('close', strategy.mean_window)) / \
+        strategy.features.rolling_std('close', strategy.mean_window)
+    strategy.data['signal'] = -np.sign(zscore.where(zscore.abs() > strategy.entry_std, 0)).fillna(0)
+    return strategy.apply_risk_management
+
+
+@benchmark('strategies.trend_following.risk_management', universe=False)
+def trend_following_risk_management(n_tickers: int, years: int):
+    """TrendFollowing.apply_position_sizing (ATR stops and sizing) on its own signals"""
+    return _executed(TrendFollowing(synthetic_frame(years, lower=True))).apply_position_sizing
+
+
+def _scanner(n_tickers: int, years: int, **kwargs) -> StockScanner:
+    panel = synthetic_universe(n_tickers, years)
+    return StockScanner(provider=PanelProvider(panel), lookback_days=int(years * 365.25),
+                        monte_carlo=MonteCarloSimulator(seed=0), **kwargs)
+
+
+@benchmark('scan.scan_stocks')
+def scan_stocks(n_tickers: int, years: int):
+    """End-to-end StockScanner.scan_stocks, simulating every ticker"""
+    scanner = _scanner(n_tickers, years)
+    tickers = symbols(n_tickers)
+    return lambda: scanner.scan_stocks(tickers)
+
+
+@benchmark('scan.scan_stocks_cascade')
+def scan_stocks_cascade(n_tickers: int, years: int):
+    """End-to-end cascade scan simulating the 50 best screened tickers"""
+    scanner = _scanner(n_tickers, years, mc_budget=50)
+    tickers = symbols(n_tickers)
+    return lambda: scanner.scan_stocks(tickers)
+
+
+@benchmark('scan.scan_stocks_instrumented')
+def scan_stocks_instrumented(n_tickers: int, years: int):
+    """scan.scan_stocks with ScanMetrics enabled, to keep instrumentation overhead in check"""
+    scanner = _scanner(n_tickers, years, metrics=ScanMetrics())
+    tickers = symbols(n_tickers)
+    return lambda: scanner.scan_stocks(tickers)
+
+
+@benchmark('rl.vector_env.step')
+def vector_env_step(n_tickers: int, years: int):
+    """100 batched steps of 4,096 VectorTradingEnv episodes (409,600 environment steps)"""
+    env = VectorTradingEnv.from_panel(synthetic_universe(n_tickers, years), n_envs=4096, episode_length=126,
+                                      seed=0)
+    actions = np.random.default_rng(0).integers(0, env.n_actions, (100, env.n_envs))
+    env.reset()
+
+    def run():
+        for batch in actions:
+            env.step(batch)
+    return run
@@ -1,8 +1,14 @@
+import time
+from datetime import timedelta
 import streamlit as st
-import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
 from strategies.stock_scanner import StockScanner
+from strategies.scan_cache import ScanCache
+from strategies.scan_service import ScanService
+from strategies.chart_data import merged_lines
+
+SCAN_INTERVAL = timedelta(minutes=30)  # Background rescans, shared by every session
+POLL_SECONDS = 2  # How often a page re-reads the scan progress while a scan runs
 
 # Custom CSS for styling
 def local_css():
@@ -56,56 +62,68 @@ def local_css():
         </style>
     """, unsafe_allow_html=True)
 
-def create_monte_carlo_plot(symbol: str, price_paths: np.ndarray, current_price: float):
-    """Create Monte Carlo simulation plot using Plotly"""
+def create_monte_carlo_plot(symbol: str, chart: dict):
+    """Create Monte Carlo simulation plot using Plotly, from an opportunity's chart payload"""
     fig = go.Figure()
     
-    # Plot a subset of paths
-    num_paths_to_plot = 100
-    step = len(price_paths[0]) // num_paths_to_plot
-    
-    # Add simulation paths
-    for path in price_paths.T[::step]:
-        fig.add_trace(go.Scatter(
-            y=path,
+    # Sample paths as one WebGL trace, lines separated by gaps
+    if chart['paths']:
+        xs, ys = merged_lines(chart['paths'])
+        fig.add_trace(go.Scattergl(
+            x=xs,
+            y=ys,
             mode='lines',
-            opacity=0.1,
+            opacity=0.3,
             line=dict(color='blue', width=0.5),
-            showlegend=False
+            name='Sample Paths',
+            connectgaps=False
         ))
     
-    # Add mean path
-    mean_path = price_paths.mean(axis=1)
-    fig.add_trace(go.Scatter(
-        y=mean_path,
-        mode='lines',
-        line=dict(color='red', width=2),
-        name='Mean Path'
-    ))
-    
-    # Add confidence intervals
-    percentile_5 = np.percentile(price_paths, 5, axis=1)
-    percentile_95 = np.percentile(price_paths, 95, axis=1)
-    
-    fig.add_trace(go.Scatter(
-        y=percentile_95,
-        mode='lines',
-        line=dict(width=0),
-        showlegend=False
-    ))
+    # Quantile bands, outermost first
+    days = chart['days']
+    quantiles = list(chart['quantiles'])
+    bands = chart['bands']
+    shades = ['rgba(128, 128, 128, 0.2)', 'rgba(128, 128, 128, 0.35)']
+    for k in range(len(quantiles) // 2):
+        low, high = quantiles[k], quantiles[-1 - k]
+        fig.add_trace(go.Scattergl(
+            x=days,
+            y=bands[-1 - k],
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False
+        ))
+        fig.add_trace(go.Scattergl(
+            x=days,
+            y=bands[k],
+            mode='lines',
+            fill='tonexty',
+            line=dict(width=0),
+            name=f'{high - low:g}% Confidence Interval',
+            fillcolor=shades[min(k, len(shades) - 1)]
+        ))
     
-    fig.add_trace(go.Scatter(
-        y=percentile_5,
-        mode='lines',
-        fill='tonexty',
-        line=dict(width=0),
-        name='90% Confidence Interval',
-        fillcolor='rgba(128, 128, 128, 0.2)'
-    ))
+    # Median and mean paths
+    if len(quantiles) % 2:
+        fig.add_trace(go.Scattergl(
+            x=days,
+            y=bands[len(quantiles) // 2],
+            mode='lines',
+            line=dict(color='gray', width=1, dash='dot'),
+            name='Median Path'
+        ))
+    if chart['mean'] is not None:
+        fig.add_trace(go.Scattergl(
+            x=days,
+            y=chart['mean'],
+            mode='lines',
+            line=dict(color='red', width=2),
+            name='Mean Path'
+        ))
     
     # Add current price line
     fig.add_hline(
-        y=current_price,
+        y=chart['current_price'],
         line_dash="dash",
         line_color="green",
         name="Current Price"
@@ -159,74 +177,120 @@ def create_metrics_gauge(value: float, title: str, min_val: float, max_val: floa
     )
     return fig
 
+@st.cache_resource
+def get_scan_service() -> ScanService:
+    """One scanner and background scan thread per server, shared by every session"""
+    return ScanService(StockScanner(scan_cache=ScanCache()), interval=SCAN_INTERVAL).start()
+
+@st.cache_data(max_entries=50)
+def get_monte_carlo_plot(symbol: str, version: int, _chart: dict):
+    """
+    Monte Carlo chart of an opportunity, built once per completed scan.
+    _chart must come from the snapshot of that version; the leading
+    underscore keeps it out of the cache key.
+    """
+    return create_monte_carlo_plot(symbol, _chart)
+
+def render_opportunity(opp: dict, version: int = None):
+    """Cards, Monte Carlo chart and gauges of one opportunity"""
+    metrics = opp['metrics']
+    symbol = opp['symbol']
+    
+    st.markdown(f'<div class="big-font">{symbol}</div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="stock-score">Overall Score: {opp["score"]:.2f}</div>', unsafe_allow_html=True)
+    
+    # Create two columns
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        if 'chart' in opp:
+            # Final results are shared; partial results are drawn directly
+            if version is not None:
+                mc_fig = get_monte_carlo_plot(symbol, version, opp['chart'])
+            else:
+                mc_fig = create_monte_carlo_plot(symbol, opp['chart'])
+            if mc_fig is not None:
+                st.plotly_chart(mc_fig, use_container_width=True)
+    
+    with col2:
+        # Key metrics in cards
+        st.markdown(f'<div class="metric-label">Current Price</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value">${metrics["current_price"]:.2f}</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+        
+        st.markdown(f'<div class="metric-label">Monthly Return</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value">{metrics["monthly_return"]:.1f}%</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Gauge charts
+        sharpe_gauge = create_metrics_gauge(metrics['sharpe_ratio'], "Sharpe Ratio", 0, 3)
+        st.plotly_chart(sharpe_gauge, use_container_width=True)
+        
+        momentum_gauge = create_metrics_gauge(metrics['momentum'], "Momentum (RSI)", 0, 100)
+        st.plotly_chart(momentum_gauge, use_container_width=True)
+    
+    # Additional metrics in columns with cards
+    mc1, mc2, mc3 = st.columns(3)
+    with mc1:
+        st.markdown('<div class="metric-label">Expected Return (1Y)</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value">{metrics["expected_return"]*100:.1f}%</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with mc2:
+        st.markdown('<div class="metric-label">Probability of Positive Return</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value">{metrics["prob_positive"]*100:.1f}%</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    with mc3:
+        st.markdown('<div class="metric-label">95% VaR</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-value">{metrics["var_95"]*100:.1f}%</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown('---')
+
 def main():
     st.set_page_config(layout="wide", page_title="Trading Dashboard")
     local_css()
     
     st.markdown('<div class="dashboard-title">Algorithmic Trading Dashboard</div>', unsafe_allow_html=True)
     
-    # Initialize scanner
-    scanner = StockScanner()
+    # Scans run in the background; every session only reads the latest results
+    service = get_scan_service()
     
     col1, col2, col3 = st.columns([1,2,1])
     with col2:
         if st.button('Scan Market for Opportunities'):
-            with st.spinner('Analyzing S&P 500 stocks...'):
-                opportunities = scanner.scan_stocks()
-            
-            if opportunities:
-                for opp in opportunities:
-                    metrics = opp['metrics']
-                    symbol = opp['symbol']
-                    
-                    st.markdown(f'<div class="big-font">{symbol}</div>', unsafe_allow_html=True)
-                    st.markdown(f'<div class="stock-score">Overall Score: {opp["score"]:.2f}</div>', unsafe_allow_html=True)
-                    
-                    # Create two columns
-                    col1, col2 = st.columns([2, 1])
-                    
-                    with col1:
-                        if 'price_paths' in opp:
-                            mc_fig = create_monte_carlo_plot(symbol, opp['price_paths'], metrics['current_price'])
-                            st.plotly_chart(mc_fig, use_container_width=True)
-                    
-                    with col2:
-                        # Key metrics in cards
-                        st.markdown(f'<div class="metric-label">Current Price</div>', unsafe_allow_html=True)
-                        st.markdown(f'<div class="metric-value">${metrics["current_price"]:.2f}</div>', unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        st.markdown(f'<div class="metric-label">Monthly Return</div>', unsafe_allow_html=True)
-                        st.markdown(f'<div class="metric-value">{metrics["monthly_return"]:.1f}%</div>', unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        # Gauge charts
-                        sharpe_gauge = create_metrics_gauge(metrics['sharpe_ratio'], "Sharpe Ratio", 0, 3)
-                        st.plotly_chart(sharpe_gauge, use_container_width=True)
-                        
-                        momentum_gauge = create_metrics_gauge(metrics['momentum'], "Momentum (RSI)", 0, 100)
-                        st.plotly_chart(momentum_gauge, use_container_width=True)
-                    
-                    # Additional metrics in columns with cards
-                    mc1, mc2, mc3 = st.columns(3)
-                    with mc1:
-                        st.markdown('<div class="metric-label">Expected Return (1Y)</div>', unsafe_allow_html=True)
-                        st.markdown(f'<div class="metric-value">{metrics["expected_return"]*100:.1f}%</div>', unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    with mc2:
-                        st.markdown('<div class="metric-label">Probability of Positive Return</div>', unsafe_allow_html=True)
-                        st.markdown(f'<div class="metric-value">{metrics["prob_positive"]*100:.1f}%</div>', unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    with mc3:
-                        st.markdown('<div class="metric-label">95% VaR</div>', unsafe_allow_html=True)
-                        st.markdown(f'<div class="metric-value">{metrics["var_95"]*100:.1f}%</div>', unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    st.markdown('---')
-            else:
-                st.warning("No high-quality opportunities found.")
+            if not service.request_scan():
+                st.info("A scan is already running; its results will appear here.")
+        
+        state = service.snapshot()
+        if state['error']:
+            st.error(f"Last scan failed: {state['error']}")
+        
+        if state['running']:
+            total = state['total'] or 1
+            st.progress(min(state['done'] / total, 1.0),
+                        text=f"Analyzing S&P 500 stocks... {state['done']}/{state['total']} tickers")
+            opportunities, version = state['partial'], None
+            if not opportunities and state['version']:
+                # Keep showing the previous scan until the new one finds something
+                opportunities, version = state['opportunities'], state['version']
+        else:
+            opportunities, version = state['opportunities'], state['version']
+            if state['completed_at'] is not None:
+                st.caption(f"Last scan: {state['completed_at']:%Y-%m-%d %H:%M:%S}, "
+                           f"next: {service.next_scan_at():%H:%M:%S}")
+        
+        if opportunities:
+            for opp in opportunities:
+                render_opportunity(opp, version)
+        elif not state['running']:
+            st.warning("No high-quality opportunities found.")
+    
+    if state['running']:
+        # Re-read the shared progress until the scan completes
+        time.sleep(POLL_SECONDS)
+        st.rerun()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,36 +1,63 @@
-import pandas as pd
-import numpy as np
-import yfinance as yf
-from datetime import datetime, timedelta
-from strategies.combined_strategy import CombinedStrategy
-import matplotlib.pyplot as plt
-import alpaca_trade_api as tradeapi
-import time
+from __future__ import annotations
+
+import argparse
 import logging
-from typing import Dict, List
-from strategies.stock_scanner import StockScanner
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from strategies.constituents import ConstituentsService
+    from strategies.data_provider import DataProvider
+
+# Heavy dependencies (pandas, numpy, matplotlib, sklearn, scipy, yfinance,
+# alpaca_trade_api) are imported by the commands that use them, so starting
+# the CLI, --help and importing this module stay cheap.
 
-# Configure logging and pandas display
+# Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-pd.set_option('display.float_format', lambda x: '%.2f' % x)
 
 # Alpaca API configuration
 ALPACA_API_KEY = 'YOUR_ALPACA_API_KEY'
 ALPACA_SECRET_KEY = 'YOUR_ALPACA_SECRET_KEY'
 ALPACA_BASE_URL = 'https://paper-api.alpaca.markets'  # Paper trading URL
 
-api = tradeapi.REST(
-    ALPACA_API_KEY,
-    ALPACA_SECRET_KEY,
-    ALPACA_BASE_URL,
-    api_version='v2'
-)
+# Modules importing main.py must not load, and its import-time budget
+HEAVY_MODULES = ['pandas', 'numpy', 'yfinance', 'matplotlib', 'alpaca_trade_api', 'sklearn', 'scipy']
+STARTUP_BUDGET = 0.1  # Seconds
+
+_api = None
+
+def get_api():
+    """Alpaca REST client, created on first use"""
+    global _api
+    if _api is None:
+        import alpaca_trade_api as tradeapi
+        
+        _api = tradeapi.REST(
+            ALPACA_API_KEY,
+            ALPACA_SECRET_KEY,
+            ALPACA_BASE_URL,
+            api_version='v2'
+        )
+    return _api
 
 class TradingBot:
-    def __init__(self, initial_capital: float = 100000):
+    def __init__(self, initial_capital: float = 100000, provider: DataProvider = None,
+                 constituents: ConstituentsService = None):
+        from strategies.constituents import ConstituentsService
+        from strategies.data_provider import YFinanceProvider
+        from strategies.stock_scanner import StockScanner
+        
         self.initial_capital = initial_capital
-        self.scanner = StockScanner()
+        self.provider = provider or YFinanceProvider()
+        self.constituents = constituents or ConstituentsService()  # Shared with the scanner
+        self.scanner = StockScanner(provider=self.provider, constituents=self.constituents)
         self.positions = {}
         self.backtest_results = {}
         self.top_opportunities = []
@@ -40,7 +67,7 @@ class TradingBot:
         try:
             # Get S&P 500 symbols
             logger.info("Fetching S&P 500 symbols...")
-            universe = self.scanner.get_sp500_symbols()  # Changed from get_universe to get_sp500_symbols
+            universe = self.constituents.members()
             
             # Scan stocks
             logger.info(f"Scanning {len(universe)} stocks...")
@@ -59,30 +86,41 @@ class TradingBot:
             logger.error(f"Error in scan_market: {str(e)}")
             return []
     
+    def get_history(self, symbol: str, days: int = 365) -> pd.DataFrame:
+        """Get recent daily bars for a symbol in the lowercase layout strategies use"""
+        end_date = datetime.now()
+        data = self.provider.get_symbol_history(symbol, end_date - timedelta(days=days), end_date)
+        data.columns = [column.lower() for column in data.columns]
+        return data
+    
     # ... (rest of the TradingBot class remains unchanged)
 
-def plot_monte_carlo(symbol: str, price_paths: np.ndarray, current_price: float):
-    """Plot Monte Carlo simulation paths"""
+def plot_monte_carlo(symbol: str, chart: Dict):
+    """Plot Monte Carlo simulation quantile bands and sample paths from a chart payload"""
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from strategies.chart_data import merged_lines
+    
     plt.figure(figsize=(12, 6))
+    current_price = chart['current_price']
     
-    # Plot a subset of paths for better visibility
-    num_paths_to_plot = 100
-    step = len(price_paths[0]) // num_paths_to_plot
+    # Plot the sample paths as one line collection
+    if chart['paths']:
+        xs, ys = merged_lines(chart['paths'])
+        plt.plot(np.array(xs, dtype=float), np.array(ys, dtype=float), color='blue', alpha=0.3, linewidth=0.5)
     
-    # Plot simulation paths
-    for path in price_paths.T[::step]:
-        plt.plot(path, color='blue', alpha=0.1)
+    # Plot quantile bands, outermost first
+    days = chart['days']
+    quantiles = list(chart['quantiles'])
+    bands = chart['bands']
+    for k in range(len(quantiles) // 2):
+        low, high = quantiles[k], quantiles[-1 - k]
+        plt.fill_between(days, bands[k], bands[-1 - k], color='gray', alpha=0.2,
+                         label=f'{high - low:g}% Confidence Interval')
     
     # Plot mean path
-    mean_path = price_paths.mean(axis=1)
-    plt.plot(mean_path, color='red', linewidth=2, label='Mean Path')
-    
-    # Plot confidence intervals
-    percentile_5 = np.percentile(price_paths, 5, axis=1)
-    percentile_95 = np.percentile(price_paths, 95, axis=1)
-    
-    plt.fill_between(range(len(mean_path)), percentile_5, percentile_95, 
-                     color='gray', alpha=0.2, label='90% Confidence Interval')
+    if chart['mean'] is not None:
+        plt.plot(days, chart['mean'], color='red', linewidth=2, label='Mean Path')
     
     plt.axhline(y=current_price, color='green', linestyle='--', label='Current Price')
     
@@ -96,11 +134,8 @@ def plot_monte_carlo(symbol: str, price_paths: np.ndarray, current_price: float)
     plt.savefig(f'monte_carlo_{symbol}.png')
     plt.close()
 
-def main():
-    scanner = StockScanner()
-    logger.info("Scanning S&P 500 stocks...")
-    opportunities = scanner.scan_stocks()
-    
+def print_report(opportunities: List[Dict], plot: bool = True):
+    """Print the scan results, saving a Monte Carlo chart per opportunity when plot"""
     if opportunities:
         print("\n=== Top 5 Investment Opportunities ===")
         print("=====================================")
@@ -124,13 +159,282 @@ def main():
             print(f"Overall Score: {opp['score']:.2f}")
             
             # Plot Monte Carlo simulation if available
-            if 'price_paths' in opp:
-                plot_monte_carlo(symbol, opp['price_paths'], metrics['current_price'])
+            if plot and 'chart' in opp:
+                plot_monte_carlo(symbol, opp['chart'])
                 print(f"\nMonte Carlo simulation plot saved as 'monte_carlo_{symbol}.png'")
             
             print("-" * 40)
     else:
         print("\nNo high-quality opportunities found.")
 
+def build_provider(args):
+    """Data provider selected on the command line, backed by a price store if given"""
+    from strategies.data_provider import AsyncHTTPProvider, LocalFileProvider, SyntheticProvider, YFinanceProvider
+    
+    if args.provider == 'synthetic':
+        return SyntheticProvider()
+    if args.provider == 'yfinance':
+        return YFinanceProvider()
+    if args.provider == 'async':
+        return AsyncHTTPProvider()
+    if args.provider.startswith(('http://', 'https://')):
+        return AsyncHTTPProvider(base_url=args.provider)
+    return LocalFileProvider(args.provider)
+
+def cmd_scan(args):
+    from strategies.price_store import PriceStore
+    from strategies.scan_cache import ScanCache
+    from strategies.scan_metrics import ScanMetrics
+    from strategies.stock_scanner import StockScanner
+    
+    metrics = None
+    if args.metrics or args.metrics_log:
+        metrics = ScanMetrics(textfile=args.metrics, log_path=args.metrics_log)
+    scanner = StockScanner(
+        provider=build_provider(args),
+        price_store=PriceStore(args.store) if args.store else None,
+        offline=args.offline,
+        batch_size=args.batch_size,
+        cpu_workers=args.cpu_workers,
+        ml_ranking=args.ml_ranking,
+        mc_budget=args.mc_budget,
+        scan_cache=ScanCache(args.scan_cache) if args.scan_cache else None,
+        metrics=metrics
+    )
+    logger.info(f"Scanning {len(args.tickers)} stocks..." if args.tickers else "Scanning S&P 500 stocks...")
+    opportunities = scanner.scan_stocks(args.tickers or None)
+    
+    if args.save:
+        import joblib
+        
+        joblib.dump(opportunities, args.save)
+        logger.info(f"Scan results saved to {args.save}")
+    print_report(opportunities, plot=args.plot)
+
+def cmd_report(args):
+    import joblib
+    
+    print_report(joblib.load(args.results), plot=args.plot)
+
+def cmd_backtest(args):
+    import pandas as pd
+    from strategies.combined_strategy import CombinedStrategy
+    from strategies.mean_reversion import MeanReversion
+    from strategies.moving_average_crossover import MovingAverageCrossover
+    from strategies.trend_following import TrendFollowing
+    
+    pd.set_option('display.float_format', lambda x: '%.2f' % x)
+    strategies = {
+        'combined': CombinedStrategy,
+        'moving_average': MovingAverageCrossover,
+        'mean_reversion': MeanReversion,
+        'trend_following': TrendFollowing
+    }
+    end_date = datetime.now()
+    provider = build_provider(args)
+    for symbol in args.symbols:
+        strategy = strategies[args.strategy].from_provider(provider, symbol, end_date - timedelta(days=args.days),
+                                                           end_date)
+        strategy.execute()
+        if isinstance(strategy, CombinedStrategy):
+            metrics = pd.DataFrame(strategy.get_strategy_metrics()).T
+        else:
+            metrics = pd.DataFrame([strategy.calculate_metrics()], index=[args.strategy])
+        print(f"\n=== {symbol}: {args.strategy} backtest ({args.days} days) ===")
+        print(metrics)
+
+def cmd_simulate(args):
+    from strategies.chart_data import summarize_paths
+    from strategies.monte_carlo import MonteCarloSimulator
+    
+    simulator = MonteCarloSimulator(n_simulations=args.simulations, n_days=args.horizon, seed=args.seed)
+    end_date = datetime.now()
+    provider = build_provider(args)
+    for symbol in args.symbols:
+        data = provider.get_symbol_history(symbol, end_date - timedelta(days=args.days), end_date)
+        price_paths, metrics = simulator.simulate_prices(data[['Close']].dropna())
+        current_price = float(data['Close'].dropna().iloc[-1])
+        
+        print(f"\n=== {symbol}: Monte Carlo ({args.simulations} paths, {args.horizon} days) ===")
+        print(f"Current Price: ${current_price:.2f}")
+        print(f"Expected Return: {metrics['expected_return']*100:.1f}%")
+        print(f"Probability of Positive Return: {metrics['prob_positive']*100:.1f}%")
+        print(f"95% VaR: {metrics['var_95']*100:.1f}%")
+        print(f"99% VaR: {metrics['var_99']*100:.1f}%")
+        print(f"Max Drawdown Risk: {metrics['max_drawdown']*100:.1f}%")
+        if args.plot:
+            plot_monte_carlo(symbol, summarize_paths(price_paths, current_price))
+            print(f"Monte Carlo simulation plot saved as 'monte_carlo_{symbol}.png'")
+
+def cmd_replay(args):
+    from strategies.hft import HFT, save_ticks, synthetic_ticks
+    
+    if args.synthetic:
+        ticks = synthetic_ticks(args.synthetic, n_symbols=args.symbols)
+        if args.save:
+            path = save_ticks(args.save, ticks)
+            logger.info(f"Synthetic ticks saved to {path}")
+        source = ticks
+    elif args.file:
+        source = args.file
+    else:
+        raise SystemExit("replay needs a tick file or --synthetic N")
+    
+    hft = HFT(source, pace=args.pace, sample_every=args.sample_every, batched=not args.per_event)
+    stats = hft.execute()
+    latency = stats['callback_latency_us']
+    print(f"Replayed {stats['events']:,} events ({stats['trades']:,} trades, {stats['quotes']:,} quotes) "
+          f"in {stats['seconds']:.2f} s: {stats['events_per_second']:,.0f} events/s")
+    if stats['batched_events']:
+        print(f"{stats['batched_events']:,} events ran through the strategy's compiled fast path (latency not sampled)")
+    if latency:
+        print(f"Callback latency (us): p50 {latency['p50']:.2f}, p99 {latency['p99']:.2f}, "
+              f"p99.9 {latency['p99.9']:.2f}, max {latency['max']:.1f} ({latency['samples']:,} samples)")
+    print(f"Strategy orders: {hft.strategy.n_orders:,}, PnL: {hft.strategy.pnl():.2f}")
+
+def cmd_train_rl(args):
+    from reinforcement_learning.rl_agent import RLAgent
+    
+    end_date = datetime.now()
+    data = build_provider(args).get_history(args.symbols, end_date - timedelta(days=args.days), end_date)
+    agent = RLAgent(data, n_envs=args.envs, episode_length=args.episode_length, window=args.window,
+                    cost=args.cost, seed=args.seed)
+    stats = agent.train(args.steps)
+    evaluation = stats['evaluation']
+    print(f"Trained on {stats['steps']:,} environment steps: {stats['steps_per_second']:,.0f} steps/s")
+    print(f"Mean reward: {stats['mean_reward'][:10].mean()*1e4:.2f} bp first 10 steps, "
+          f"{stats['mean_reward'][-10:].mean()*1e4:.2f} bp last 10")
+    print(f"Evaluation ({args.envs} episodes of {args.episode_length} days): "
+          f"mean reward {evaluation['mean_reward']*1e4:.2f} bp/day "
+          f"(buy and hold {evaluation['buy_and_hold_reward']*1e4:.2f}), "
+          f"Sharpe {evaluation['sharpe_ratio']:.2f}, max drawdown {evaluation['max_drawdown']*100:.1f}%, "
+          f"total return {evaluation['total_return']*100:.1f}%")
+
+def measure_startup(runs: int = 5) -> Dict:
+    """
+    Time importing this module in a fresh interpreter (best of runs, less
+    the bare interpreter startup) and list the heavy dependencies it loads
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    probe = f"import sys, main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    baseline = [sys.executable, '-c', 'pass']
+    
+    def best_of(command):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run(command, cwd=root, capture_output=True, text=True, check=True)
+            timings.append(time.perf_counter() - start)
+        return min(timings), result.stdout.strip()
+    
+    interpreter, _ = best_of(baseline)
+    elapsed, loaded = best_of([sys.executable, '-c', probe])
+    return {
+        'interpreter': interpreter,
+        'import_time': max(elapsed - interpreter, 0.0),
+        'heavy_modules': loaded.split(',') if loaded else []
+    }
+
+def cmd_check_startup(args):
+    """Fail if importing this module takes longer than the budget or loads any heavy dependency"""
+    startup = measure_startup(args.runs)
+    print(f"Interpreter startup: {startup['interpreter'] * 1000:.0f} ms")
+    print(f"Importing main: {startup['import_time'] * 1000:.0f} ms (budget {args.budget * 1000:.0f} ms)")
+    failures = []
+    if startup['heavy_modules']:
+        failures.append(f"heavy modules loaded at import time: {','.join(startup['heavy_modules'])}")
+    if startup['import_time'] > args.budget:
+        failures.append("import time over budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Algorithmic trading bot: scan, backtest and simulate stocks")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    def add_provider(subparser):
+        subparser.add_argument('--provider', default='yfinance',
+                               help="'yfinance', 'async' (concurrent chart API client), 'synthetic', "
+                                    "a chart API base URL or a directory of per-ticker files")
+    
+    scan = subparsers.add_parser('scan', help="scan the S&P 500 (or given tickers) for the top opportunities")
+    scan.add_argument('tickers', nargs='*', help="tickers to scan instead of the S&P 500")
+    add_provider(scan)
+    scan.add_argument('--store', help="local price store directory")
+    scan.add_argument('--offline', action='store_true', help="scan only what the price store holds")
+    scan.add_argument('--scan-cache', help="directory of the per-ticker scan cache")
+    scan.add_argument('--batch-size', type=int, default=100)
+    scan.add_argument('--cpu-workers', type=int, default=0)
+    scan.add_argument('--ml-ranking', action='store_true')
+    scan.add_argument('--mc-budget', type=int, help="simulate only this many screened tickers (cascade scan)")
+    scan.add_argument('--metrics', help="Prometheus text file to write scan metrics to")
+    scan.add_argument('--metrics-log', help="file to append each scan's JSON metrics summary to")
+    scan.add_argument('--save', help="file to save the results to, for 'report'")
+    scan.add_argument('--no-plot', dest='plot', action='store_false', help="do not save Monte Carlo charts")
+    scan.set_defaults(func=cmd_scan)
+    
+    report = subparsers.add_parser('report', help="print the results saved by 'scan --save'")
+    report.add_argument('results')
+    report.add_argument('--no-plot', dest='plot', action='store_false')
+    report.set_defaults(func=cmd_report)
+    
+    backtest = subparsers.add_parser('backtest', help="backtest a strategy on tickers")
+    backtest.add_argument('symbols', nargs='+')
+    backtest.add_argument('--strategy', default='combined',
+                          choices=['combined', 'moving_average', 'mean_reversion', 'trend_following'])
+    backtest.add_argument('--days', type=int, default=3 * 365, help="calendar days of history")
+    add_provider(backtest)
+    backtest.set_defaults(func=cmd_backtest)
+    
+    simulate = subparsers.add_parser('simulate', help="Monte Carlo price simulation of tickers")
+    simulate.add_argument('symbols', nargs='+')
+    simulate.add_argument('--simulations', type=int, default=1000)
+    simulate.add_argument('--horizon', type=int, default=252, help="trading days simulated")
+    simulate.add_argument('--days', type=int, default=365, help="calendar days of history to calibrate on")
+    simulate.add_argument('--seed', type=int)
+    simulate.add_argument('--plot', action='store_true')
+    add_provider(simulate)
+    simulate.set_defaults(func=cmd_simulate)
+    
+    replay = subparsers.add_parser('replay', help="replay tick data through the HFT engine")
+    replay.add_argument('file', nargs='?', help="tick file: .npy / raw records (memory-mapped) or .csv")
+    replay.add_argument('--synthetic', type=int, metavar='N', help="replay N synthetic ticks instead")
+    replay.add_argument('--symbols', type=int, default=1, help="instruments in synthetic ticks")
+    replay.add_argument('--save', help="save the synthetic ticks to this .npy file")
+    replay.add_argument('--pace', type=float, help="replay at this multiple of wall-clock speed (default: full speed)")
+    replay.add_argument('--sample-every', type=int, default=1, help="time every Nth callback")
+    replay.add_argument('--per-event', action='store_true',
+                        help="call the strategy once per event even if it has a compiled fast path")
+    replay.set_defaults(func=cmd_replay)
+    
+    train_rl = subparsers.add_parser('train-rl', help="train the baseline RL agent on a vectorized environment")
+    train_rl.add_argument('symbols', nargs='+')
+    train_rl.add_argument('--days', type=int, default=10 * 365, help="calendar days of history")
+    train_rl.add_argument('--envs', type=int, default=4096, help="episodes stepped in parallel")
+    train_rl.add_argument('--steps', type=int, default=1000, help="batched training steps")
+    train_rl.add_argument('--episode-length', type=int, default=252, help="trading days per episode")
+    train_rl.add_argument('--window', type=int, default=32, help="daily returns in each observation")
+    train_rl.add_argument('--cost', type=float, default=0.0, help="cost per unit of position traded")
+    train_rl.add_argument('--seed', type=int)
+    add_provider(train_rl)
+    train_rl.set_defaults(func=cmd_train_rl)
+    
+    check = subparsers.add_parser('check-startup', help="check that importing main.py stays within its budget")
+    check.add_argument('--budget', type=float, default=STARTUP_BUDGET, help="seconds")
+    check.add_argument('--runs', type=int, default=5)
+    check.set_defaults(func=cmd_check_startup)
+    return parser
+
+def main(argv: List[str] = None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # A bare 'python main.py' runs the default market scan
+        args = parser.parse_args(['scan'] + (argv or []))
+    return args.func(args)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+ACTIONS = np.array([-1.0, 0.0, 1.0])  # Action i holds position ACTIONS[i]: short, flat or long
+
+
+def closes_from(data) -> Tuple[np.ndarray, List[str]]:
+    """
+    (dates x tickers) closing prices and ticker names from a DataProvider
+    panel, a DataFrame of closes (one column per ticker) or one ticker's
+    OHLCV frame
+    """
+    if isinstance(data, pd.DataFrame):
+        if isinstance(data.columns, pd.MultiIndex):
+            data = data['Close']
+        elif 'Close' in data.columns or 'close' in data.columns:
+            data = data[['Close' if 'Close' in data.columns else 'close']]
+        return data.to_numpy(dtype=np.float64), [str(column) for column in data.columns]
+    close = np.asarray(data, dtype=np.float64)
+    close = close[:, None] if close.ndim == 1 else close
+    return close, [str(i) for i in range(close.shape[1])]
+
+
+class VectorTradingEnv:
+    """
+    n_envs trading episodes stepped together as NumPy batches. Every
+    episode trades one ticker from a random start offset for
+    episode_length bars; finished episodes restart at once on a new
+    random ticker and offset, so each step returns a full batch.
+
+    Observations are (n_envs x window + 1) float32 rows: the last window
+    daily log returns in percent and the position held. Actions index
+    ACTIONS. Accounting follows BaseStrategy.calculate_portfolio_value:
+    the position chosen at a bar earns the next bar's close-to-close
+    change, a missing return leaves the value unchanged, and the reward
+    is that strategy return (less cost per unit of position traded), so
+    the product of 1 + rewards is the episode's portfolio value curve.
+    """
+
+    def __init__(self, close: np.ndarray, n_envs: int = 1024, episode_length: int = 252, window: int = 32,
+                 cost: float = 0.0, seed: int = None, symbols: List[str] = None,
+                 initial_capital: float = 100000):
+        close = np.asarray(close, dtype=np.float64)
+        self.n_envs = n_envs
+        self.episode_length = episode_length
+        self.window = window
+        self.cost = cost
+        self.initial_capital = initial_capital
+        self.rng = np.random.default_rng(seed)
+
+        # Per-bar strategy returns and observation features, computed once
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pct = np.zeros(close.shape)
+            pct[1:] = close[1:] / close[:-1] - 1
+            log_returns = np.zeros(close.shape)
+            log_returns[1:] = np.log(close[1:] / close[:-1]) * 100
+        pct[~np.isfinite(pct)] = 0
+        log_returns[~np.isfinite(log_returns)] = 0
+        self.returns = pct.T.copy()  # (tickers x dates), so one episode's bars are contiguous
+        self.features = np.clip(log_returns, -20, 20).astype(np.float32).T.copy()
+
+        # Episodes need window bars of history before their start and episode_length after it
+        traded = np.isfinite(close)
+        first = np.argmax(traded, axis=0)
+        last = len(close) - 1 - np.argmax(traded[::-1], axis=0)
+        self.first_start = first + window
+        self.n_starts = last - episode_length - self.first_start + 1
+        self.tickers = np.flatnonzero(traded.any(axis=0) & (self.n_starts > 0))
+        if not len(self.tickers):
+            raise ValueError(f"No ticker has {window + episode_length + 1} bars for an episode")
+        self.symbols = symbols
+
+        self.ticker = np.zeros(n_envs, dtype=np.int64)
+        self.t = np.zeros(n_envs, dtype=np.int64)  # Current bar of each episode
+        self.steps = np.zeros(n_envs, dtype=np.int64)
+        self.position = np.zeros(n_envs)
+        self.value = np.zeros(n_envs)
+        self._offsets = np.arange(-window + 1, 1)
+
+    @classmethod
+    def from_panel(cls, data, **kwargs) -> 'VectorTradingEnv':
+        """Environment over a DataProvider panel or any data closes_from accepts"""
+        close, symbols = closes_from(data)
+        return cls(close, symbols=symbols, **kwargs)
+
+    @classmethod
+    def from_provider(cls, provider, symbols: List[str], start: datetime, end: datetime,
+                      **kwargs) -> 'VectorTradingEnv':
+        """Environment over local (or any) price data served by a DataProvider"""
+        return cls.from_panel(provider.get_history(symbols, start, end), **kwargs)
+
+    @property
+    def observation_size(self) -> int:
+        return self.window + 1
+
+    @property
+    def n_actions(self) -> int:
+        return len(ACTIONS)
+
+    def reset(self) -> np.ndarray:
+        """Start every episode afresh; returns the first observations"""
+        self._restart(np.arange(self.n_envs))
+        return self.observe()
+
+    def _restart(self, envs: np.ndarray):
+        tickers = self.tickers[self.rng.integers(0, len(self.tickers), len(envs))]
+        self.ticker[envs] = tickers
+        self.t[envs] = self.first_start[tickers] + (self.rng.random(len(envs)) * self.n_starts[tickers]).astype(np.int64)
+        self.steps[envs] = 0
+        self.position[envs] = 0
+        self.value[envs] = self.initial_capital
+
+    def observe(self) -> np.ndarray:
+        obs = np.empty((self.n_envs, self.window + 1), dtype=np.float32)
+        obs[:, :-1] = self.features[self.ticker[:, None], self.t[:, None] + self._offsets]
+        obs[:, -1] = self.position
+        return obs
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Hold ACTIONS[actions] over the next bar in every episode. Returns
+        the observations (of the new episodes where one just finished),
+        rewards, done mask and info: 'value' of every portfolio and
+        'final_value' of the finished ones (NaN elsewhere).
+        """
+        position = ACTIONS[actions]
+        self.t += 1
+        self.steps += 1
+        rewards = position * self.returns[self.ticker, self.t]
+        if self.cost:
+            rewards -= self.cost * np.abs(position - self.position)
+        self.position = position
+        self.value *= 1 + rewards
+
+        dones = self.steps >= self.episode_length
+        info = {'value': self.value.copy(), 'final_value': np.where(dones, self.value, np.nan)}
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self._restart(finished)
+        return self.observe(), rewards, dones, info
+
+    def buy_and_hold(self, n_steps: int) -> float:
+        """Mean per-step reward of always holding long over n_steps, a benchmark for agents"""
+        self.reset()
+        total = 0.0
+        long = np.full(self.n_envs, int(np.flatnonzero(ACTIONS == 1)[0]))
+        for _ in range(n_steps):
+            total += self.step(long)[1].mean()
+        return float(total / n_steps)
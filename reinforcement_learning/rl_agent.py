@@ -1,7 +1,109 @@
+import time
+from typing import Dict
+
+import numpy as np
+
+from strategies.base_strategy import performance_metrics
+from reinforcement_learning.environment import VectorTradingEnv
+
+
+class LinearPolicyAgent:
+    """
+    Baseline agent: a linear softmax policy over the environment's
+    observations, trained by policy gradient on whole batches of steps.
+    Without trading costs a position only earns the next bar's return, so
+    each step's reward is the full return of its action and no
+    discounting is needed; the batch mean reward is the baseline.
+    """
+
+    def __init__(self, observation_size: int, n_actions: int, learning_rate: float = 0.05, seed: int = None):
+        self.weights = np.zeros((observation_size + 1, n_actions), dtype=np.float32)  # Last row is the bias
+        self.learning_rate = learning_rate
+        self.rng = np.random.default_rng(seed)
+
+    def probabilities(self, obs: np.ndarray) -> np.ndarray:
+        logits = obs @ self.weights[:-1] + self.weights[-1]
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def act(self, obs: np.ndarray, greedy: bool = False):
+        """Actions for a batch of observations, and their action probabilities"""
+        probs = self.probabilities(obs)
+        if greedy:
+            return probs.argmax(axis=1), probs
+        draws = self.rng.random((len(obs), 1), dtype=np.float32)
+        actions = (probs.cumsum(axis=1) < draws).sum(axis=1)
+        return np.minimum(actions, probs.shape[1] - 1), probs
+
+    def update(self, obs: np.ndarray, actions: np.ndarray, probs: np.ndarray, rewards: np.ndarray):
+        std = rewards.std()
+        if std == 0:
+            return
+        advantages = ((rewards - rewards.mean()) / std).astype(np.float32)
+        scores = -probs * advantages[:, None]
+        scores[np.arange(len(actions)), actions] += advantages
+        self.weights[:-1] += self.learning_rate * (obs.T @ scores) / len(obs)
+        self.weights[-1] += self.learning_rate * scores.mean(axis=0)
+
+
 class RLAgent:
-    def __init__(self, data):
+    """
+    Trains the baseline LinearPolicyAgent on a VectorTradingEnv over data
+    (a DataProvider panel, a DataFrame of closes or one ticker's OHLCV
+    frame) and evaluates it on fresh episodes against buy and hold.
+    """
+
+    def __init__(self, data, n_envs: int = 4096, episode_length: int = 252, window: int = 32,
+                 cost: float = 0.0, learning_rate: float = 0.05, seed: int = None):
         self.data = data
+        # Independent streams for episode draws and action draws, both reproducible from seed
+        env_seed, agent_seed = np.random.SeedSequence(seed).spawn(2)
+        self.env = VectorTradingEnv.from_panel(data, n_envs=n_envs, episode_length=episode_length,
+                                               window=window, cost=cost, seed=env_seed)
+        self.agent = LinearPolicyAgent(self.env.observation_size, self.env.n_actions, learning_rate, agent_seed)
+
+    def train(self, n_steps: int = 1000) -> Dict:
+        """
+        n_steps batched steps (n_steps * n_envs environment steps) of
+        training, then one greedy evaluation episode per environment
+        """
+        env, agent = self.env, self.agent
+        obs = env.reset()
+        rewards_history = np.empty(n_steps)
+        start = time.perf_counter()
+        for i in range(n_steps):
+            actions, probs = agent.act(obs)
+            next_obs, rewards, dones, info = env.step(actions)
+            agent.update(obs, actions, probs, rewards)
+            rewards_history[i] = rewards.mean()
+            obs = next_obs
+        elapsed = time.perf_counter() - start
+
+        return {
+            'steps': n_steps * env.n_envs,
+            'steps_per_second': n_steps * env.n_envs / elapsed,
+            'mean_reward': rewards_history,
+            'evaluation': self.evaluate()
+        }
+
+    def evaluate(self, greedy: bool = True) -> Dict:
+        """Performance metrics of one episode in every environment, for the agent and for buy and hold"""
+        env = self.env
+        obs = env.reset()
+        values = np.empty((env.n_envs, env.episode_length + 1))
+        values[:, 0] = env.initial_capital
+        for t in range(env.episode_length):
+            actions, _ = self.agent.act(obs, greedy)
+            obs, rewards, dones, info = env.step(actions)
+            values[:, t + 1] = info['value']
+        buy_and_hold = env.buy_and_hold(env.episode_length)
 
-    def train(self):
-        # Placeholder for RL training logic
-        pass 
\ No newline at end of file
+        metrics = performance_metrics(values)
+        return {
+            'sharpe_ratio': float(np.nanmean(metrics['sharpe_ratio'])),
+            'max_drawdown': float(np.nanmean(metrics['max_drawdown'])),
+            'total_return': float(np.mean(metrics['total_return'])),
+            'mean_reward': float(np.mean(values[:, 1:] / values[:, :-1] - 1)),
+            'buy_and_hold_reward': buy_and_hold
+        }
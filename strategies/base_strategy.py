@@ -1,14 +1,78 @@
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
+from .position_engine import run_position_rules
+from .feature_cache import FeatureCache
+
+RISK_FREE_RATE = 0.02  # 2% annual risk-free rate
+
+
+def portfolio_values(positions, close, initial_capital=100000):
+    """
+    Portfolio value curves for a (rows x time) matrix of positions held on
+    one close series, as in BaseStrategy.calculate_portfolio_value: each bar
+    earns the previous bar's position times the close-to-close change.
+    """
+    positions = np.atleast_2d(np.asarray(positions, dtype=np.float64))
+    close = np.asarray(close, dtype=np.float64)
+    price_changes = np.zeros(len(close))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        price_changes[1:] = close[1:] / close[:-1] - 1
+
+    strategy_returns = np.zeros(positions.shape)
+    strategy_returns[:, 1:] = positions[:, :-1] * price_changes[1:]
+    # Missing returns leave the value unchanged, like cumprod skipping NaN
+    strategy_returns[~np.isfinite(strategy_returns)] = 0
+    return initial_capital * np.cumprod(1 + strategy_returns, axis=1)
+
+
+def performance_metrics(values):
+    """
+    Sharpe ratio, max drawdown and total return of each row of a
+    (rows x time) matrix of portfolio values, as in calculate_metrics
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_rows, n = values.shape
+    if n < 2:
+        zeros = np.zeros(n_rows)
+        return {'sharpe_ratio': zeros, 'max_drawdown': zeros.copy(), 'total_return': zeros.copy()}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = values[:, 1:] / values[:, :-1] - 1
+        std = returns.std(axis=1, ddof=1) if n > 2 else np.full(n_rows, np.nan)
+        excess_returns = returns - RISK_FREE_RATE / 252
+        sharpe = np.sqrt(252) * excess_returns.mean(axis=1) / std
+
+        rolling_max = np.maximum.accumulate(values, axis=1)
+        drawdowns = values - rolling_max
+        worst = np.argmin(drawdowns, axis=1)
+        rows = np.arange(n_rows)
+        max_dd = np.abs(drawdowns[rows, worst] / rolling_max[rows, worst])
+        total_return = (values[:, -1] - values[:, 0]) / values[:, 0]
+
+    return {
+        'sharpe_ratio': np.where(std == 0, 0.0, sharpe),
+        'max_drawdown': max_dd,
+        'total_return': total_return
+    }
 
 class BaseStrategy(ABC):
-    def __init__(self, data):
-        self.data = data.copy()  # Make a copy to avoid modifying original data
+    def __init__(self, data, features: FeatureCache = None):
+        # Shallow copy: new columns stay private while the price buffers are shared
+        # (read-only views under pandas copy-on-write), not duplicated
+        self.data = data.copy(deep=False)
+        self.features = features if features is not None else FeatureCache(data)
         self.positions = None
         self.portfolio_value = None
         self.initial_capital = 100000
         
+    @classmethod
+    def from_provider(cls, provider, symbol, start, end, **kwargs):
+        """Build the strategy on a ticker's history served by a DataProvider"""
+        data = provider.get_symbol_history(symbol, start, end)
+        data.columns = [column.lower() for column in data.columns]
+        return cls(data, **kwargs)
+        
     def calculate_metrics(self):
         """Calculate trading metrics like Sharpe ratio, max drawdown, etc."""
         if self.portfolio_value is None or len(self.portfolio_value) == 0:
@@ -43,8 +107,7 @@ class BaseStrategy(ABC):
         if len(returns) == 0 or returns.std() == 0:
             return 0.0
         
-        risk_free_rate = 0.02  # 2% annual risk-free rate
-        excess_returns = returns - risk_free_rate/252  # Daily risk-free rate
+        excess_returns = returns - RISK_FREE_RATE/252  # Daily risk-free rate
         return np.sqrt(252) * excess_returns.mean() / excess_returns.std()
     
     def calculate_max_drawdown(self, portfolio_values):
@@ -53,6 +116,25 @@ class BaseStrategy(ABC):
         drawdowns = portfolio_values - rolling_max
         return abs(drawdowns.min() / rolling_max.iloc[drawdowns.argmin()])
     
+    def apply_position_rules(self, stop_loss=np.inf, take_profit=np.inf, long_only=False,
+                             absolute_pnl=False, atr_multiple=0.0, size=None):
+        """
+        Set self.positions from self.data['signal'] with the shared
+        stop-loss / take-profit / ATR-stop state machine (see run_position_rules)
+        """
+        atr = self.data['atr'].to_numpy(dtype=np.float64) if atr_multiple else None
+        self.positions = run_position_rules(
+            self.data['signal'].to_numpy(dtype=np.float64),
+            self.data['close'].to_numpy(dtype=np.float64),
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            atr=atr,
+            atr_multiple=atr_multiple,
+            size=size,
+            long_only=long_only,
+            absolute_pnl=absolute_pnl
+        ).tolist()
+    
     def calculate_portfolio_value(self):
         """Calculate the portfolio value over time"""
         if self.positions is None:
@@ -60,7 +142,7 @@ class BaseStrategy(ABC):
             return
             
         position_series = pd.Series(self.positions, index=self.data.index)
-        price_changes = self.data['close'].pct_change()
+        price_changes = self.features.pct_change('close').copy()
         
         # Fill NaN values with 0 for first day
         price_changes.iloc[0] = 0
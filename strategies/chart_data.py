@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+QUANTILES = (5, 25, 50, 75, 95)
+N_SAMPLE_PATHS = 10  # Representative simulated paths drawn behind the bands
+MAX_POINTS = 150  # Points per line once long horizons are downsampled
+
+
+def lttb(y: np.ndarray, n_out: int, x: np.ndarray = None) -> np.ndarray:
+    """
+    Indices of the points kept when downsampling a line to n_out points
+    with Largest-Triangle-Three-Buckets: the first and last points, plus
+    the point of each bucket forming the largest triangle with the point
+    kept before it and the mean of the next bucket. y may also be a
+    (lines x points) array sharing x, downsampled together into one row
+    of indices per line.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    lines = np.atleast_2d(y)
+    n_lines, n = lines.shape
+    if n_out >= n or n_out < 3:
+        kept = np.broadcast_to(np.arange(n), (n_lines, n)).copy()
+        return kept if y.ndim > 1 else kept[0]
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Mean of every bucket in one pass; the last bucket's "next mean" is the last point
+    sizes = np.diff(edges)
+    next_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / sizes, x[-1])[1:]
+    next_y = np.append(np.add.reduceat(lines[:, :-1], edges[:-1], axis=1) / sizes, lines[:, -1:], axis=1)[:, 1:]
+    rows = np.arange(n_lines)
+    kept = np.empty((n_lines, n_out), dtype=int)
+    kept[:, 0], kept[:, -1] = 0, n - 1
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        a = kept[:, i]
+        xa, ya = x[a][:, None], lines[rows, a][:, None]
+        areas = np.abs((xa - next_x[i]) * (lines[:, start:stop] - ya)
+                       - (xa - x[start:stop]) * (next_y[:, i:i + 1] - ya))
+        kept[:, i + 1] = start + np.argmax(areas, axis=1)
+    return kept if y.ndim > 1 else kept[0]
+
+
+def chart_payload(current_price: float, bands: np.ndarray, quantiles: Sequence[float] = QUANTILES,
+                  mean: np.ndarray = None, sample_paths: np.ndarray = None,
+                  max_points: int = MAX_POINTS) -> Dict:
+    """
+    Compact Monte Carlo chart data: quantile bands (quantiles x days), an
+    optional mean path and a few sample paths (paths x days), downsampled
+    to max_points per line when longer than twice that. The bands and mean
+    share the x values picked on the median band; each sample path keeps
+    its own.
+    """
+    bands = np.asarray(bands, dtype=np.float64)
+    median = bands[int(np.argmin(np.abs(np.asarray(quantiles) - 50)))]
+    # Lines up to twice max_points long are kept whole: downsampling them saves little
+    max_points = max_points if bands.shape[1] > 2 * max_points else bands.shape[1]
+    days = lttb(median, max_points)
+    paths = []
+    if sample_paths is not None and len(sample_paths):
+        sample_paths = np.asarray(sample_paths, dtype=np.float64)
+        for path, path_days in zip(sample_paths, lttb(sample_paths, max_points)):
+            paths.append((path_days, path[path_days]))
+    return {
+        'n_days': bands.shape[1],
+        'current_price': float(current_price),
+        'quantiles': tuple(quantiles),
+        'days': days,
+        'bands': bands[:, days],
+        'mean': None if mean is None else np.asarray(mean, dtype=np.float64)[days],
+        'paths': paths
+    }
+
+
+def summarize_paths(price_paths: np.ndarray, current_price: float, quantiles: Sequence[float] = QUANTILES,
+                    n_samples: int = N_SAMPLE_PATHS, max_points: int = MAX_POINTS) -> Dict:
+    """
+    Chart payload of a (days x simulations) array of price paths. The
+    sample paths are the ones ending nearest to evenly spaced quantiles of
+    the final price, so they span the distribution. Computed once per
+    opportunity, after which the full paths can be dropped.
+    """
+    bands = np.percentile(price_paths, quantiles, axis=1)
+    order = np.argsort(price_paths[-1])
+    picks = order[np.linspace(0, len(order) - 1, min(n_samples, len(order))).astype(int)]
+    return chart_payload(current_price, bands, quantiles, price_paths.mean(axis=1),
+                         price_paths[:, picks].T, max_points)
+
+
+def merged_lines(lines: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[List[Optional[float]], List[Optional[float]]]:
+    """x and y of several lines joined into one, separated by None gaps"""
+    xs, ys = [], []
+    for x, y in lines:
+        xs.extend(np.asarray(x).tolist() + [None])
+        ys.extend(np.asarray(y).tolist() + [None])
+    return xs, ys
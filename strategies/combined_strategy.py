@@ -6,7 +6,7 @@ import pandas as pd
 import numpy as np
 
 class CombinedStrategy(BaseStrategy):
-    def __init__(self, data, weights=None):
+    def __init__(self, data, weights=None, registry=None):
         super().__init__(data)
         self.weights = weights or {
             'ma_crossover': 0.4,
@@ -14,10 +14,10 @@ class CombinedStrategy(BaseStrategy):
             'trend_following': 0.3
         }
         
-        # Initialize individual strategies
-        self.ma_strategy = MovingAverageCrossover(data.copy())
-        self.mr_strategy = MeanReversion(data.copy())
-        self.tf_strategy = TrendFollowing(data.copy())
+        # Initialize individual strategies on the same data and feature cache
+        self.ma_strategy = MovingAverageCrossover(data, features=self.features)
+        self.mr_strategy = MeanReversion(data, features=self.features, registry=registry)
+        self.tf_strategy = TrendFollowing(data, features=self.features)
         
         # Validation of weights
         if abs(sum(self.weights.values()) - 1.0) > 0.0001:
@@ -54,24 +54,9 @@ class CombinedStrategy(BaseStrategy):
     
     def apply_risk_management(self):
         """Apply position sizing and risk management"""
-        self.positions = [0] * len(self.data)
-        position = 0
-        entry_price = 0
         stop_loss = 0.02
         take_profit = 0.04
-        
-        for i in range(len(self.data)):
-            if position == 0 and self.data['signal'].iloc[i] != 0:
-                position = self.data['signal'].iloc[i]
-                entry_price = self.data['close'].iloc[i]
-            elif position != 0:
-                current_price = self.data['close'].iloc[i]
-                pnl = (current_price - entry_price) / entry_price
-                
-                if abs(pnl) >= take_profit or abs(pnl) <= -stop_loss:
-                    position = 0
-                    
-            self.positions[i] = position
+        self.apply_position_rules(stop_loss=stop_loss, take_profit=take_profit, absolute_pnl=True)
     
     def get_strategy_metrics(self):
         """Get individual strategy metrics"""
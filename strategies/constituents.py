@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = os.path.join('data', 'constituents', 'sp500.json')
+WIKIPEDIA_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+
+
+def fetch_wikipedia_sp500() -> Tuple[List[str], List[Dict]]:
+    """
+    Current S&P 500 members and the dated list of changes to the index
+    (newest first, as {'date', 'added', 'removed'}) from Wikipedia
+    """
+    tables = pd.read_html(WIKIPEDIA_URL)
+    members = tables[0]['Symbol'].astype(str).tolist()
+
+    changes = []
+    if len(tables) > 1:
+        history = tables[1].copy()
+        history.columns = [' '.join(map(str, c)) if isinstance(c, tuple) else str(c) for c in history.columns]
+        date_column = next(c for c in history.columns if c.startswith('Date'))
+        added_column = next((c for c in history.columns if c.startswith('Added') and 'Ticker' in c), None)
+        removed_column = next((c for c in history.columns if c.startswith('Removed') and 'Ticker' in c), None)
+        history['date'] = pd.to_datetime(history[date_column], errors='coerce')
+        for date, rows in history.dropna(subset=['date']).groupby('date', sort=False):
+            changes.append({
+                'date': date.strftime('%Y-%m-%d'),
+                'added': _tickers(rows, added_column),
+                'removed': _tickers(rows, removed_column)
+            })
+    return members, changes
+
+
+def _tickers(rows: pd.DataFrame, column: Optional[str]) -> List[str]:
+    if column is None:
+        return []
+    return sorted({str(t) for t in rows[column] if isinstance(t, str) and t.strip()})
+
+
+class ConstituentsService:
+    """
+    S&P 500 membership served from a local snapshot file that is refreshed
+    from the source (Wikipedia by default) once it is older than ttl. The
+    snapshot keeps the dated index changes, so membership can be resolved
+    as of any past date for survivorship-free backtests. If a refresh fails
+    the last snapshot is used, and offline services never refresh.
+    """
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH, ttl: timedelta = timedelta(days=1),
+                 source: Callable[[], Tuple[List[str], List[Dict]]] = fetch_wikipedia_sp500,
+                 offline: bool = False, retry_after: timedelta = timedelta(minutes=15)):
+        self.path = path
+        self.ttl = ttl
+        self.source = source
+        self.offline = offline
+        self.retry_after = retry_after  # Wait after a failed refresh before trying the source again
+        self._failed_at = None
+        self._lock = threading.Lock()
+        self._snapshot = self._load()
+
+    def _load(self) -> Optional[Dict]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._snapshot, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def fetched_at(self) -> Optional[datetime]:
+        """When the snapshot was last refreshed from the source"""
+        if self._snapshot is None:
+            return None
+        return datetime.fromisoformat(self._snapshot['fetched_at'])
+
+    def is_stale(self) -> bool:
+        return self.fetched_at is None or datetime.now() - self.fetched_at > self.ttl
+
+    def refresh(self) -> bool:
+        """
+        Fetch the current members and change history from the source into
+        the snapshot. Membership changes seen between two refreshes are
+        recorded too, in case the source's history misses them.
+        """
+        try:
+            members, changes = self.source()
+            if not members:
+                raise ValueError("empty list")
+        except Exception as e:
+            logger.error(f"Error fetching S&P 500 constituents: {str(e)}")
+            self._failed_at = datetime.now()
+            return False
+
+        with self._lock:
+            now = datetime.now()
+            changes = list(changes)
+            old_changes = []
+            if self._snapshot is not None:
+                old_changes = self._snapshot.get('changes', [])
+                # Membership changes since the last refresh that the source does not list
+                since = self._snapshot['fetched_at'][:10]
+                explained = {symbol for change in changes if change['date'] >= since
+                             for symbol in change['added'] + change['removed']}
+                previous = set(self._snapshot['members'])
+                added = sorted(set(members) - previous - explained)
+                removed = sorted(previous - set(members) - explained)
+                if added or removed:
+                    changes.append({'date': now.strftime('%Y-%m-%d'), 'added': added, 'removed': removed})
+            self._snapshot = {
+                'fetched_at': now.isoformat(),
+                'members': sorted(members),
+                'changes': self._merge_changes(old_changes, changes)
+            }
+            self._save()
+        return True
+
+    @staticmethod
+    def _merge_changes(old: List[Dict], new: List[Dict]) -> List[Dict]:
+        """Union of change lists per date, newest first"""
+        merged = {}
+        for change in old + new:
+            entry = merged.setdefault(change['date'], {'date': change['date'], 'added': set(), 'removed': set()})
+            entry['added'].update(change['added'])
+            entry['removed'].update(change['removed'])
+        return [{'date': entry['date'], 'added': sorted(entry['added']), 'removed': sorted(entry['removed'])}
+                for entry in sorted(merged.values(), key=lambda e: e['date'], reverse=True)]
+
+    def members(self, as_of=None) -> List[str]:
+        """
+        Index members today, or on the date as_of by undoing every change
+        made after it. Refreshes the snapshot first when it is stale.
+        """
+        retry = self._failed_at is None or datetime.now() - self._failed_at > self.retry_after
+        if not self.offline and self.is_stale() and retry:
+            self.refresh()
+        if self._snapshot is None:
+            logger.error("No S&P 500 constituents snapshot available")
+            return []
+
+        members = set(self._snapshot['members'])
+        if as_of is not None:
+            as_of = pd.Timestamp(as_of).strftime('%Y-%m-%d')
+            for change in self._snapshot.get('changes', []):
+                if change['date'] <= as_of:
+                    break
+                members.difference_update(change['added'])
+                members.update(change['removed'])
+        return sorted(members)
+
+    def history(self) -> pd.DataFrame:
+        """Dated index changes, newest first, one row per added or removed ticker"""
+        rows = [{'date': pd.Timestamp(change['date']), 'symbol': symbol, 'action': action}
+                for change in (self._snapshot or {}).get('changes', [])
+                for action in ('added', 'removed') for symbol in change[action]]
+        return pd.DataFrame(rows, columns=['date', 'symbol', 'action'])
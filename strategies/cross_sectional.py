@@ -0,0 +1,153 @@
+import copy
+import hashlib
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from .model_registry import ModelRegistry, default_registry, params_fingerprint
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.preprocessing import StandardScaler
+
+FEATURE_NAMES = ['rsi', 'macd', 'volatility', 'volume_ratio',
+                 'sma_20_gap', 'sma_50_gap', 'sma_200_gap', 'return_20']
+
+
+class CrossSectionalRanker:
+    """
+    Learned ranking stage of the scanner. Every batch contributes a block of
+    scale-free indicator features stacked over (dates x tickers), paired
+    with each row's forward return, plus every ticker's latest feature row.
+    One scaler + regressor is fitted on all blocks together (or loaded from
+    the model registry when the same matrix was fitted before) and the whole
+    universe is scored with a single predict call.
+    """
+
+    def __init__(self, scaler: 'StandardScaler' = None, model: 'GradientBoostingRegressor' = None,
+                 horizon: int = 21, sample_every: int = None, registry: ModelRegistry = None):
+        from sklearn.ensemble import GradientBoostingRegressor
+        from sklearn.preprocessing import StandardScaler
+
+        self.scaler = scaler if scaler is not None else StandardScaler()
+        self.model = model if model is not None else GradientBoostingRegressor(random_state=42)
+        self.horizon = horizon  # Bars ahead of the forward return to predict
+        # Training rows are taken every n bars, by default one per horizon so forward returns do not overlap
+        self.sample_every = sample_every or horizon
+        self.registry = registry
+
+    def feature_cube(self, indicators: Dict[str, np.ndarray]) -> np.ndarray:
+        """(dates x tickers x features) array of ranking features"""
+        close = indicators['Close']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return_20 = np.full(close.shape, np.nan)
+            return_20[20:] = close[20:] / close[:-20] - 1
+            return np.stack([
+                indicators['RSI'] / 100,
+                indicators['MACD'] / close,
+                indicators['Volatility'],
+                indicators['Volume_Ratio'],
+                close / indicators['SMA_20'] - 1,
+                close / indicators['SMA_50'] - 1,
+                close / indicators['SMA_200'] - 1,
+                return_20
+            ], axis=-1)
+
+    def block(self, symbols: List[str], indicators: Dict[str, np.ndarray]) -> Dict:
+        """Training rows and latest feature rows of one batch of tickers"""
+        features = self.feature_cube(indicators)
+        close = indicators['Close']
+        valid = indicators['valid'] & np.isfinite(features).all(axis=-1)
+        n = len(close)
+
+        # Sample rows every sample_every bars, aligned on the last trainable bar
+        rows = np.arange(n - 1 - self.horizon, -1, -self.sample_every)[::-1]
+        forward = np.full((len(rows), close.shape[1]), np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            forward[:] = close[rows + self.horizon] / close[rows] - 1
+        # Ticker-major, so a block is the concatenation of its tickers' pieces
+        trainable = (valid[rows] & np.isfinite(forward)).T
+
+        # Latest valid row of each ticker
+        has_row = valid.any(axis=0)
+        last_row = n - 1 - np.argmax(valid[::-1], axis=0)
+        columns = np.flatnonzero(has_row)
+
+        return {
+            'X': features[rows].transpose(1, 0, 2)[trainable],
+            'y': forward.T[trainable],
+            'symbols': [symbols[j] for j in columns],
+            'counts': trainable[columns].sum(axis=1),
+            'latest': features[last_row[columns], columns]
+        }
+
+    def _key(self, X: np.ndarray, y: np.ndarray) -> str:
+        params = {'model': type(self.model).__name__, 'params': self.model.get_params(),
+                  'horizon': self.horizon, 'sample_every': self.sample_every}
+        digest = hashlib.sha1(params_fingerprint(params).encode())
+        digest.update(np.ascontiguousarray(X).tobytes())
+        digest.update(np.ascontiguousarray(y).tobytes())
+        return digest.hexdigest()
+
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        """Fit the scaler and regressor, or load them if this matrix was fitted before"""
+        registry = self.registry if self.registry is not None else default_registry()
+        key = self._key(X, y)
+        fitted = registry.get(key)
+        if fitted is None:
+            scaler, model = copy.deepcopy(self.scaler), copy.deepcopy(self.model)
+            model.fit(scaler.fit_transform(X), y)
+            fitted = (scaler, model)
+            registry.put(key, fitted)
+        self.scaler, self.model = fitted
+        return self
+
+    def score(self, blocks: List[Dict]) -> Dict[str, float]:
+        """Fit on every block and predict the forward return of every ticker at once"""
+        blocks = [b for b in blocks if b is not None]
+        if not blocks or not sum(len(b['y']) for b in blocks):
+            return {}
+        self.fit(np.concatenate([b['X'] for b in blocks]), np.concatenate([b['y'] for b in blocks]))
+
+        symbols = [symbol for b in blocks for symbol in b['symbols']]
+        if not symbols:
+            return {}
+        latest = np.concatenate([b['latest'] for b in blocks])
+        return dict(zip(symbols, self.model.predict(self.scaler.transform(latest))))
+
+    def rank(self, opportunities: List[Dict], blocks: List[Dict]) -> List[Dict]:
+        """
+        Attach the predicted forward return ('ml_score') and its rank in the
+        whole universe ('ml_rank', 1 = best) to each opportunity, best first
+        """
+        scores = self.score(blocks)
+        order = sorted(scores, key=scores.get, reverse=True)
+        ranks = {symbol: i + 1 for i, symbol in enumerate(order)}
+        for opportunity in opportunities:
+            opportunity['ml_score'] = scores.get(opportunity['symbol'], np.nan)
+            opportunity['ml_rank'] = ranks.get(opportunity['symbol'])
+        return sorted(opportunities, key=lambda o: -np.inf if np.isnan(o['ml_score']) else o['ml_score'],
+                      reverse=True)
+
+
+def split_block(block: Dict) -> Dict[str, Dict]:
+    """Per-ticker pieces of a ranking block (training rows and latest row)"""
+    bounds = np.concatenate(([0], np.cumsum(block['counts'])))
+    return {symbol: {'X': block['X'][bounds[i]:bounds[i + 1]],
+                     'y': block['y'][bounds[i]:bounds[i + 1]],
+                     'latest': block['latest'][i:i + 1]}
+            for i, symbol in enumerate(block['symbols'])}
+
+
+def merge_blocks(pieces: Dict[str, Dict]) -> Optional[Dict]:
+    """Ranking block made of per-ticker pieces, in the order given"""
+    pieces = {symbol: piece for symbol, piece in pieces.items() if piece is not None}
+    if not pieces:
+        return None
+    return {
+        'X': np.concatenate([piece['X'] for piece in pieces.values()]),
+        'y': np.concatenate([piece['y'] for piece in pieces.values()]),
+        'symbols': list(pieces),
+        'counts': np.array([len(piece['y']) for piece in pieces.values()]),
+        'latest': np.concatenate([piece['latest'] for piece in pieces.values()])
+    }
@@ -0,0 +1,267 @@
+import logging
+import os
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .price_store import PriceStore, _align_tz, _naive
+
+if TYPE_CHECKING:
+    from .market_data_client import MarketDataClient
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class DataProvider(ABC):
+    """
+    Source of daily OHLCV bars. Histories are returned as one aligned panel:
+    a DataFrame indexed by (tz-naive) date whose columns are a
+    (field, symbol) MultiIndex, with NaN where a ticker has no bar.
+    """
+
+    @abstractmethod
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> pd.DataFrame:
+        """Get daily bars in [start, end) for several tickers as one panel"""
+        pass
+
+    def get_symbol_history(self, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+        """Get daily bars for a single ticker as a plain OHLCV DataFrame"""
+        return panel_to_frame(self.get_history([symbol], start, end), symbol)
+
+
+class YFinanceProvider(DataProvider):
+    """Yahoo Finance provider fetching many tickers per request"""
+
+    def __init__(self, chunk_size: int = 100, threads: bool = True):
+        self.chunk_size = chunk_size
+        self.threads = threads
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> pd.DataFrame:
+        import yfinance as yf
+
+        frames = {}
+        for i in range(0, len(symbols), self.chunk_size):
+            chunk = symbols[i:i + self.chunk_size]
+            raw = yf.download(
+                chunk,
+                start=start,
+                end=end,
+                auto_adjust=True,
+                actions=False,
+                group_by='column',
+                progress=False,
+                threads=self.threads
+            )
+            if raw is None or raw.empty:
+                continue
+            if not isinstance(raw.columns, pd.MultiIndex):
+                raw.columns = pd.MultiIndex.from_product([raw.columns, chunk])
+            for symbol in chunk:
+                if symbol in raw.columns.get_level_values(1):
+                    frames[symbol] = raw.xs(symbol, axis=1, level=1)
+        return panel_from_frames(frames, symbols)
+
+
+class AsyncHTTPProvider(DataProvider):
+    """
+    Provider fetching every ticker of a request concurrently through a
+    MarketDataClient (pooled connections, rate limit, retries; requires
+    aiohttp). Tickers that could not be fetched are kept in failures with
+    the reason, until a later request for them succeeds.
+    """
+
+    def __init__(self, client: 'MarketDataClient' = None, **client_options):
+        from .market_data_client import MarketDataClient
+
+        self.client = client or MarketDataClient(**client_options)
+        self.failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> pd.DataFrame:
+        frames, failures = self.client.fetch(symbols, start, end)
+        with self._lock:
+            for symbol in frames:
+                self.failures.pop(symbol, None)
+            self.failures.update(failures)
+        if failures:
+            logger.warning(f"Failed to fetch {len(failures)} of {len(symbols)} tickers")
+        return panel_from_frames(frames, symbols)
+
+
+class LocalFileProvider(DataProvider):
+    """
+    Provider reading per-ticker fixture files ({symbol}.parquet or
+    {symbol}.csv) from a directory, e.g. the partitions of a PriceStore.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def read_symbol(self, symbol: str) -> pd.DataFrame:
+        name = symbol.replace('/', '_')
+        parquet_path = os.path.join(self.root, f"{name}.parquet")
+        csv_path = os.path.join(self.root, f"{name}.csv")
+        if os.path.exists(parquet_path):
+            return pd.read_parquet(parquet_path)
+        if os.path.exists(csv_path):
+            return pd.read_csv(csv_path, index_col=0, parse_dates=True)
+        return pd.DataFrame()
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> pd.DataFrame:
+        frames = {}
+        for symbol in symbols:
+            data = self.read_symbol(symbol)
+            if data.empty:
+                continue
+            data = data[(data.index >= _align_tz(start, data.index)) &
+                        (data.index < _align_tz(end, data.index))]
+            frames[symbol] = data
+        return panel_from_frames(frames, symbols)
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Deterministic geometric-Brownian-motion bars for benchmarks and tests.
+    Each ticker is generated from a fixed origin with its own seed, so the
+    same ticker and date always produce the same bar whatever window or
+    universe is requested.
+    """
+
+    def __init__(self, seed: int = 42, mu: float = 0.0003, sigma: float = 0.015,
+                 origin: str = '2000-01-03'):
+        self.seed = seed
+        self.mu = mu
+        self.sigma = sigma
+        self.origin = pd.Timestamp(origin)
+
+    def calendar(self, end: datetime) -> pd.DatetimeIndex:
+        """Business days from the origin up to (excluding) end"""
+        days = np.arange(self.origin.to_datetime64(), _naive(end).to_datetime64(), dtype='datetime64[D]')
+        return pd.DatetimeIndex(days[np.is_busday(days)])
+
+    def generate(self, symbol: str, end: datetime) -> pd.DataFrame:
+        """Generate the full history of a ticker from the origin up to end"""
+        dates = self.calendar(end)
+        n = len(dates)
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+
+        start_price = rng.uniform(20, 500)
+        sigma = self.sigma * rng.uniform(0.5, 2.0)
+        # One row of draws per bar keeps earlier bars unchanged as end grows
+        draws = rng.standard_normal((n, 5))
+        close = start_price * np.exp(np.cumsum(self.mu - sigma ** 2 / 2 + sigma * draws[:, 0]))
+
+        open_ = np.empty(n)
+        open_[0] = start_price
+        open_[1:] = close[:-1] * (1 + sigma / 4 * draws[1:, 1])
+        high = np.maximum(open_, close) * (1 + np.abs(draws[:, 2]) * sigma / 2)
+        low = np.minimum(open_, close) * (1 - np.abs(draws[:, 3]) * sigma / 2)
+        volume = np.round(np.exp(14 + 0.5 * draws[:, 4]))
+
+        return pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': volume
+        }, index=dates)
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> pd.DataFrame:
+        frames = {}
+        for symbol in symbols:
+            data = self.generate(symbol, end)
+            frames[symbol] = data[data.index >= _naive(start)]
+        return panel_from_frames(frames, symbols)
+
+
+class StoreBackedProvider(DataProvider):
+    """
+    Serves histories from a PriceStore, topping it up from an upstream
+    provider with only the bars from each ticker's last stored date on,
+    which overwrite that date's possibly partial bar.
+    Tickers sharing the same last date are topped up in one bulk request.
+    A failed top-up is logged and the stored bars are served anyway.
+    """
+
+    def __init__(self, upstream: DataProvider, store: PriceStore, offline: bool = False):
+        self.upstream = upstream
+        self.store = store
+        self.offline = offline
+        self.top_up_failures: Dict[str, str] = {}
+
+    @property
+    def failures(self) -> Dict[str, str]:
+        """Failed tickers of the upstream provider, if it reports them, and of failed top-ups"""
+        return {**getattr(self.upstream, 'failures', {}), **self.top_up_failures}
+
+    def top_up(self, symbols: List[str], start: datetime, end: datetime):
+        groups = defaultdict(list)
+        for symbol in symbols:
+            last = self.store.last_date(symbol)
+            # The last stored bar is fetched again: it may be a partial bar stored during market hours
+            fetch_start = _naive(start) if last is None else _naive(last).normalize()
+            if fetch_start < _naive(end):
+                groups[fetch_start].append(symbol)
+
+        for fetch_start, group in groups.items():
+            try:
+                panel = self.upstream.get_history(group, fetch_start, end)
+            except Exception as e:
+                logger.warning(f"Top-up of {len(group)} tickers from {fetch_start:%Y-%m-%d} failed, "
+                               f"serving stored bars: {e!r}")
+                self.top_up_failures.update(dict.fromkeys(group, 'top_up_failed'))
+                continue
+            for symbol in group:
+                self.top_up_failures.pop(symbol, None)
+                new_data = panel_to_frame(panel, symbol)
+                last = self.store.last_date(symbol)
+                if last is not None:
+                    new_data = new_data[new_data.index >= _align_tz(last, new_data.index).normalize()]
+                self.store.append(symbol, new_data)
+
+    def get_history(self, symbols: List[str], start: datetime, end: datetime) -> pd.DataFrame:
+        if not self.offline:
+            self.top_up(symbols, start, end)
+        frames = {symbol: self.store.read(symbol, start, end) for symbol in symbols}
+        return panel_from_frames(frames, symbols)
+
+
+def _normalize_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """Title-case OHLCV columns and make the index tz-naive dates"""
+    data = data.rename(columns={c: c.title() for c in data.columns if isinstance(c, str)})
+    data = data.reindex(columns=FIELDS)
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    data.index = index.normalize()
+    return data[~data.index.duplicated(keep='last')]
+
+
+def panel_from_frames(frames: Dict[str, pd.DataFrame], symbols: List[str] = None) -> pd.DataFrame:
+    """Align per-ticker OHLCV frames on a common calendar as one panel"""
+    symbols = list(frames) if symbols is None else symbols
+    columns = pd.MultiIndex.from_product([FIELDS, symbols], names=['field', 'symbol'])
+    frames = {s: _normalize_frame(d) for s, d in frames.items() if d is not None and not d.empty}
+    if not frames:
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name='Date'), dtype=float)
+
+    panel = pd.concat(frames, axis=1, names=['symbol', 'field']).swaplevel(axis=1)
+    panel = panel.reindex(columns=columns).sort_index()
+    panel.index.name = 'Date'
+    return panel
+
+
+def panel_to_frame(panel: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    """Extract one ticker from a panel, dropping dates it did not trade"""
+    if panel.empty or symbol not in panel.columns.get_level_values('symbol'):
+        return pd.DataFrame(columns=FIELDS, dtype=float)
+    data = panel.xs(symbol, axis=1, level='symbol')
+    return data.dropna(subset=['Close'])
@@ -0,0 +1,50 @@
+import pandas as pd
+from typing import Callable, Dict, Hashable, Tuple
+
+# Transforms of a single column, keyed by name; window is the transform's parameter
+TRANSFORMS: Dict[str, Callable[[pd.Series, int], pd.Series]] = {
+    'rolling_mean': lambda series, window: series.rolling(window=window).mean(),
+    'rolling_std': lambda series, window: series.rolling(window=window).std(),
+    'rolling_max': lambda series, window: series.rolling(window=window).max(),
+    'rolling_min': lambda series, window: series.rolling(window=window).min(),
+    'pct_change': lambda series, window: series.pct_change(window),
+    'diff': lambda series, window: series.diff(window),
+}
+
+
+class FeatureCache:
+    """
+    Per-dataset cache of derived features keyed by (column, transform, window).
+    Strategies built on the same data share one cache so that overlapping
+    features (e.g. the 50-bar mean of close) are computed once.
+    Cached series are shared between strategies and must not be modified.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._features: Dict[Tuple[str, str, Hashable], pd.Series] = {}
+
+    def get(self, column: str, transform: str, window: int = 1) -> pd.Series:
+        """Get a cached feature, computing it on first use"""
+        key = (column, transform, window)
+        if key not in self._features:
+            self._features[key] = TRANSFORMS[transform](self.data[column], window)
+        return self._features[key]
+
+    def rolling_mean(self, column: str, window: int) -> pd.Series:
+        return self.get(column, 'rolling_mean', window)
+
+    def rolling_std(self, column: str, window: int) -> pd.Series:
+        return self.get(column, 'rolling_std', window)
+
+    def rolling_max(self, column: str, window: int) -> pd.Series:
+        return self.get(column, 'rolling_max', window)
+
+    def rolling_min(self, column: str, window: int) -> pd.Series:
+        return self.get(column, 'rolling_min', window)
+
+    def pct_change(self, column: str, periods: int = 1) -> pd.Series:
+        return self.get(column, 'pct_change', periods)
+
+    def __len__(self) -> int:
+        return len(self._features)
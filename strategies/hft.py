@@ -1,7 +1,579 @@
+import json
+import os
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, strategies then get one callback per event
+    njit = None
+
+# One tick per record. Trades use price/size/side, quotes the bid and ask
+# fields; timestamps are nanoseconds since the epoch.
+TICK_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('symbol', '<u4'),
+    ('kind', 'u1'),
+    ('side', 'i1'),  # Trades: 1 buyer-initiated, -1 seller-initiated, 0 unknown
+    ('price', '<f8'),
+    ('size', '<f8'),
+    ('bid', '<f8'),
+    ('bid_size', '<f8'),
+    ('ask', '<f8'),
+    ('ask_size', '<f8')
+])
+TRADE, QUOTE = 0, 1
+CHUNK_SIZE = 65536  # Records converted to Python values at a time during replay
+NAN = float('nan')
+
+
+class Trade:
+    """A trade print. The engine reuses one instance per replay: copy fields to keep them."""
+    __slots__ = ('ts', 'symbol', 'price', 'size', 'side')
+
+    def __init__(self, ts: int = 0, symbol: int = 0, price: float = NAN, size: float = 0.0, side: int = 0):
+        self.ts = ts
+        self.symbol = symbol
+        self.price = price
+        self.size = size
+        self.side = side
+
+
+class Quote:
+    """A top-of-book quote update. The engine reuses one instance per replay: copy fields to keep them."""
+    __slots__ = ('ts', 'symbol', 'bid', 'bid_size', 'ask', 'ask_size')
+
+    def __init__(self, ts: int = 0, symbol: int = 0, bid: float = NAN, bid_size: float = 0.0,
+                 ask: float = NAN, ask_size: float = 0.0):
+        self.ts = ts
+        self.symbol = symbol
+        self.bid = bid
+        self.bid_size = bid_size
+        self.ask = ask
+        self.ask_size = ask_size
+
+
+class TopOfBook:
+    """Best bid and ask and the last trade of one instrument"""
+    __slots__ = ('ts', 'bid', 'bid_size', 'ask', 'ask_size', 'last_price', 'last_size')
+
+    def __init__(self):
+        self.ts = 0
+        self.bid = self.ask = self.last_price = NAN
+        self.bid_size = self.ask_size = self.last_size = 0.0
+
+    @property
+    def mid(self) -> float:
+        return (self.bid + self.ask) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.ask - self.bid
+
+    @property
+    def microprice(self) -> float:
+        """Mid weighted towards the side with less size, where the price is likelier to move"""
+        depth = self.bid_size + self.ask_size
+        if not depth:
+            return self.mid
+        return (self.bid * self.ask_size + self.ask * self.bid_size) / depth
+
+    @property
+    def imbalance(self) -> float:
+        """(bid size - ask size) / (bid size + ask size), in [-1, 1]"""
+        depth = self.bid_size + self.ask_size
+        return (self.bid_size - self.ask_size) / depth if depth else 0.0
+
+
+class RingBuffer:
+    """
+    The last capacity values of a few fields, in preallocated Python lists
+    (cheaper to write one value at a time than NumPy arrays). Arrays in
+    chronological order are only built on request.
+    """
+    __slots__ = ('capacity', 'fields', 'columns', 'count')
+
+    def __init__(self, capacity: int, fields: Tuple[str, ...]):
+        self.capacity = capacity
+        self.fields = fields
+        self.columns = [[NAN] * capacity for _ in fields]
+        self.count = 0  # Values ever appended
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, *values):
+        i = self.count % self.capacity
+        for column, value in zip(self.columns, values):
+            column[i] = value
+        self.count += 1
+
+    def last(self, field: str, n: int = None) -> np.ndarray:
+        """The n (default: all held) most recent values of a field, oldest first"""
+        n = len(self) if n is None else max(0, min(n, len(self)))
+        column = self.columns[self.fields.index(field)]
+        if self.count <= self.capacity:
+            values = column[self.count - n:self.count]
+        else:
+            end = self.count % self.capacity  # Oldest value held
+            values = (column[end:] + column[:end])[self.capacity - n:]
+        return np.asarray(values, dtype=np.float64)
+
+
+class SymbolState:
+    """What the engine keeps per instrument: its top of book and recent trades and quotes"""
+    __slots__ = ('symbol', 'book', 'trades', 'quotes')
+
+    def __init__(self, symbol: int, trade_capacity: int, quote_capacity: int):
+        self.symbol = symbol
+        self.book = TopOfBook()
+        self.trades = RingBuffer(trade_capacity, ('ts', 'price', 'size', 'side'))
+        self.quotes = RingBuffer(quote_capacity, ('ts', 'bid', 'bid_size', 'ask', 'ask_size'))
+
+
+class TickStrategy:
+    """
+    Callback interface of the tick engine. on_trade and on_quote run after
+    the instrument's book and ring buffers include the event; their
+    duration is the latency the engine measures.
+    """
+
+    def on_start(self, engine: 'TickEngine'):
+        pass
+
+    def on_trade(self, trade: Trade, state: SymbolState):
+        pass
+
+    def on_quote(self, quote: Quote, state: SymbolState):
+        pass
+
+    def on_records(self, records: np.ndarray, engine: 'TickEngine') -> bool:
+        """
+        Optional fast path: handle a whole chunk of TICK_DTYPE records at
+        once, e.g. with a compiled kernel, instead of one callback per
+        event. Return False to have the engine dispatch them one by one.
+        Books and ring buffers are brought up to the end of the chunk after
+        it returns.
+        """
+        return False
+
+    def on_finish(self, engine: 'TickEngine'):
+        pass
+
+
+class TickEngine:
+    """
+    Single-threaded event loop replaying ticks through a TickStrategy.
+    Records are read in chunks from structured arrays (memory-mapped
+    files included), converted to Python values a chunk at a time and
+    dispatched one by one. Every sample_every-th callback is timed with
+    perf_counter_ns.
+
+    pace=None replays as fast as possible; pace=1.0 sleeps to follow the
+    ticks' own timestamps in wall-clock time, 10.0 ten times faster.
+
+    At full speed, chunks a strategy handles in on_records (unless
+    batched=False) skip the per-event loop: the engine then only updates
+    books and ring buffers in bulk, and no callback latency is sampled.
+    """
+
+    def __init__(self, strategy: TickStrategy = None, trade_capacity: int = 1024, quote_capacity: int = 1024,
+                 measure_latency: bool = True, sample_every: int = 1, batched: bool = True):
+        self.strategy = strategy or TickStrategy()
+        self.trade_capacity = trade_capacity
+        self.quote_capacity = quote_capacity
+        self.measure_latency = measure_latency
+        self.sample_every = sample_every
+        self.batched = batched
+        self.states: Dict[int, SymbolState] = {}
+        self.latencies = array('q')  # Callback durations in nanoseconds
+        self.counts = {'trades': 0, 'quotes': 0, 'batched': 0}
+        self.elapsed = 0.0
+
+    def state(self, symbol: int) -> SymbolState:
+        state = self.states.get(symbol)
+        if state is None:
+            state = self.states[symbol] = SymbolState(symbol, self.trade_capacity, self.quote_capacity)
+        return state
+
+    def replay(self, ticks: Union[np.ndarray, Iterable[np.ndarray]], pace: float = None) -> Dict:
+        """Replay a TICK_DTYPE array, or an iterable of them (e.g. CSV chunks). Returns replay_stats()."""
+        chunks = [ticks] if isinstance(ticks, np.ndarray) else ticks
+        clock = None  # (first tick timestamp, wall-clock ns it maps to)
+        self.strategy.on_start(self)
+        start = time.perf_counter()
+        for chunk in chunks:
+            for i in range(0, len(chunk), CHUNK_SIZE):
+                records = chunk[i:i + CHUNK_SIZE]
+                if pace is not None and len(records):
+                    clock = clock or (int(records['ts'][0]), time.perf_counter_ns())
+                if pace is None and self.batched and self.strategy.on_records(records, self):
+                    self._absorb(records)
+                else:
+                    self._dispatch(records, pace, clock)
+        self.elapsed += time.perf_counter() - start
+        self.strategy.on_finish(self)
+        return self.replay_stats()
+
+    def _dispatch(self, records: np.ndarray, pace: Optional[float], clock: Optional[Tuple[int, int]]):
+        # The hot loop: everything it touches is bound to a local first, ring
+        # buffers are written inline, and callbacks the strategy does not
+        # override are not called at all
+        strategy = self.strategy
+        on_trade = strategy.on_trade if type(strategy).on_trade is not TickStrategy.on_trade else None
+        on_quote = strategy.on_quote if type(strategy).on_quote is not TickStrategy.on_quote else None
+        trade, quote = Trade(), Quote()
+        states = self.states
+        get_state = self.state
+        record = self.latencies.append
+        timer = time.perf_counter_ns
+        sample_every = self.sample_every if self.measure_latency else 0
+        countdown = sample_every  # Callbacks until the next timed one
+        n_trades = n_quotes = 0
+
+        columns = [records[name].tolist() for name in TICK_DTYPE.names]
+        for ts, symbol, kind, side, price, size, bid, bid_size, ask, ask_size in zip(*columns):
+            if pace is not None:
+                wait = clock[1] + (ts - clock[0]) / pace - timer()
+                if wait > 0:
+                    time.sleep(wait / 1e9)
+            state = states.get(symbol)
+            if state is None:
+                state = get_state(symbol)
+            book = state.book
+            book.ts = ts
+            if kind == TRADE:
+                n_trades += 1
+                book.last_price = price
+                book.last_size = size
+                ring = state.trades
+                i = ring.count % ring.capacity
+                ring.count += 1
+                c_ts, c_price, c_size, c_side = ring.columns
+                c_ts[i], c_price[i], c_size[i], c_side[i] = ts, price, size, side
+                if on_trade is None:
+                    continue
+                trade.ts, trade.symbol, trade.price, trade.size, trade.side = ts, symbol, price, size, side
+                countdown -= 1
+                if countdown:
+                    on_trade(trade, state)
+                else:
+                    countdown = sample_every
+                    t0 = timer()
+                    on_trade(trade, state)
+                    record(timer() - t0)
+            else:
+                n_quotes += 1
+                book.bid, book.bid_size, book.ask, book.ask_size = bid, bid_size, ask, ask_size
+                ring = state.quotes
+                i = ring.count % ring.capacity
+                ring.count += 1
+                c_ts, c_bid, c_bid_size, c_ask, c_ask_size = ring.columns
+                c_ts[i], c_bid[i], c_bid_size[i], c_ask[i], c_ask_size[i] = ts, bid, bid_size, ask, ask_size
+                if on_quote is None:
+                    continue
+                quote.ts, quote.symbol = ts, symbol
+                quote.bid, quote.bid_size, quote.ask, quote.ask_size = bid, bid_size, ask, ask_size
+                countdown -= 1
+                if countdown:
+                    on_quote(quote, state)
+                else:
+                    countdown = sample_every
+                    t0 = timer()
+                    on_quote(quote, state)
+                    record(timer() - t0)
+        self.counts['trades'] += n_trades
+        self.counts['quotes'] += n_quotes
+
+    def _absorb(self, records: np.ndarray):
+        """Bring books and ring buffers up to the end of records, as if they had been dispatched one by one"""
+        is_trade = records['kind'] == TRADE
+        n_trades = int(np.count_nonzero(is_trade))
+        for kind, rows, ring_name in ((TRADE, np.flatnonzero(is_trade), 'trades'),
+                                      (QUOTE, np.flatnonzero(~is_trade), 'quotes')):
+            if not len(rows):
+                continue
+            symbols = records['symbol'][rows]
+            order = np.argsort(symbols, kind='stable')
+            ids, starts, sizes = np.unique(symbols[order], return_index=True, return_counts=True)
+            for symbol, first, size in zip(ids.tolist(), starts.tolist(), sizes.tolist()):
+                state = self.state(symbol)
+                ring = getattr(state, ring_name)
+                # Only the last capacity events of the chunk are still held afterwards
+                tail = rows[order[first + max(0, size - ring.capacity):first + size]]
+                values = records[list(ring.fields)][tail]
+                offset = (ring.count + size - len(tail)) % ring.capacity
+                split = min(len(tail), ring.capacity - offset)
+                for column, field in zip(ring.columns, ring.fields):
+                    column_values = values[field].tolist()
+                    column[offset:offset + split] = column_values[:split]
+                    column[:len(tail) - split] = column_values[split:]
+                ring.count += size
+                last = records[tail[-1]]
+                book = state.book
+                if kind == TRADE:
+                    book.last_price, book.last_size = float(last['price']), float(last['size'])
+                else:
+                    book.bid, book.bid_size = float(last['bid']), float(last['bid_size'])
+                    book.ask, book.ask_size = float(last['ask']), float(last['ask_size'])
+        # Each book's timestamp is that of its instrument's last event of either kind
+        symbols = records['symbol']
+        ids, last_rows = np.unique(symbols[::-1], return_index=True)
+        for symbol, ts in zip(ids.tolist(), records['ts'][len(records) - 1 - last_rows].tolist()):
+            self.states[symbol].book.ts = ts
+        self.counts['trades'] += n_trades
+        self.counts['quotes'] += len(records) - n_trades
+        self.counts['batched'] += len(records)
+
+    def replay_stats(self) -> Dict:
+        """Events replayed, throughput and callback latency percentiles (in microseconds)"""
+        events = self.counts['trades'] + self.counts['quotes']
+        latency = {}
+        if len(self.latencies):
+            samples = np.frombuffer(self.latencies, dtype=np.int64) / 1000
+            p50, p99, p999 = np.percentile(samples, [50, 99, 99.9])
+            latency = {'samples': len(samples), 'mean': samples.mean(), 'p50': p50, 'p99': p99,
+                       'p99.9': p999, 'max': samples.max()}
+        return {
+            'events': events,
+            'trades': self.counts['trades'],
+            'quotes': self.counts['quotes'],
+            'seconds': self.elapsed,
+            'events_per_second': events / self.elapsed if self.elapsed else NAN,
+            'batched_events': self.counts['batched'],
+            'callback_latency_us': latency
+        }
+
+
+class QuoteImbalance(TickStrategy):
+    """
+    Example strategy: go long (short) one unit, crossing the spread, when
+    top-of-book size imbalance exceeds threshold (-threshold) and the
+    spread is at most max_spread; flatten when the imbalance reverts to
+    exit. Positions and cash are kept per instrument, marked at the mid.
+    """
+
+    def __init__(self, threshold: float = 0.6, exit: float = 0.0, max_spread: float = 0.05):
+        self.threshold = threshold
+        self.exit = exit
+        self.max_spread = max_spread
+        self.positions: Dict[int, float] = {}
+        self.cash: Dict[int, float] = {}
+        self.marks: Dict[int, float] = {}
+        self.n_orders = 0
+
+    def on_quote(self, quote: Quote, state: SymbolState):
+        book = state.book
+        depth = quote.bid_size + quote.ask_size
+        imbalance = (quote.bid_size - quote.ask_size) / depth if depth else 0.0
+        position = self.positions.get(quote.symbol, 0.0)
+        target = position
+        if quote.ask - quote.bid <= self.max_spread:
+            if imbalance > self.threshold:
+                target = 1.0
+            elif imbalance < -self.threshold:
+                target = -1.0
+        if (position > 0 and imbalance < self.exit) or (position < 0 and imbalance > -self.exit):
+            target = 0.0
+        if target != position:
+            price = quote.ask if target > position else quote.bid
+            self.cash[quote.symbol] = self.cash.get(quote.symbol, 0.0) - (target - position) * price
+            self.positions[quote.symbol] = target
+            self.n_orders += 1
+        self.marks[quote.symbol] = book.mid
+
+    def on_start(self, engine: 'TickEngine'):
+        if engine.batched and _imbalance_jit is not None:
+            self.on_records(np.zeros(1, dtype=TICK_DTYPE)[:0], engine)  # Compile (or load) the kernel before timing starts
+
+    def on_records(self, records: np.ndarray, engine: 'TickEngine') -> bool:
+        """Run on_quote's logic over a whole chunk in the numba-compiled _imbalance_kernel, when available"""
+        if _imbalance_jit is None:
+            return False
+        # Per-instrument state as arrays indexed by symbol id for the kernel, then back into the dicts
+        n_symbols = int(records['symbol'].max()) + 1 if len(records) else 0
+        positions, cash = np.zeros(n_symbols), np.zeros(n_symbols)
+        marks, ordered = np.full(n_symbols, NAN), np.zeros(n_symbols, dtype=np.bool_)
+        for values, held in ((positions, self.positions), (cash, self.cash), (marks, self.marks)):
+            for symbol, value in held.items():
+                if symbol < n_symbols:
+                    values[symbol] = value
+        self.n_orders += _imbalance_jit(records['kind'], records['symbol'], records['bid'], records['bid_size'],
+                                        records['ask'], records['ask_size'], self.threshold, self.exit,
+                                        self.max_spread, positions, cash, marks, ordered)
+        quoted = np.unique(records['symbol'][records['kind'] == QUOTE]).tolist()
+        for symbol in quoted:
+            self.marks[symbol] = float(marks[symbol])
+        for symbol in np.flatnonzero(ordered).tolist():
+            self.positions[symbol] = float(positions[symbol])
+            self.cash[symbol] = float(cash[symbol])
+        return True
+
+    def pnl(self) -> float:
+        """Cash plus open positions marked at the last mid"""
+        return sum(cash + self.positions.get(symbol, 0.0) * self.marks.get(symbol, 0.0)
+                   for symbol, cash in self.cash.items())
+
+
+def _imbalance_kernel(kind, symbol, bid, bid_size, ask, ask_size, threshold, exit, max_spread,
+                      positions, cash, marks, ordered):
+    """QuoteImbalance.on_quote over every quote of a chunk; returns the number of orders sent"""
+    n_orders = 0
+    for k in range(len(kind)):
+        if kind[k] != QUOTE:
+            continue
+        s = symbol[k]
+        depth = bid_size[k] + ask_size[k]
+        imbalance = (bid_size[k] - ask_size[k]) / depth if depth != 0 else 0.0
+        position = positions[s]
+        target = position
+        if ask[k] - bid[k] <= max_spread:
+            if imbalance > threshold:
+                target = 1.0
+            elif imbalance < -threshold:
+                target = -1.0
+        if (position > 0 and imbalance < exit) or (position < 0 and imbalance > -exit):
+            target = 0.0
+        if target != position:
+            price = ask[k] if target > position else bid[k]
+            cash[s] -= (target - position) * price
+            positions[s] = target
+            ordered[s] = True
+            n_orders += 1
+        marks[s] = (bid[k] + ask[k]) / 2
+    return n_orders
+
+
+_imbalance_jit = njit(cache=True, nogil=True)(_imbalance_kernel) if njit is not None else None
+
+
+def synthetic_ticks(n_events: int, n_symbols: int = 1, trade_ratio: float = 0.2, seed: int = 0,
+                    start: str = '2024-01-02 14:30', mean_gap_us: float = 200.0) -> np.ndarray:
+    """
+    Deterministic random-walk ticks for benchmarks and tests: quotes a
+    cent or two wide around a mid moving in cent steps, with trades at
+    the bid or ask, exponential inter-arrival times
+    """
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(n_events, dtype=TICK_DTYPE)
+    gaps = rng.exponential(mean_gap_us * 1000, n_events).astype(np.int64) + 1
+    ticks['ts'] = np.datetime64(start, 'ns').astype(np.int64) + np.cumsum(gaps)
+    symbols = rng.integers(0, n_symbols, n_events)
+    ticks['symbol'] = symbols
+    is_trade = rng.random(n_events) < trade_ratio
+    ticks['kind'] = np.where(is_trade, TRADE, QUOTE)
+
+    # Independent cent-step walk per instrument, around a price of its own
+    steps = rng.choice([-0.01, 0.0, 0.01], n_events, p=[0.25, 0.5, 0.25])
+    mid = np.empty(n_events)
+    for symbol in range(n_symbols):
+        rows = symbols == symbol
+        mid[rows] = 50 + 10 * symbol + np.cumsum(steps[rows])
+    half_spread = rng.choice([0.005, 0.01], n_events, p=[0.7, 0.3])
+    ticks['bid'] = np.round(mid - half_spread, 2)
+    ticks['ask'] = np.round(mid + half_spread, 2)
+    ticks['bid_size'] = rng.integers(1, 20, n_events) * 100
+    ticks['ask_size'] = rng.integers(1, 20, n_events) * 100
+    side = np.where(rng.random(n_events) < 0.5, 1, -1)
+    ticks['side'] = np.where(is_trade, side, 0)
+    ticks['price'] = np.where(is_trade, np.where(side > 0, ticks['ask'], ticks['bid']), NAN)
+    ticks['size'] = np.where(is_trade, rng.integers(1, 10, n_events) * 100, 0)
+    # Trade records carry no quote
+    for field in ('bid', 'bid_size', 'ask', 'ask_size'):
+        ticks[field][is_trade] = NAN
+    return ticks
+
+
+def save_ticks(path: str, ticks: np.ndarray, symbols: List[str] = None) -> str:
+    """
+    Write ticks as a .npy file, memory-mappable by load_ticks, with the
+    symbol names (index = symbol id) in a JSON sidecar. Returns the file's
+    path, which np.save gives a .npy extension.
+    """
+    path = _npy_path(path)
+    np.save(path, np.ascontiguousarray(ticks, dtype=TICK_DTYPE))
+    if symbols is not None:
+        with open(f"{path}.symbols.json", 'w') as f:
+            json.dump(list(symbols), f)
+    return path
+
+
+def load_ticks(path: str) -> Tuple[np.ndarray, Optional[List[str]]]:
+    """
+    Memory-map a tick file: .npy from save_ticks, or raw TICK_DTYPE
+    records (any other extension). Returns the records and symbol names
+    if known. Pages are read from disk as the replay reaches them.
+    """
+    if not os.path.exists(path) and os.path.exists(_npy_path(path)):
+        path = _npy_path(path)  # Saved by save_ticks under a name without the extension
+    if path.endswith('.npy'):
+        ticks = np.load(path, mmap_mode='r')
+        if ticks.dtype != TICK_DTYPE:
+            raise ValueError(f"{path} does not hold tick records: {ticks.dtype}")
+    else:
+        ticks = np.memmap(path, dtype=TICK_DTYPE, mode='r')
+    symbols = None
+    if os.path.exists(f"{path}.symbols.json"):
+        with open(f"{path}.symbols.json") as f:
+            symbols = json.load(f)
+    return ticks, symbols
+
+
+def read_csv_ticks(path: str, chunksize: int = 1_000_000, symbols: List[str] = None) -> Iterator[np.ndarray]:
+    """
+    Stream a CSV of ticks as TICK_DTYPE chunks. Columns: ts (epoch
+    nanoseconds or a datetime), symbol, kind ('trade'/'quote' or 'T'/'Q'),
+    then price, size, side for trades and bid, bid_size, ask, ask_size for
+    quotes (missing columns are NaN). Symbol names are mapped to ids in
+    the order first seen, appended to the symbols list if one is given.
+    """
+    import pandas as pd
+
+    symbols = symbols if symbols is not None else []
+    ids = {symbol: i for i, symbol in enumerate(symbols)}
+    for frame in pd.read_csv(path, chunksize=chunksize):
+        ticks = np.zeros(len(frame), dtype=TICK_DTYPE)
+        ts = frame['ts']
+        ticks['ts'] = ts.to_numpy(np.int64) if pd.api.types.is_integer_dtype(ts) else \
+            pd.to_datetime(ts).to_numpy('datetime64[ns]').astype(np.int64)
+        names = frame['symbol'].astype(str) if 'symbol' in frame else pd.Series('', index=frame.index)
+        for name in names.unique():
+            if name not in ids:
+                ids[name] = len(symbols)
+                symbols.append(name)
+        ticks['symbol'] = names.map(ids).to_numpy()
+        kind = frame['kind'].astype(str).str.upper().str[0]
+        ticks['kind'] = np.where(kind == 'T', TRADE, QUOTE)
+        for field in ('price', 'size', 'bid', 'bid_size', 'ask', 'ask_size'):
+            ticks[field] = frame[field].to_numpy(np.float64) if field in frame else NAN
+        if 'side' in frame:
+            ticks['side'] = frame['side'].fillna(0).to_numpy(np.int8)
+        yield ticks
+
+
 class HFT:
-    def __init__(self, data):
+    """
+    Tick-level strategy runner: replays data (a TICK_DTYPE array, a tick
+    file or a CSV) through a TickStrategy, QuoteImbalance by default
+    """
+
+    def __init__(self, data, strategy: TickStrategy = None, pace: float = None, **engine_options):
         self.data = data
+        self.strategy = strategy or QuoteImbalance()
+        self.pace = pace
+        self.engine = TickEngine(self.strategy, **engine_options)
+        self.stats = None
+
+    def execute(self) -> Dict:
+        ticks = self.data
+        if isinstance(ticks, str):
+            ticks = read_csv_ticks(ticks) if ticks.endswith('.csv') else load_ticks(ticks)[0]
+        self.stats = self.engine.replay(ticks, pace=self.pace)
+        return self.stats
+
 
-    def execute(self):
-        # Placeholder for HFT logic
-        pass 
\ No newline at end of file
+def _npy_path(path: str) -> str:
+    return path if path.endswith('.npy') else f"{path}.npy"
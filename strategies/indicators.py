@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling mean down the time axis of a (dates x tickers) array.
+    Like pandas' rolling(window).mean(), a window containing NaN is NaN.
+    """
+    valid = np.isfinite(values)
+    filled = np.where(valid, values, 0.0)
+    sums = _window_sum(filled, window)
+    counts = _window_sum(valid.astype(np.float64), window)
+    return np.where(counts == window, sums / window, np.nan)
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """Rolling sample standard deviation, NaN for windows with missing values"""
+    valid = np.isfinite(values)
+    # Center each column first to limit cancellation in the sum of squares
+    with np.errstate(invalid='ignore', divide='ignore'):
+        center = np.where(valid, values, 0.0).sum(axis=0) / valid.sum(axis=0)
+    centered = np.where(valid, values - np.nan_to_num(center), 0.0)
+    sums = _window_sum(centered, window)
+    squares = _window_sum(centered ** 2, window)
+    counts = _window_sum(valid.astype(np.float64), window)
+    variance = (squares - sums ** 2 / window) / (window - ddof)
+    return np.where(counts == window, np.sqrt(np.maximum(variance, 0.0)), np.nan)
+
+
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponentially weighted mean matching pandas' ewm(span=span).mean()
+    (adjust=True, ignore_na=False), computed as two IIR filters.
+    """
+    from scipy.signal import lfilter  # Slow to import, so only loaded once indicators are computed
+
+    decay = 1 - 2 / (span + 1)
+    valid = np.isfinite(values)
+    numerator = lfilter([1.0], [1.0, -decay], np.where(valid, values, 0.0), axis=0)
+    denominator = lfilter([1.0], [1.0, -decay], valid.astype(np.float64), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def _window_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window sums via a cumulative sum, NaN before the first full window"""
+    cumulative = np.cumsum(values, axis=0)
+    sums = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return sums
+    sums[window - 1] = cumulative[window - 1]
+    sums[window:] = cumulative[window:] - cumulative[:-window]
+    return sums
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry the last valid value of each column forward over NaN gaps"""
+    valid = np.isfinite(values)
+    rows = np.where(valid, np.arange(len(values))[:, None], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = values[rows, np.arange(values.shape[1])]
+    return np.where(valid | (np.cumsum(valid, axis=0) > 0), filled, np.nan)
+
+
+def _gap_order(traded: np.ndarray):
+    """
+    Row order moving each column's traded rows to the top, keeping their
+    order, or None when no column has a gap between its first and last
+    traded rows
+    """
+    started = np.maximum.accumulate(traded, axis=0)
+    continues = np.maximum.accumulate(traded[::-1], axis=0)[::-1]
+    if not (started & continues & ~traded).any():
+        return None
+    return np.argsort(~traded, axis=0, kind='stable')
+
+
+def _restore(values: np.ndarray, order: np.ndarray, traded: np.ndarray) -> np.ndarray:
+    """Put rows computed in _gap_order back on the calendar, blank where the ticker did not trade"""
+    restored = np.empty_like(values)
+    np.put_along_axis(restored, order, values, axis=0)
+    restored[~traded] = False if values.dtype == bool else np.nan
+    return restored
+
+
+class IndicatorEngine:
+    """
+    Computes the scanner's technical indicators for a whole universe at once
+    on (dates x tickers) arrays aligned on a common calendar. Dates a ticker
+    did not trade are NaN and are masked out of every per-ticker metric.
+    Like the per-ticker calculation, which drops those dates first, the
+    rolling windows of a ticker with a missing bar span the gap.
+    """
+
+    def __init__(self, sma_windows=(20, 50, 200), rsi_period: int = 14,
+                 volatility_window: int = 20, volume_window: int = 20):
+        self.sma_windows = sma_windows
+        self.rsi_period = rsi_period
+        self.volatility_window = volatility_window
+        self.volume_window = volume_window
+
+    def compute(self, close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Calculate technical indicators on (dates x tickers) arrays.
+        Returns one array per indicator plus a 'valid' mask marking the rows
+        that StockScanner.calculate_technical_indicators would keep after dropna.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        traded = np.isfinite(close)
+        # Tickers with interior gaps are computed on their traded rows only, then put back on the calendar
+        order = _gap_order(traded)
+        if order is None:
+            return self._compute(close, volume)
+        indicators = self._compute(np.take_along_axis(close, order, axis=0),
+                                   np.take_along_axis(volume, order, axis=0))
+        return {name: _restore(values, order, traded) for name, values in indicators.items()}
+
+    def _compute(self, close: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+        """Indicators of arrays whose traded rows are contiguous in each column"""
+        traded = np.isfinite(close)
+        indicators = {}
+
+        # Price-based indicators
+        for window in self.sma_windows:
+            indicators[f'SMA_{window}'] = rolling_mean(close, window)
+
+        # Momentum
+        delta = np.full(close.shape, np.nan)
+        delta[1:] = close[1:] - close[:-1]
+        gain = rolling_mean(np.where(delta > 0, delta, 0.0), self.rsi_period)
+        loss = rolling_mean(np.where(delta < 0, -delta, 0.0), self.rsi_period)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            indicators['RSI'] = 100 - 100 / (1 + gain / loss)
+        indicators['MACD'] = ewm_mean(close, 12) - ewm_mean(close, 26)
+
+        # Volatility
+        daily_return = np.full(close.shape, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily_return[1:] = close[1:] / close[:-1] - 1
+        indicators['Daily_Return'] = daily_return
+        indicators['Volatility'] = rolling_std(daily_return, self.volatility_window)
+
+        # Volume
+        indicators['Volume_MA'] = rolling_mean(volume, self.volume_window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            indicators['Volume_Ratio'] = volume / indicators['Volume_MA']
+
+        valid = traded & np.isfinite(volume)
+        for values in indicators.values():
+            valid &= np.isfinite(values)
+        indicators['Close'] = close
+        indicators['Volume'] = volume
+        indicators['valid'] = valid
+        return indicators
+
+    def compute_panel(self, panel: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Calculate indicators for a DataProvider panel"""
+        return self.compute(panel['Close'].to_numpy(dtype=np.float64),
+                            panel['Volume'].to_numpy(dtype=np.float64))
+
+    def summarize(self, indicators: Dict[str, np.ndarray], lookback: int = 20) -> Dict[str, np.ndarray]:
+        """
+        Reduce indicator arrays to the scanner's per-ticker metrics, one
+        value per ticker, using only each ticker's valid rows.
+        """
+        valid = indicators['valid']
+        close = indicators['Close']
+        n_tickers = close.shape[1]
+        columns = np.arange(n_tickers)
+        n_obs = valid.sum(axis=0)
+
+        # Annualized risk/return over valid daily returns
+        returns = np.where(valid, indicators['Daily_Return'], 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = returns.sum(axis=0) / n_obs
+            variance = (np.where(valid, indicators['Daily_Return'] - mean, 0.0) ** 2).sum(axis=0) / (n_obs - 1)
+        annualized_return = mean * 252
+        annualized_vol = np.sqrt(variance) * np.sqrt(252)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sharpe_ratio = np.where(annualized_vol != 0, annualized_return / annualized_vol, 0.0)
+
+        # Last valid row and the row `lookback` valid rows before it
+        rank = np.cumsum(valid, axis=0)
+        last_row = np.where(n_obs > 0, len(valid) - 1 - np.argmax(valid[::-1], axis=0), 0)
+        start_row = np.argmax(valid & (rank == (n_obs - lookback + 1)), axis=0)
+        has_lookback = n_obs >= lookback
+
+        current_price = np.where(n_obs > 0, close[last_row, columns], np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            trend_strength = np.where(has_lookback, (current_price / close[start_row, columns] - 1) * 100, np.nan)
+
+        return {
+            'n_bars': np.isfinite(close).sum(axis=0),
+            'n_obs': n_obs,
+            'sharpe_ratio': np.where(n_obs > 1, sharpe_ratio, np.nan),
+            'trend_strength': trend_strength,
+            'momentum': np.where(n_obs > 0, indicators['RSI'][last_row, columns], np.nan),
+            'volume_strength': np.where(n_obs > 0, indicators['Volume_Ratio'][last_row, columns], np.nan),
+            'current_price': current_price,
+            'monthly_return': trend_strength
+        }
+
+
+def metrics_for(summary: Dict[str, np.ndarray], column: int) -> Dict[str, float]:
+    """Per-ticker metrics dict for one column of an IndicatorEngine summary"""
+    return {name: float(values[column]) for name, values in summary.items()
+            if not name.startswith('n_')}
+
+
+def valid_closes(indicators: Dict[str, np.ndarray], column: int) -> np.ndarray:
+    """Closing prices of one ticker on its valid (post-dropna) rows"""
+    return indicators['Close'][indicators['valid'][:, column], column]
+
+
+def panel_symbols(panel: pd.DataFrame) -> List[str]:
+    """Tickers of a DataProvider panel in column order"""
+    return list(panel['Close'].columns)
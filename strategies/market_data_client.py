@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+YAHOO_CHART_URL = "https://query2.finance.yahoo.com/v8/finance/chart"
+
+
+class TokenBucket:
+    """
+    Rate limiter allowing rate requests per second on average and bursts of
+    up to capacity. Safe to share between threads and event loops: the lock
+    only guards the token count, waiting happens in asyncio.sleep.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available. Returns 0, or the seconds until one will be."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+def parse_chart(payload: Dict) -> pd.DataFrame:
+    """
+    Daily OHLCV bars from a Yahoo Finance v8 chart response, adjusted for
+    splits and dividends like yfinance's auto_adjust. Raises ValueError on a
+    malformed payload.
+    """
+    try:
+        result = payload['chart']['result']
+        if not result:
+            return pd.DataFrame()
+        result = result[0]
+        timestamps = result.get('timestamp') or []
+        if not timestamps:
+            return pd.DataFrame()
+        quote_data = result['indicators']['quote'][0]
+        offset = result.get('meta', {}).get('gmtoffset', 0)
+        # Bars are stamped at the session open; keep the calendar date, as the other providers do
+        index = pd.to_datetime(np.asarray(timestamps, dtype=np.int64) + offset, unit='s').normalize().rename('Date')
+        data = pd.DataFrame({
+            'Open': quote_data['open'],
+            'High': quote_data['high'],
+            'Low': quote_data['low'],
+            'Close': quote_data['close'],
+            'Volume': quote_data['volume']
+        }, index=index, dtype=np.float64)
+        adjclose = result['indicators'].get('adjclose')
+    except (KeyError, IndexError, TypeError) as e:
+        raise ValueError(f"Malformed chart response: {e!r}") from e
+
+    if adjclose:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = np.asarray(adjclose[0]['adjclose'], dtype=np.float64) / data['Close'].to_numpy()
+        data[['Open', 'High', 'Low', 'Close']] = data[['Open', 'High', 'Low', 'Close']].mul(ratio, axis=0)
+    return data.dropna(subset=['Close'])
+
+
+class MarketDataClient:
+    """
+    Asyncio client for daily bars over HTTP (the Yahoo Finance chart API by
+    default, or any server speaking it). One pooled aiohttp session lives on
+    a private event loop thread, so every caller, including concurrent
+    pipeline fetch threads, shares its connections, the token-bucket rate
+    limit and the max_concurrency bound on requests in flight. Throttled
+    (429), failed (5xx) and timed-out requests are retried up to
+    max_retries times with full-jitter exponential backoff, honouring
+    Retry-After. Tickers that still fail are reported with a reason.
+    """
+
+    def __init__(self, base_url: str = YAHOO_CHART_URL, max_concurrency: int = 16, rate: float = 20.0,
+                 burst: float = None, max_retries: int = 4, backoff: float = 0.5, max_backoff: float = 10.0,
+                 timeout: float = 15.0, headers: Dict[str, str] = None):
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.limiter = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.headers = headers or {'User-Agent': 'Mozilla/5.0'}
+        self.stats = {'requests': 0, 'retries': 0}
+        self._lock = threading.Lock()
+        # Event loop, its thread and the pooled session, released by close() or when the client is collected
+        self._state = {'loop': None, 'thread': None, 'session': None}
+        self._semaphore = None
+        self._finalizer = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._state['loop'] is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='market-data', daemon=True)
+                thread.start()
+                self._state.update(loop=loop, thread=thread, session=None)
+                self._finalizer = weakref.finalize(self, _shutdown, self._state)
+            return self._state['loop']
+
+    def _get_session(self):
+        # Only called on the client's loop thread
+        import aiohttp
+
+        if self._state['session'] is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300, keepalive_timeout=30)
+            self._state['session'] = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                           timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._state['session']
+
+    def fetch(self, symbols: List[str], start: datetime,
+              end: datetime) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Daily bars in [start, end) for many tickers, fetched concurrently.
+        Returns the frames of the tickers that succeeded and the failure
+        reason of the others ('rate_limited', 'server_error', 'timeout',
+        'connection_error', 'not_found', 'no_data', 'bad_response', 'http_<status>').
+        """
+        future = asyncio.run_coroutine_threadsafe(self._fetch_many(symbols, start, end), self._ensure_loop())
+        return future.result()
+
+    async def _fetch_many(self, symbols: List[str], start: datetime, end: datetime):
+        session = self._get_session()
+        outcomes = await asyncio.gather(*(self._fetch_symbol(session, symbol, start, end) for symbol in symbols))
+        frames, failures = {}, {}
+        for symbol, (data, reason) in zip(symbols, outcomes):
+            if reason is None:
+                frames[symbol] = data
+            else:
+                failures[symbol] = reason
+        return frames, failures
+
+    async def _fetch_symbol(self, session, symbol: str, start: datetime,
+                            end: datetime) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        import aiohttp
+
+        url = f"{self.base_url}/{quote(symbol, safe='')}"
+        params = {'period1': int(pd.Timestamp(start).timestamp()), 'period2': int(pd.Timestamp(end).timestamp()),
+                  'interval': '1d', 'events': 'div,splits', 'includeAdjustedClose': 'true'}
+        reason = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            await self.limiter.acquire()
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    async with session.get(url, params=params) as response:
+                        if response.status == 200:
+                            data = parse_chart(await response.json(content_type=None))
+                            return (data, None) if not data.empty else (None, 'no_data')
+                        await response.read()  # Drain the body so the connection goes back to the pool
+                        if response.status == 404:
+                            return None, 'not_found'
+                        if response.status == 429:
+                            reason = 'rate_limited'
+                            retry_after = _retry_after(response.headers.get('Retry-After'))
+                        elif response.status >= 500:
+                            reason = 'server_error'
+                        else:
+                            return None, f'http_{response.status}'
+            except asyncio.TimeoutError:
+                reason = 'timeout'
+            except aiohttp.ClientError:
+                reason = 'connection_error'
+            except ValueError:
+                return None, 'bad_response'
+
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                # Full jitter, so throttled requests do not come back in lockstep
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                await asyncio.sleep(max(delay, retry_after or 0))
+        return None, reason
+
+    def close(self):
+        """Close the pooled session and stop the client's event loop"""
+        with self._lock:
+            if self._finalizer is not None:
+                self._finalizer()
+
+
+def _shutdown(state: Dict):
+    loop = state['loop']
+    if loop is None or loop.is_closed():
+        return
+    if state['session'] is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(state['session'].close(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    state['thread'].join(timeout=5)
+    loop.close()
+    state.update(loop=None, thread=None, session=None)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given in seconds"""
+    try:
+        return max(float(value), 0.0) if value is not None else None
+    except ValueError:
+        return None
@@ -4,19 +4,26 @@ import pandas as pd
 import numpy as np
 
 class MeanReversion(BaseStrategy):
-    def __init__(self, data, mean_window=20, entry_std=2.0):
-        super().__init__(data)
+    def __init__(self, data, mean_window=20, entry_std=2.0, features=None, registry=None):
+        super().__init__(data, features)
         self.mean_window = mean_window
         self.entry_std = entry_std
         self.stop_loss = 0.02
         self.take_profit = 0.03
-        self.predictor = StockPredictor()
-        self.predictor.train(data)  # Train the model on initialization
+        self.registry = registry  # ModelRegistry for fitted predictors, the default one if None
+        self._predictor = None
+        
+    @property
+    def predictor(self):
+        """ML model for this data, fitted (or loaded from the registry) on first use"""
+        if self._predictor is None:
+            self._predictor = StockPredictor.load_or_train(self.data, self.registry)
+        return self._predictor
         
     def execute(self):
         # Calculate mean and standard deviation
-        self.data['mean'] = self.data['close'].rolling(window=self.mean_window).mean()
-        self.data['std'] = self.data['close'].rolling(window=self.mean_window).std()
+        self.data['mean'] = self.features.rolling_mean('close', self.mean_window)
+        self.data['std'] = self.features.rolling_std('close', self.mean_window)
         
         # Generate signals using the machine learning model
         self.data['signal'] = self.predictor.predict(self.data)
@@ -29,31 +36,12 @@ class MeanReversion(BaseStrategy):
     
     def apply_risk_management(self):
         """Apply position sizing and risk management"""
-        position = 0
-        entry_price = 0
-        self.positions = [0] * len(self.data)  # Initialize positions list with zeros
-        
-        for i in range(len(self.data)):
-            if position == 0:
-                if self.data['signal'].iloc[i] == 1:
-                    position = 1
-                    entry_price = self.data['close'].iloc[i]
-                elif self.data['signal'].iloc[i] == -1:
-                    position = -1
-                    entry_price = self.data['close'].iloc[i]
-            else:
-                current_price = self.data['close'].iloc[i]
-                pnl = abs((current_price - entry_price) / entry_price)
-                
-                if pnl >= self.take_profit or pnl <= -self.stop_loss:
-                    position = 0
-                    
-            self.positions[i] = position  # Update position at index i instead of appending
+        self.apply_position_rules(stop_loss=self.stop_loss, take_profit=self.take_profit, absolute_pnl=True)
     
     def calculate_portfolio_value(self):
         """Calculate the portfolio value over time"""
         position_series = pd.Series(self.positions)
-        price_changes = self.data['close'].pct_change()
+        price_changes = self.features.pct_change('close')
         strategy_returns = position_series.shift(1) * price_changes
         
         portfolio_value = self.initial_capital * (1 + strategy_returns).cumprod()
@@ -1,34 +1,206 @@
+import copy
+import time
+from contextlib import contextmanager
+from typing import Dict
 import pandas as pd
 import numpy as np
+from joblib import Parallel, delayed
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
+from .model_registry import ModelRegistry, default_registry
+
+FEATURES = ['close', 'volume']
+
+
+def _fit_fold(model, X, y, train_start, train_end, test_end):
+    """Fit one walk-forward fold and predict its out-of-sample bars"""
+    model.fit(X[train_start:train_end], y[train_start:train_end])
+    return model.predict(X[train_end:test_end])
+
+
+def _train_symbol(predictor, data):
+    predictor.train(data)
+    return predictor
+
 
 class StockPredictor:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+    def __init__(self, n_estimators=100, random_state=42, n_jobs=None):
+        self.n_estimators = n_estimators
+        self.random_state = random_state
+        self.n_jobs = n_jobs  # Cores used to fit and query the forest (None: one, -1: all)
+        self.model = RandomForestClassifier(n_estimators=n_estimators, random_state=random_state, n_jobs=n_jobs)
+        self.timings = {}  # Seconds spent per stage by the last calls
 
-    def prepare_data(self, data):
-        """Prepare data for training the model"""
-        data['returns'] = data['close'].pct_change()
+    @property
+    def params(self):
+        """Hyperparameters identifying the model in a ModelRegistry"""
+        return {'model': type(self).__name__, 'n_estimators': self.n_estimators,
+                'random_state': self.random_state}
+
+    @classmethod
+    def load_or_train(cls, data, registry: ModelRegistry = None, **params):
+        """
+        Predictor for a training window, loaded from the model registry when
+        it was already fitted, warm-started when the window only gained new
+        bars, and trained from scratch otherwise
+        """
+        registry = registry if registry is not None else default_registry()
+
+        def train(window):
+            predictor = cls(**params)
+            predictor.train(window)
+            return predictor
+
+        return registry.get_or_train(data, cls(**params).params, train,
+                                     update=lambda predictor, window, n_new: predictor.update(window, n_new))
+
+    @classmethod
+    def train_many(cls, frames: Dict[str, pd.DataFrame], n_jobs=-1, registry: ModelRegistry = None,
+                   **params) -> Dict[str, 'StockPredictor']:
+        """
+        Fit one predictor per ticker, n_jobs tickers at a time. With a
+        registry, already fitted windows are loaded and only the others
+        are trained (and then persisted).
+        """
+        predictors = {}
+        if registry is not None:
+            for symbol, data in frames.items():
+                model = registry.get(registry.key(data, cls(**params).params, FEATURES))
+                if model is not None:
+                    predictors[symbol] = model
+
+        missing = [symbol for symbol in frames if symbol not in predictors]
+        # Parallelism is across tickers, so each forest is fitted on one core
+        fitted = Parallel(n_jobs=n_jobs)(
+            delayed(_train_symbol)(cls(**{**params, 'n_jobs': None}), frames[symbol]) for symbol in missing)
+        for symbol, predictor in zip(missing, fitted):
+            predictors[symbol] = predictor
+            if registry is not None:
+                registry.put(registry.key(frames[symbol], predictor.params, FEATURES),
+                             predictor, frames[symbol], predictor.params)
+        return predictors
+
+    @contextmanager
+    def _stage(self, name):
+        """Record the wall-clock time of a stage in self.timings"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def features_and_target(self, data):
+        """Features and next-day direction target on the rows kept for training"""
+        data = data.assign(returns=data['close'].pct_change())
         data['target'] = np.where(data['returns'].shift(-1) > 0, 1, 0)  # 1 if next day return is positive, else 0
-        data.dropna(inplace=True)
+        data = data.dropna()
 
-        features = data[['close', 'volume']]
-        target = data['target']
+        return data[FEATURES], data['target']
 
+    def prepare_data(self, data):
+        """Prepare data for training the model (the caller's frame is left untouched)"""
+        features, target = self.features_and_target(data)
         return train_test_split(features, target, test_size=0.2, random_state=42)
 
     def train(self, data):
         """Train the model on historical data"""
-        X_train, X_test, y_train, y_test = self.prepare_data(data)
-        self.model.fit(X_train, y_train)
+        with self._stage('prepare'):
+            X_train, X_test, y_train, y_test = self.prepare_data(data)
+        with self._stage('fit'):
+            self.model.fit(X_train, y_train)
 
         # Evaluate the model
-        predictions = self.model.predict(X_test)
-        accuracy = accuracy_score(y_test, predictions)
+        with self._stage('evaluate'):
+            predictions = self.model.predict(X_test)
+            accuracy = accuracy_score(y_test, predictions)
         print(f"Model accuracy: {accuracy:.2f}")
 
+    def walk_forward(self, data, train_window=252, test_window=21, expanding=False, n_jobs=None):
+        """
+        Walk-forward training: fit on train_window bars (every bar so far
+        when expanding), predict the next test_window bars, then step
+        forward by test_window. Folds are fitted n_jobs at a time, and the
+        predictor keeps a model fitted on the last window for predict.
+
+        Returns the per-fold accuracy, the out-of-sample predictions and
+        the time spent per stage.
+        """
+        with self._stage('prepare'):
+            features, target = self.features_and_target(data)
+            X = features.to_numpy(dtype=np.float64)
+            y = target.to_numpy()
+            n = len(X)
+            folds = [(0 if expanding else start - train_window, start, min(start + test_window, n))
+                     for start in range(train_window, n, test_window)]
+
+        # Parallelism is across folds, so each forest is fitted on one core
+        with self._stage('fit'):
+            fold_predictions = Parallel(n_jobs=n_jobs)(
+                delayed(_fit_fold)(RandomForestClassifier(n_estimators=self.n_estimators,
+                                                          random_state=self.random_state), X, y, *fold)
+                for fold in folds)
+
+        with self._stage('final_fit'):
+            final_start = 0 if expanding else max(0, n - train_window)
+            self.model.fit(features.iloc[final_start:], target.iloc[final_start:])
+
+        with self._stage('evaluate'):
+            rows = []
+            for (train_start, train_end, test_end), predictions in zip(folds, fold_predictions):
+                rows.append({
+                    'train_start': features.index[train_start],
+                    'train_end': features.index[train_end - 1],
+                    'test_start': features.index[train_end],
+                    'test_end': features.index[test_end - 1],
+                    'accuracy': accuracy_score(y[train_end:test_end], predictions)
+                })
+            out_of_sample = pd.Series(np.concatenate(fold_predictions) if folds else np.array([], dtype=int),
+                                      index=features.index[train_window:n] if folds else features.index[:0])
+            accuracy = accuracy_score(y[train_window:], out_of_sample) if folds else np.nan
+
+        return {
+            'folds': pd.DataFrame(rows),
+            'predictions': out_of_sample,
+            'accuracy': accuracy,
+            'timings': dict(self.timings)
+        }
+
     def predict(self, data):
         """Make predictions on new data"""
-        return self.model.predict(data[['close', 'volume']]) 
\ No newline at end of file
+        return self.model.predict(data[FEATURES])
+
+    def predict_batch(self, frames: Dict[str, pd.DataFrame], last_only=False) -> Dict[str, np.ndarray]:
+        """
+        Score many tickers with one predict call on a stacked feature matrix
+        (only each ticker's last bar when last_only). Returns the
+        predictions per ticker; stage timings are left in self.timings.
+        """
+        with self._stage('stack'):
+            blocks = [data[FEATURES].iloc[-1:] if last_only else data[FEATURES] for data in frames.values()]
+            lengths = [len(block) for block in blocks]
+            stacked = pd.concat(blocks) if blocks else pd.DataFrame(columns=FEATURES)
+        with self._stage('predict'):
+            predictions = self.model.predict(stacked) if len(stacked) else np.array([])
+        with self._stage('split'):
+            return dict(zip(frames, np.split(predictions, np.cumsum(lengths)[:-1])))
+
+    def update(self, data, n_new):
+        """
+        Warm-start on a training window extended by n_new bars: keep the
+        forest but replace its oldest trees, in proportion to the new bars,
+        with trees fitted on the whole window. Returns a new predictor.
+        """
+        predictor = copy.deepcopy(self)
+        n_trees = min(self.n_estimators, max(1, round(self.n_estimators * n_new / len(data))))
+        if n_trees == self.n_estimators:
+            predictor.train(data)
+            return predictor
+
+        X_train, X_test, y_train, y_test = predictor.prepare_data(data)
+        model = predictor.model
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_trees)
+        model.fit(X_train, y_train)
+        model.estimators_ = model.estimators_[n_trees:]
+        model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+        return predictor
@@ -0,0 +1,256 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: the index is then only locked between threads
+    fcntl = None
+
+DEFAULT_MODEL_DIR = os.path.join('data', 'models')
+INDEX_FILE = '_index.json'
+INDEX_LOCK_FILE = '_index.lock'
+USED_FLUSH_INTERVAL = 30.0  # Seconds between index writes that only record models being read
+
+
+def data_fingerprint(data: pd.DataFrame, columns: Sequence[str] = ('close', 'volume')) -> str:
+    """Hash of a training window: its dates and the values of the model's input columns"""
+    digest = hashlib.sha1()
+    digest.update(np.asarray(pd.DatetimeIndex(data.index).asi8).tobytes())
+    for column in columns:
+        digest.update(column.encode())
+        digest.update(np.ascontiguousarray(data[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def params_fingerprint(params: Dict) -> str:
+    """Hash of a model's hyperparameters"""
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock on a lock file, held across processes where fcntl is available"""
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ModelRegistry:
+    """
+    Persistent cache of fitted models keyed by a hash of the training window
+    and the hyperparameters. Models are stored with joblib, one file per key,
+    loaded lazily, and kept in a small in-memory LRU. The on-disk index
+    remembers each window's first date and length so that a window extended
+    with new bars can warm-start from the model of its prefix. The least
+    recently used models are evicted once max_models or max_bytes is exceeded.
+
+    Several processes (e.g. joblib workers) can share a registry: every
+    index write re-reads the on-disk index and merges into it under a file
+    lock. Reads of stored models are recorded in the index in batches, at
+    most every USED_FLUSH_INTERVAL seconds, on the next put or on flush().
+    """
+
+    def __init__(self, root: str = DEFAULT_MODEL_DIR, max_models: int = 256,
+                 max_bytes: int = 2 * 1024 ** 3, max_loaded: int = 16):
+        self.root = root
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.max_loaded = max_loaded
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()
+        os.makedirs(self.root, exist_ok=True)
+        self._index = self._load_index()
+        self._used: Dict[str, float] = {}  # last_used of models read since the index was last written
+        self._flushed = time.monotonic()
+
+    def __getstate__(self):
+        # Other processes get the same on-disk registry, and read its index and models themselves
+        state = self.__dict__.copy()
+        for name in ('_lock', '_loaded', '_index', '_used', '_flushed'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()
+        self._index = self._load_index()
+        self._used = {}
+        self._flushed = time.monotonic()
+
+    def _index_path(self) -> str:
+        return os.path.join(self.root, INDEX_FILE)
+
+    def _load_index(self) -> Dict[str, Dict]:
+        path = self._index_path()
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_index(self):
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self._index_path())
+
+    def _write_index(self, entries: Dict[str, Dict] = None):
+        """
+        Merge new entries and pending reads into the current on-disk index,
+        evict and save it, all under the index file lock (and self._lock)
+        """
+        with _file_lock(os.path.join(self.root, INDEX_LOCK_FILE)):
+            index = self._load_index()
+            for key, last_used in self._used.items():
+                if key in index:
+                    index[key]['last_used'] = max(index[key]['last_used'], last_used)
+            index.update(entries or {})
+            self._index = index
+            self._evict()
+            self._save_index()
+        self._used.clear()
+        self._flushed = time.monotonic()
+
+    def flush(self):
+        """Record the models read since the last index write"""
+        with self._lock:
+            if self._used:
+                self._write_index()
+
+    def path(self, key: str) -> str:
+        """Path of the joblib file holding a model"""
+        return os.path.join(self.root, f"{key}.joblib")
+
+    def key(self, data: pd.DataFrame, params: Dict, columns: Sequence[str] = ('close', 'volume')) -> str:
+        return hashlib.sha1((data_fingerprint(data, columns) + params_fingerprint(params)).encode()).hexdigest()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._loaded or (key in self._index and os.path.exists(self.path(key)))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str):
+        """Fitted model for a key, loaded from disk on first use, or None"""
+        import joblib
+
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                model = self._loaded[key]
+            elif key in self._index and os.path.exists(self.path(key)):
+                try:
+                    model = joblib.load(self.path(key))
+                except FileNotFoundError:
+                    return None  # Evicted by another process meanwhile
+                self._remember(key, model)
+            else:
+                return None
+            if key in self._index:
+                self._index[key]['last_used'] = self._used[key] = time.time()
+                if time.monotonic() - self._flushed > USED_FLUSH_INTERVAL:
+                    self._write_index()
+            return model
+
+    def put(self, key: str, model, data: pd.DataFrame = None, params: Dict = None):
+        """Persist a fitted model, recording its window for warm starts"""
+        import joblib
+
+        tmp_path = f"{self.path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, self.path(key))
+        entry = {'size': os.path.getsize(self.path(key)), 'last_used': time.time()}
+        if data is not None and len(data):
+            entry.update(start=pd.Timestamp(data.index[0]).isoformat(), n_rows=len(data))
+        if params is not None:
+            entry['params'] = params_fingerprint(params)
+
+        with self._lock:
+            self._remember(key, model)
+            self._write_index({key: entry})
+
+    def _remember(self, key: str, model):
+        self._loaded[key] = model
+        self._loaded.move_to_end(key)
+        while len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+
+    def _evict(self):
+        """Drop least recently used models beyond the count and size budgets"""
+        by_age = sorted(self._index, key=lambda k: self._index[k]['last_used'])
+        total = sum(entry['size'] for entry in self._index.values())
+        while by_age and (len(self._index) > self.max_models or total > self.max_bytes):
+            key = by_age.pop(0)
+            total -= self._index.pop(key)['size']
+            self._loaded.pop(key, None)
+            if os.path.exists(self.path(key)):
+                os.remove(self.path(key))
+
+    def find_prefix(self, data: pd.DataFrame, params: Dict,
+                    columns: Sequence[str] = ('close', 'volume')) -> Optional[str]:
+        """
+        Key of the longest stored window with the same hyperparameters of
+        which data is an extension (same first bars, only new bars appended)
+        """
+        if not len(data):
+            return None
+        start = pd.Timestamp(data.index[0]).isoformat()
+        wanted = params_fingerprint(params)
+        candidates = sorted(
+            ((entry['n_rows'], key) for key, entry in self._index.items()
+             if entry.get('params') == wanted and entry.get('start') == start
+             and entry.get('n_rows', len(data)) < len(data)),
+            reverse=True)
+        for n_rows, key in candidates:
+            if self.key(data.iloc[:n_rows], params, columns) == key:
+                return key
+        return None
+
+    def get_or_train(self, data: pd.DataFrame, params: Dict, train: Callable[[pd.DataFrame], object],
+                     update: Callable[[object, pd.DataFrame, int], object] = None,
+                     columns: Sequence[str] = ('close', 'volume')):
+        """
+        Model for a window and hyperparameters: the stored one if present,
+        else update(model, data, n_new_bars) on the model of a stored prefix
+        window when update is given, else train(data). New models are persisted.
+        """
+        key = self.key(data, params, columns)
+        model = self.get(key)
+        if model is not None:
+            return model
+
+        prefix = self.find_prefix(data, params, columns) if update is not None else None
+        base = self.get(prefix) if prefix is not None else None
+        if base is not None:
+            model = update(base, data, len(data) - self._index[prefix]['n_rows'])
+        else:
+            model = train(data)
+        self.put(key, model, data, params)
+        return model
+
+
+_default_registry = None
+
+
+def default_registry() -> ModelRegistry:
+    """Process-wide registry persisting to DEFAULT_MODEL_DIR"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+        atexit.register(_default_registry.flush)
+    return _default_registry
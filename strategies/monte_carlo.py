@@ -1,18 +1,49 @@
 import numpy as np
 import pandas as pd
-from typing import Tuple, List
-from scipy.stats import norm
+from typing import Iterator, Sequence, Tuple, List
+from .chart_data import QUANTILES, N_SAMPLE_PATHS
 
 class MonteCarloSimulator:
-    def __init__(self, n_simulations: int = 1000, n_days: int = 252):
+    def __init__(self, n_simulations: int = 1000, n_days: int = 252, vectorized: bool = True,
+                 dtype=np.float64, seed: int = None, chunk_size: int = 16,
+                 summary_only: bool = False, time_chunk: int = 21, n_sample_paths: int = N_SAMPLE_PATHS):
         self.n_simulations = n_simulations
         self.n_days = n_days
+        self.vectorized = vectorized  # Cumulative sum in log space instead of a daily loop
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size  # Tickers simulated together in batched calls
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.summary_only = summary_only  # Keep only risk metrics and quantile bands, never full paths
+        self.time_chunk = time_chunk  # Days simulated at a time in summary-only mode
+        self.n_sample_paths = n_sample_paths  # Paths kept whole for charts in summary-only mode
+        
+    def reseed(self, key: int):
+        """Start an independent random stream, reproducible per key when seeded"""
+        self.rng = np.random.default_rng(None if self.seed is None else [self.seed, key])
+        
+    def estimate_parameters(self, closes) -> Tuple[float, float, float]:
+        """Mean and volatility of daily log returns, and the last price"""
+        closes = np.asarray(closes, dtype=np.float64)
+        returns = np.diff(np.log(closes))
+        returns = returns[np.isfinite(returns)]
+        return returns.mean(), returns.std(ddof=1), closes[-1]
         
     def simulate_prices(self, data: pd.DataFrame) -> Tuple[np.ndarray, dict]:
         """
         Simulate future stock prices using Monte Carlo simulation
-        Returns simulated prices and risk metrics
+        Returns simulated prices and risk metrics (prices are None in
+        summary-only mode, where the metrics hold quantile bands instead)
         """
+        if self.vectorized or self.summary_only:
+            mu, sigma, last_price = self.estimate_parameters(data['Close'])
+            if self.summary_only:
+                return None, self.simulate_summary(last_price, mu, sigma)
+            price_paths = self.simulate_batch([last_price], [mu], [sigma])[0]
+            return price_paths, self._calculate_risk_metrics(price_paths, last_price)
+        
+        from scipy.stats import norm
+        
         # Calculate daily returns and volatility
         returns = np.log(data['Close'] / data['Close'].shift(1))
         mu = returns.mean()
@@ -35,9 +66,108 @@ class MonteCarloSimulator:
         
         return price_paths, metrics
     
+    def simulate_batch(self, last_prices: Sequence[float], mus: Sequence[float],
+                       sigmas: Sequence[float]) -> np.ndarray:
+        """
+        Simulate price paths for several tickers in one call.
+        Returns a (tickers x days x simulations) array whose first day is
+        each ticker's last price.
+        """
+        last_prices = np.asarray(last_prices, dtype=self.dtype)[:, None, None]
+        mus = np.asarray(mus, dtype=self.dtype)[:, None, None]
+        sigmas = np.asarray(sigmas, dtype=self.dtype)[:, None, None]
+        
+        # Log increments, zero on the first day, accumulated in place
+        shape = (len(last_prices), self.n_days, self.n_simulations)
+        paths = self.rng.standard_normal(shape, dtype=self.dtype)
+        paths *= sigmas
+        paths += mus - sigmas ** 2 / 2
+        paths[:, 0, :] = 0
+        np.cumsum(paths, axis=1, out=paths)
+        np.exp(paths, out=paths)
+        paths *= last_prices
+        return paths
+    
+    def simulate_many(self, closes: List[np.ndarray]) -> Iterator[Tuple[np.ndarray, dict]]:
+        """
+        Simulate many tickers from their closing prices, chunk_size tickers
+        per batched call (one simulate_prices call each when not vectorized). Yields (price_paths, metrics) in input order; in
+        summary-only mode price_paths is None and the metrics carry the
+        quantile bands instead.
+        """
+        if self.summary_only:
+            for c in closes:
+                mu, sigma, last_price = self.estimate_parameters(c)
+                yield None, self.simulate_summary(last_price, mu, sigma)
+            return
+        if not self.vectorized:
+            # The daily-loop simulation the vectorized flag opts into, one ticker at a time
+            for c in closes:
+                yield self.simulate_prices(pd.DataFrame({'Close': np.asarray(c, dtype=np.float64)}))
+            return
+        
+        for i in range(0, len(closes), self.chunk_size):
+            params = [self.estimate_parameters(c) for c in closes[i:i + self.chunk_size]]
+            mus, sigmas, last_prices = (np.array(p) for p in zip(*params))
+            paths = self.simulate_batch(last_prices, mus, sigmas)
+            for price_paths, last_price in zip(paths, last_prices):
+                yield price_paths.copy(), self._calculate_risk_metrics(price_paths, last_price)
+    
+    def simulate_summary(self, last_price: float, mu: float, sigma: float) -> dict:
+        """
+        Simulate one ticker in time chunks without materializing full paths.
+        Tracks each path's running maximum and worst drawdown as it goes, and
+        returns the risk metrics plus the QUANTILES bands, the mean path and
+        n_sample_paths whole paths per day, so memory grows with
+        n_simulations but not with n_days.
+        """
+        n_sims = self.n_simulations
+        log_price = np.zeros(n_sims, dtype=self.dtype)
+        running_max = np.full(n_sims, last_price, dtype=self.dtype)
+        max_drawdown = np.zeros(n_sims, dtype=self.dtype)
+        bands = np.empty((self.n_days, len(QUANTILES)), dtype=self.dtype)
+        bands[0] = last_price
+        mean_path = np.empty(self.n_days, dtype=self.dtype)
+        mean_path[0] = last_price
+        n_samples = min(self.n_sample_paths, n_sims)
+        sample_paths = np.empty((self.n_days, n_samples), dtype=self.dtype)
+        sample_paths[0] = last_price
+        drift = self.dtype.type(mu - sigma ** 2 / 2)
+        sigma = self.dtype.type(sigma)
+        
+        for start in range(1, self.n_days, self.time_chunk):
+            stop = min(start + self.time_chunk, self.n_days)
+            chunk = self.rng.standard_normal((stop - start, n_sims), dtype=self.dtype)
+            chunk *= sigma
+            chunk += drift
+            np.cumsum(chunk, axis=0, out=chunk)
+            chunk += log_price
+            log_price = chunk[-1].copy()
+            
+            prices = np.exp(chunk, out=chunk) * self.dtype.type(last_price)
+            peaks = np.maximum(np.maximum.accumulate(prices, axis=0), running_max)
+            running_max = peaks[-1]
+            np.minimum(max_drawdown, ((prices - peaks) / peaks).min(axis=0), out=max_drawdown)
+            bands[start:stop] = np.percentile(prices, QUANTILES, axis=1).T
+            mean_path[start:stop] = prices.mean(axis=1)
+            sample_paths[start:stop] = prices[:, :n_samples]
+        
+        final_prices = np.exp(log_price) * last_price
+        metrics = self._calculate_return_metrics(final_prices, last_price)
+        metrics['max_drawdown'] = np.mean(max_drawdown)
+        metrics['quantile_bands'] = bands
+        metrics['mean_path'] = mean_path
+        metrics['sample_paths'] = sample_paths
+        return metrics
+    
     def _calculate_risk_metrics(self, price_paths: np.ndarray, current_price: float) -> dict:
         """Calculate various risk metrics from simulated paths"""
-        final_prices = price_paths[-1]
+        metrics = self._calculate_return_metrics(price_paths[-1], current_price)
+        metrics['max_drawdown'] = self._calculate_max_drawdown(price_paths)
+        return metrics
+    
+    def _calculate_return_metrics(self, final_prices: np.ndarray, current_price: float) -> dict:
+        """Calculate return-distribution metrics from simulated final prices"""
         returns = (final_prices - current_price) / current_price
         
         metrics = {
@@ -46,17 +176,13 @@ class MonteCarloSimulator:
             'var_99': np.percentile(returns, 1),  # 99% VaR
             'upside_potential': np.mean(returns[returns > 0]),
             'downside_risk': np.mean(returns[returns < 0]),
-            'prob_positive': np.mean(returns > 0),
-            'max_drawdown': self._calculate_max_drawdown(price_paths)
+            'prob_positive': np.mean(returns > 0)
         }
         
         return metrics
     
     def _calculate_max_drawdown(self, price_paths: np.ndarray) -> float:
         """Calculate the average maximum drawdown across all paths"""
-        drawdowns = []
-        for path in price_paths.T:
-            rolling_max = np.maximum.accumulate(path)
-            drawdown = np.min((path - rolling_max) / rolling_max)
-            drawdowns.append(drawdown)
+        rolling_max = np.maximum.accumulate(price_paths, axis=0)
+        drawdowns = np.min((price_paths - rolling_max) / rolling_max, axis=0)
         return np.mean(drawdowns) 
\ No newline at end of file
@@ -3,8 +3,8 @@ import pandas as pd
 import numpy as np
 
 class MovingAverageCrossover(BaseStrategy):
-    def __init__(self, data, short_window=50, long_window=200):
-        super().__init__(data)
+    def __init__(self, data, short_window=50, long_window=200, features=None):
+        super().__init__(data, features)
         self.short_window = short_window
         self.long_window = long_window
         self.stop_loss = 0.02  # 2% stop loss
@@ -12,11 +12,11 @@ class MovingAverageCrossover(BaseStrategy):
         
     def execute(self):
         # Calculate moving averages
-        self.data['short_mavg'] = self.data['close'].rolling(window=self.short_window).mean()
-        self.data['long_mavg'] = self.data['close'].rolling(window=self.long_window).mean()
+        self.data['short_mavg'] = self.features.rolling_mean('close', self.short_window)
+        self.data['long_mavg'] = self.features.rolling_mean('close', self.long_window)
         
         # Calculate additional technical indicators
-        self.data['volatility'] = self.data['close'].rolling(window=20).std()
+        self.data['volatility'] = self.features.rolling_std('close', 20)
         self.data['rsi'] = self.calculate_rsi(self.data['close'])
         
         # Generate signals with confirmation
@@ -26,7 +26,7 @@ class MovingAverageCrossover(BaseStrategy):
         conditions = (
             (self.data['short_mavg'] > self.data['long_mavg']) &  # MA crossover
             (self.data['rsi'] < 70) &  # Not overbought
-            (self.data['close'] > self.data['close'].rolling(50).mean())  # Price above 50MA
+            (self.data['close'] > self.features.rolling_mean('close', 50))  # Price above 50MA
         )
         
         # Apply signals where conditions are met and after short_window period
@@ -48,27 +48,12 @@ class MovingAverageCrossover(BaseStrategy):
     
     def apply_risk_management(self):
         """Apply stop loss and take profit levels"""
-        position = 0
-        entry_price = 0
-        self.positions = [0] * len(self.data)  # Initialize positions list with zeros
-        
-        for i in range(len(self.data)):
-            if position == 0 and self.data['signal'].iloc[i] == 1:
-                position = 1
-                entry_price = self.data['close'].iloc[i]
-            elif position == 1:
-                current_price = self.data['close'].iloc[i]
-                pnl = (current_price - entry_price) / entry_price
-                
-                if pnl <= -self.stop_loss or pnl >= self.take_profit:
-                    position = 0
-                    
-            self.positions[i] = position  # Update position at index i instead of appending
+        self.apply_position_rules(stop_loss=self.stop_loss, take_profit=self.take_profit, long_only=True)
     
     def calculate_portfolio_value(self):
         """Calculate the portfolio value over time"""
         position_series = pd.Series(self.positions)
-        price_changes = self.data['close'].pct_change()
+        price_changes = self.features.pct_change('close')
         strategy_returns = position_series.shift(1) * price_changes
         
         portfolio_value = self.initial_capital * (1 + strategy_returns).cumprod()
@@ -0,0 +1,170 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .base_strategy import portfolio_values, performance_metrics
+from .feature_cache import FeatureCache
+from .moving_average_crossover import MovingAverageCrossover
+from .position_engine import run_position_rules_batch
+from .trend_following import TrendFollowing
+
+
+class SweepResult:
+    """
+    Outcome of a parameter sweep: one row per parameter set in params and
+    metrics, and matching rows in the (params x time) signal, position and
+    portfolio value matrices when the curves were kept.
+    """
+
+    def __init__(self, params: pd.DataFrame, metrics: pd.DataFrame, signals: np.ndarray = None,
+                 positions: np.ndarray = None, portfolio_values: np.ndarray = None):
+        self.params = params
+        self.metrics = metrics
+        self.signals = signals
+        self.positions = positions
+        self.portfolio_values = portfolio_values
+
+    def best(self, metric: str = 'sharpe_ratio', n: int = 5) -> pd.DataFrame:
+        """Top n parameter sets by a metric"""
+        return self.metrics.sort_values(metric, ascending=False).head(n)
+
+    @classmethod
+    def concat(cls, results: List['SweepResult']) -> 'SweepResult':
+        """Merge the results of sweeps over disjoint shards of one grid"""
+        params = pd.concat([r.params for r in results], ignore_index=True)
+        metrics = pd.concat([r.metrics for r in results], ignore_index=True)
+        curves = {}
+        for name in ('signals', 'positions', 'portfolio_values'):
+            arrays = [getattr(r, name) for r in results]
+            curves[name] = np.vstack(arrays) if all(a is not None for a in arrays) else None
+        return cls(params, metrics, **curves)
+
+
+def _close(data: pd.DataFrame) -> np.ndarray:
+    return data['close'].to_numpy(dtype=np.float64)
+
+
+def _moving_average_crossover(data, features, params):
+    """Signals and position rules of MovingAverageCrossover for each (short_window, long_window)"""
+    strategy = MovingAverageCrossover(data, features=features)
+    close = _close(data)
+    rsi = strategy.calculate_rsi(data['close']).to_numpy()
+    # Conditions shared by every parameter set
+    confirmed = (rsi < 70) & (close > features.rolling_mean('close', 50).to_numpy())
+
+    bars = np.arange(len(data))
+    signals = np.zeros((len(params), len(data)))
+    for row, p in enumerate(params):
+        short_mavg = features.rolling_mean('close', p['short_window']).to_numpy()
+        long_mavg = features.rolling_mean('close', p['long_window']).to_numpy()
+        signals[row] = (short_mavg > long_mavg) & confirmed & (bars >= p['short_window'])
+
+    rules = dict(stop_loss=strategy.stop_loss, take_profit=strategy.take_profit, long_only=True)
+    return signals, rules
+
+
+def _trend_following(data, features, params):
+    """Signals and ATR-sized position rules of TrendFollowing for each lookback"""
+    strategy = TrendFollowing(data, features=features)
+    strategy.calculate_atr()
+    strategy.calculate_adx()
+    close = _close(data)
+    atr = strategy.data['atr'].to_numpy(dtype=np.float64)
+    trending = strategy.data['adx'].to_numpy() > 25
+    ma_50 = features.rolling_mean('close', 50).to_numpy()
+
+    signals = np.zeros((len(params), len(data)))
+    for row, p in enumerate(params):
+        rolling_high = features.rolling_max('close', p['lookback']).shift(1).to_numpy()
+        rolling_low = features.rolling_min('close', p['lookback']).shift(1).to_numpy()
+        signals[row, (close > rolling_high) & trending & (close > ma_50)] = 1
+        signals[row, (close < rolling_low) & trending & (close < ma_50)] = -1
+
+    size = strategy.initial_capital * strategy.risk_per_trade / (2 * atr)
+    return signals, dict(atr=atr, atr_multiple=2, size=size)
+
+
+def _mean_reversion(data, features, params, stop_loss=0.02, take_profit=0.03):
+    """
+    Z-score band signals for each (mean_window, entry_std): long below
+    mean - entry_std * std, short above mean + entry_std * std, with the
+    stop-loss / take-profit rules of MeanReversion
+    """
+    close = _close(data)
+    signals = np.zeros((len(params), len(data)))
+    for row, p in enumerate(params):
+        mean = features.rolling_mean('close', p['mean_window']).to_numpy()
+        std = features.rolling_std('close', p['mean_window']).to_numpy()
+        signals[row, close < mean - p['entry_std'] * std] = 1
+        signals[row, close > mean + p['entry_std'] * std] = -1
+
+    return signals, dict(stop_loss=stop_loss, take_profit=take_profit, absolute_pnl=True)
+
+
+SWEEPS = {
+    'moving_average_crossover': _moving_average_crossover,
+    'trend_following': _trend_following,
+    'mean_reversion': _mean_reversion,
+}
+
+
+def run_sweep(strategy: str, data: pd.DataFrame, params: List[Dict], initial_capital: float = 100000,
+              keep_curves: bool = True, **options) -> SweepResult:
+    """
+    Backtest every parameter set of a strategy in one pass over the data.
+    Features are computed once per distinct window through a shared
+    FeatureCache, signals and positions are built as (params x time)
+    matrices, and the accounting matches BaseStrategy.
+    """
+    features = FeatureCache(data)
+    signals, rules = SWEEPS[strategy](data, features, params, **options)
+    close = _close(data)
+    positions = run_position_rules_batch(signals, close, **rules)
+    values = portfolio_values(positions, close, initial_capital)
+
+    params = pd.DataFrame(params)
+    metrics = pd.concat([params, pd.DataFrame(performance_metrics(values))], axis=1)
+    if not keep_curves:
+        return SweepResult(params, metrics)
+    return SweepResult(params, metrics, signals, positions, values)
+
+
+def sweep(strategy: str, data: pd.DataFrame, grid: Dict[str, Sequence], n_jobs: int = 1,
+          initial_capital: float = 100000, keep_curves: bool = True, **options) -> SweepResult:
+    """
+    Backtest a strategy over the cartesian product of a parameter grid.
+    With n_jobs > 1 the parameter sets are split into n_jobs shards that
+    are backtested in separate processes and merged in grid order.
+    """
+    names = list(grid)
+    params = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    if n_jobs <= 1 or len(params) < 2:
+        return run_sweep(strategy, data, params, initial_capital, keep_curves, **options)
+
+    shards = [list(shard) for shard in np.array_split(np.array(params, dtype=object), n_jobs) if len(shard)]
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [executor.submit(run_sweep, strategy, data, shard, initial_capital, keep_curves, **options)
+                   for shard in shards]
+        return SweepResult.concat([future.result() for future in futures])
+
+
+def sweep_moving_average_crossover(data: pd.DataFrame, short_windows: Sequence[int],
+                                   long_windows: Sequence[int], **kwargs) -> SweepResult:
+    """Sweep MovingAverageCrossover over short and long moving-average windows"""
+    return sweep('moving_average_crossover', data,
+                 {'short_window': list(short_windows), 'long_window': list(long_windows)}, **kwargs)
+
+
+def sweep_trend_following(data: pd.DataFrame, lookbacks: Sequence[int], **kwargs) -> SweepResult:
+    """Sweep TrendFollowing over breakout lookbacks"""
+    return sweep('trend_following', data, {'lookback': list(lookbacks)}, **kwargs)
+
+
+def sweep_mean_reversion(data: pd.DataFrame, mean_windows: Sequence[int],
+                         entry_stds: Sequence[float], **kwargs) -> SweepResult:
+    """Sweep mean-reversion bands over mean windows and entry widths"""
+    return sweep('mean_reversion', data,
+                 {'mean_window': list(mean_windows), 'entry_std': list(entry_stds)}, **kwargs)
@@ -0,0 +1,200 @@
+from typing import Callable, Union
+
+import numpy as np
+import pandas as pd
+
+from .base_strategy import performance_metrics
+from .indicators import rolling_mean, rolling_std, _forward_fill
+
+
+def moving_average_crossover_signals(close: pd.DataFrame, short_window: int = 50,
+                                     long_window: int = 200) -> np.ndarray:
+    """Long every ticker whose short moving average is above its long one"""
+    values = close.to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        return (rolling_mean(values, short_window) > rolling_mean(values, long_window)).astype(np.float64)
+
+
+def mean_reversion_signals(close: pd.DataFrame, window: int = 20, entry_std: float = 2.0) -> np.ndarray:
+    """Long below mean - entry_std * std, short above mean + entry_std * std"""
+    values = close.to_numpy(dtype=np.float64)
+    mean = rolling_mean(values, window)
+    band = entry_std * rolling_std(values, window)
+    signals = np.zeros(values.shape)
+    with np.errstate(invalid='ignore'):
+        signals[values < mean - band] = 1
+        signals[values > mean + band] = -1
+    return signals
+
+
+class PortfolioResult:
+    """
+    Outcome of a portfolio backtest: the aggregate equity curve, the held
+    (drifted) weight of every asset on every date, the turnover traded at
+    each rebalance, and portfolio- and asset-level metrics.
+    """
+
+    def __init__(self, equity: pd.Series, weights: pd.DataFrame, turnover: pd.Series,
+                 metrics: dict, asset_metrics: pd.DataFrame):
+        self.equity = equity
+        self.weights = weights
+        self.turnover = turnover
+        self.metrics = metrics
+        self.asset_metrics = asset_metrics
+
+    @property
+    def returns(self) -> pd.Series:
+        return self.equity.pct_change().fillna(0)
+
+
+class PortfolioBacktester:
+    """
+    Backtests one signal function across a whole (dates x tickers) universe
+    with array operations. At each rebalance the signals (+1 long, -1 short,
+    0 flat, or any real-valued strength) are turned into target weights with
+    gross exposure 1; between rebalances holdings drift with prices. As in
+    BaseStrategy, positions decided on a bar's close earn from the next bar.
+    """
+
+    def __init__(self, initial_capital: float = 100000, rebalance: Union[int, str] = 1,
+                 weighting: str = 'equal', max_weight: float = None, long_only: bool = False,
+                 transaction_cost: float = 0.0, volatility_window: int = 20):
+        self.initial_capital = initial_capital
+        self.rebalance = rebalance  # Every n bars, or a pandas period alias such as 'W' or 'M'
+        self.weighting = weighting  # 'equal' or 'inverse_volatility'
+        self.max_weight = max_weight  # Cap per asset, the excess stays in cash
+        self.long_only = long_only
+        self.transaction_cost = transaction_cost  # Fraction of traded value
+        self.volatility_window = volatility_window
+
+    def rebalance_bars(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        """
+        Bars on whose close the portfolio is rebalanced, never the last bar
+        since nothing is earned after it (a one-bar history keeps bar 0).
+        """
+        if isinstance(self.rebalance, str):
+            periods = dates.to_period(self.rebalance)
+            # Rebalance on the last bar of each period
+            bars = np.flatnonzero(periods[1:] != periods[:-1])
+        else:
+            bars = np.arange(0, len(dates) - 1, self.rebalance)
+        return bars if len(bars) else np.zeros(1, dtype=np.int64)
+
+    def target_weights(self, signals: np.ndarray, volatility: np.ndarray = None) -> np.ndarray:
+        """
+        Target weights per rebalance from (rebalances x tickers) signals and,
+        for inverse-volatility weighting, the trailing return volatility
+        """
+        if self.long_only:
+            signals = np.maximum(signals, 0)
+        if self.weighting == 'inverse_volatility':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                signals = np.where(volatility > 0, signals / volatility, 0.0)
+            signals = np.nan_to_num(signals, nan=0.0, posinf=0.0, neginf=0.0)
+        elif self.weighting != 'equal':
+            raise ValueError(f"Unknown weighting: {self.weighting}")
+
+        gross = np.abs(signals).sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = np.where(gross > 0, signals / gross, 0.0)
+        if self.max_weight is not None:
+            weights = np.clip(weights, -self.max_weight, self.max_weight)
+        return weights
+
+    def run(self, prices: pd.DataFrame, signal_fn: Callable[[pd.DataFrame], np.ndarray]) -> PortfolioResult:
+        """
+        Backtest signal_fn on a (dates x tickers) frame of closes or a
+        DataProvider panel. signal_fn receives the closes and returns a
+        signal per date and ticker (array or DataFrame of the same shape).
+        """
+        close = prices['Close'] if isinstance(prices.columns, pd.MultiIndex) else prices
+        dates, symbols = close.index, close.columns
+        values = close.to_numpy(dtype=np.float64)
+        n_bars, n_assets = values.shape
+        traded = np.isfinite(values)
+        filled = _forward_fill(values)
+
+        signals = np.asarray(signal_fn(close), dtype=np.float64).reshape(values.shape)
+        signals = np.where(traded & np.isfinite(signals), signals, 0.0)
+
+        returns = np.zeros(values.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns[1:] = filled[1:] / filled[:-1] - 1
+        returns[~np.isfinite(returns)] = 0
+
+        # Target weights at each rebalance; the returns of bar t are earned by
+        # the weights set at the last rebalance strictly before t (its segment)
+        bars = self.rebalance_bars(dates)
+        volatility = None
+        if self.weighting == 'inverse_volatility':
+            # Trailing windows, so no rebalance sees later returns
+            volatility = rolling_std(returns, self.volatility_window)[bars]
+        targets = self.target_weights(signals[bars], volatility)
+        segment = np.searchsorted(bars, np.arange(n_bars), side='left') - 1
+        invested = segment >= 0
+        segment_start = bars[np.maximum(segment, 0)]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth = filled / filled[segment_start]
+        growth[~np.isfinite(growth)] = 1
+        segment_weights = np.where(invested[:, None], targets[np.maximum(segment, 0)], 0.0)
+        exposure = segment_weights * growth
+        # Value of the portfolio relative to the start of its segment
+        segment_growth = 1 + (exposure - segment_weights).sum(axis=1)
+        held = exposure / segment_growth[:, None]
+
+        # Turnover from the drifted holdings into each new target
+        previous = np.where(invested[bars][:, None], held[bars], 0.0)
+        turnover = np.abs(targets - previous).sum(axis=1)
+        after_costs = 1 - self.transaction_cost * turnover
+        # Compound each segment's full growth into the value at every later segment start
+        closed = np.append(after_costs[:-1] * segment_growth[bars[1:]], 1.0)
+        start_value = self.initial_capital * after_costs * np.concatenate(([1.0], np.cumprod(closed[:-1])))
+
+        equity = np.where(invested, start_value[np.maximum(segment, 0)] * segment_growth, self.initial_capital)
+        asset_pnl = self._asset_pnl(bars, start_value, targets, filled)
+        costs = start_value / after_costs * self.transaction_cost * turnover
+
+        metrics = {name: float(values[0]) for name, values in performance_metrics(equity).items()}
+        metrics.update({
+            'final_value': float(equity[-1]) if n_bars else float(self.initial_capital),
+            'n_rebalances': len(bars),
+            'total_turnover': float(turnover.sum()),
+            'transaction_costs': float(costs.sum()),
+            'average_gross_exposure': float(np.abs(held[invested]).sum(axis=1).mean()) if invested.any() else 0.0
+        })
+
+        return PortfolioResult(
+            equity=pd.Series(equity, index=dates, name='equity'),
+            weights=pd.DataFrame(held, index=dates, columns=symbols),
+            turnover=pd.Series(turnover, index=dates[bars], name='turnover'),
+            metrics=metrics,
+            asset_metrics=self._asset_metrics(signals, returns, held, asset_pnl, symbols)
+        )
+
+    def _asset_pnl(self, bars, start_value, targets, filled) -> np.ndarray:
+        """Profit and loss of each asset summed over all segments, before costs"""
+        if not len(bars):
+            return np.zeros(filled.shape[1])
+        ends = np.append(bars[1:], len(filled) - 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            growth = filled[ends] / filled[bars]
+        growth[~np.isfinite(growth)] = 1
+        return (start_value[:, None] * targets * (growth - 1)).sum(axis=0)
+
+    def _asset_metrics(self, signals, returns, held, asset_pnl, symbols) -> pd.DataFrame:
+        """
+        Per-asset contribution to the portfolio plus the metrics of trading
+        each asset's signal on its own, as a single-asset strategy would
+        """
+        positions = np.maximum(signals, 0) if self.long_only else signals
+        standalone = np.zeros(returns.shape)
+        standalone[1:] = positions[:-1] * returns[1:]
+        curves = self.initial_capital * np.cumprod(1 + standalone, axis=0)
+
+        metrics = pd.DataFrame(performance_metrics(curves.T), index=symbols)
+        metrics['pnl'] = asset_pnl
+        metrics['contribution'] = asset_pnl / self.initial_capital
+        metrics['average_weight'] = held.mean(axis=0)
+        metrics['time_invested'] = (held != 0).mean(axis=0)
+        return metrics
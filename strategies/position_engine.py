@@ -0,0 +1,171 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the NumPy path gives identical positions
+    njit = None
+
+
+def _positions_loop(signal, close, atr, size, stop_loss, take_profit,
+                    atr_multiple, long_only, absolute_pnl):
+    """Bar-by-bar stop-loss / take-profit / ATR-stop state machine"""
+    n = len(signal)
+    positions = np.zeros(n)
+    position = 0.0
+    entry_price = 0.0
+
+    for i in range(n):
+        entry = signal[i] == 1 if long_only else signal[i] != 0
+        if position == 0 and entry:
+            position = signal[i] * size[i]
+            entry_price = close[i]
+        elif position != 0:
+            current_price = close[i]
+            pnl = (current_price - entry_price) / entry_price
+            if absolute_pnl:
+                pnl = abs(pnl)
+
+            if pnl <= -stop_loss or pnl >= take_profit:
+                position = 0.0
+            elif atr_multiple > 0 and (
+                    (position > 0 and current_price < entry_price - atr_multiple * atr[i]) or
+                    (position < 0 and current_price > entry_price + atr_multiple * atr[i])):
+                position = 0.0
+
+        positions[i] = position
+
+    return positions
+
+
+_positions_jit = njit(cache=True, nogil=True)(_positions_loop) if njit is not None else None
+
+
+def _find_exit(start, position, entry_price, close, atr, stop_loss, take_profit,
+               atr_multiple, absolute_pnl):
+    """First bar at or after start that closes a position, len(close) if none"""
+    n = len(close)
+    block = 64
+    while start < n:
+        stop = min(n, start + block)
+        prices = close[start:stop]
+        pnl = (prices - entry_price) / entry_price
+        if absolute_pnl:
+            pnl = np.abs(pnl)
+
+        hit = (pnl <= -stop_loss) | (pnl >= take_profit)
+        if atr_multiple > 0:
+            if position > 0:
+                hit |= prices < entry_price - atr_multiple * atr[start:stop]
+            elif position < 0:
+                hit |= prices > entry_price + atr_multiple * atr[start:stop]
+
+        if hit.any():
+            return start + int(np.argmax(hit))
+        start = stop
+        block *= 2  # Long trades are scanned in geometrically growing blocks
+    return n
+
+
+def _positions_numpy(signal, close, atr, size, stop_loss, take_profit,
+                     atr_multiple, long_only, absolute_pnl):
+    """
+    Same state machine, hopping from trade to trade: each trade's exit bar
+    is found with array comparisons, and the next entry with a precomputed
+    next-signal index, so Python only iterates once per trade.
+    """
+    n = len(signal)
+    positions = np.zeros(n)
+    entries = signal == 1 if long_only else signal != 0
+    next_entry = np.minimum.accumulate(np.where(entries, np.arange(n), n)[::-1])[::-1]
+    next_entry = np.append(next_entry, n)
+
+    i = next_entry[0]
+    while i < n:
+        position = signal[i] * size[i]
+        if position == 0:
+            i = next_entry[i + 1]
+            continue
+
+        exit_bar = _find_exit(i + 1, position, close[i], close, atr, stop_loss,
+                              take_profit, atr_multiple, absolute_pnl)
+        positions[i:exit_bar] = position
+        # A position closed on a bar cannot be reopened on that same bar
+        i = next_entry[min(exit_bar + 1, n)]
+
+    return positions
+
+
+def run_position_rules(signal, close, stop_loss: float = np.inf, take_profit: float = np.inf,
+                       atr=None, atr_multiple: float = 0.0, size=None, long_only: bool = False,
+                       absolute_pnl: bool = False, use_jit: bool = True) -> np.ndarray:
+    """
+    Turn entry signals into positions with stop-loss, take-profit and ATR stops.
+
+    A flat book enters on a signal (only +1 when long_only) with
+    signal * size; an open position is closed when its return since entry
+    (absolute when absolute_pnl) reaches -stop_loss or take_profit, or when
+    the close crosses entry -/+ atr_multiple * ATR against it. Runs the
+    numba-compiled loop when available, otherwise the NumPy path.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    atr = np.zeros(len(close)) if atr is None else np.asarray(atr, dtype=np.float64)
+    size = np.ones(len(close)) if size is None else np.broadcast_to(np.asarray(size, dtype=np.float64), close.shape)
+    args = (signal, close, atr, size, float(stop_loss), float(take_profit),
+            float(atr_multiple), bool(long_only), bool(absolute_pnl))
+
+    if use_jit and _positions_jit is not None:
+        return _positions_jit(*args)
+    return _positions_numpy(*args)
+
+
+def _positions_batch_numpy(signals, close, atr, size, stop_loss, take_profit,
+                           atr_multiple, long_only, absolute_pnl):
+    """The state machine stepped through time once for every row of signals at the same time"""
+    n_rows, n = signals.shape
+    positions = np.zeros((n_rows, n))
+    position = np.zeros(n_rows)
+    entry_price = np.ones(n_rows)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i in range(n):
+            signal = signals[:, i]
+            current_price = close[i]
+            entry = signal == 1 if long_only else signal != 0
+            is_open = position != 0
+
+            pnl = (current_price - entry_price) / entry_price
+            if absolute_pnl:
+                pnl = np.abs(pnl)
+            exit_ = (pnl <= -stop_loss) | (pnl >= take_profit)
+            if atr_multiple > 0:
+                exit_ |= (((position > 0) & (current_price < entry_price - atr_multiple * atr[i])) |
+                          ((position < 0) & (current_price > entry_price + atr_multiple * atr[i])))
+
+            enter = ~is_open & entry
+            position = np.where(enter, signal * size[:, i], np.where(is_open & exit_, 0.0, position))
+            entry_price = np.where(enter, current_price, entry_price)
+            positions[:, i] = position
+
+    return positions
+
+
+def run_position_rules_batch(signals, close, stop_loss: float = np.inf, take_profit: float = np.inf,
+                             atr=None, atr_multiple: float = 0.0, size=None, long_only: bool = False,
+                             absolute_pnl: bool = False, use_jit: bool = True) -> np.ndarray:
+    """
+    run_position_rules for a (rows x time) matrix of signals on one price
+    series, e.g. one row per parameter set. size may be per bar or per
+    row and bar. Returns a (rows x time) matrix of positions.
+    """
+    signals = np.atleast_2d(np.asarray(signals, dtype=np.float64))
+    close = np.asarray(close, dtype=np.float64)
+    atr = np.zeros(len(close)) if atr is None else np.asarray(atr, dtype=np.float64)
+    size = np.ones(len(close)) if size is None else np.asarray(size, dtype=np.float64)
+    size = np.broadcast_to(size, signals.shape)
+    options = (float(stop_loss), float(take_profit), float(atr_multiple), bool(long_only), bool(absolute_pnl))
+
+    if use_jit and _positions_jit is not None:
+        return np.array([_positions_jit(row, close, atr, np.ascontiguousarray(row_size), *options)
+                         for row, row_size in zip(signals, size)]).reshape(signals.shape)
+    return _positions_batch_numpy(signals, close, atr, size, *options)
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.path.join('data', 'prices')
+MANIFEST_FILE = '_manifest.json'
+
+
+class PriceStore:
+    """
+    On-disk columnar OHLCV store with one Parquet partition per ticker.
+    A small manifest keeps the last stored bar of every ticker so that
+    top-ups can be planned without opening the partitions.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self._manifest = self._load_manifest()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def _load_manifest(self) -> Dict[str, str]:
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        tmp_path = self._manifest_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path())
+
+    def path(self, symbol: str) -> str:
+        """Path of the Parquet partition holding a ticker"""
+        return os.path.join(self.root, f"{symbol.replace('/', '_')}.parquet")
+
+    def symbols(self) -> List[str]:
+        """Tickers currently held in the store"""
+        return sorted(self._manifest)
+
+    def has(self, symbol: str) -> bool:
+        return symbol in self._manifest and os.path.exists(self.path(symbol))
+
+    def last_date(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Timestamp of the last stored bar, or None if the ticker is missing"""
+        if symbol not in self._manifest:
+            return None
+        return pd.Timestamp(self._manifest[symbol])
+
+    def latest_date(self) -> Optional[pd.Timestamp]:
+        """Most recent bar across the whole store"""
+        dates = [self.last_date(symbol) for symbol in self._manifest]
+        if not dates:
+            return None
+        return max(_naive(date) for date in dates)
+
+    def read(self, symbol: str, start=None, end=None) -> pd.DataFrame:
+        """Read stored bars for a ticker, optionally restricted to [start, end)"""
+        if not self.has(symbol):
+            return pd.DataFrame()
+        data = pd.read_parquet(self.path(symbol))
+        if start is not None:
+            data = data[data.index >= _align_tz(start, data.index)]
+        if end is not None:
+            data = data[data.index < _align_tz(end, data.index)]
+        return data
+
+    def write(self, symbol: str, data: pd.DataFrame):
+        """Replace the partition of a ticker"""
+        if data.empty:
+            return
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        tmp_path = self.path(symbol) + '.tmp'
+        data.to_parquet(tmp_path)
+        os.replace(tmp_path, self.path(symbol))
+        with self._lock:
+            self._manifest[symbol] = data.index[-1].isoformat()
+            self._save_manifest()
+
+    def append(self, symbol: str, data: pd.DataFrame):
+        """Merge new bars into a ticker's partition, newer rows win on overlap"""
+        if data.empty:
+            return
+        existing = self.read(symbol)
+        if not existing.empty:
+            data = data.set_axis(_match_tz(data.index, existing.index))
+            data = pd.concat([existing, data[existing.columns.intersection(data.columns)]])
+        self.write(symbol, data)
+
+
+def _naive(ts) -> pd.Timestamp:
+    """Drop the timezone of a timestamp, keeping its wall-clock time"""
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
+
+
+def _match_tz(index: pd.Index, reference: pd.Index) -> pd.DatetimeIndex:
+    """Express a DatetimeIndex in the timezone (or naivety) of a reference index"""
+    index = pd.DatetimeIndex(index)
+    tz = getattr(reference, 'tz', None)
+    if index.tz is None:
+        return index if tz is None else index.tz_localize(tz)
+    return index.tz_localize(None) if tz is None else index.tz_convert(tz)
+
+
+def _align_tz(ts, index: pd.Index) -> pd.Timestamp:
+    """Make a timestamp comparable with a (possibly tz-aware) DatetimeIndex"""
+    ts = pd.Timestamp(ts)
+    tz = getattr(index, 'tz', None)
+    if tz is None:
+        return _naive(ts)
+    if ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    return ts.tz_convert(tz)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SCAN_CACHE_DIR = os.path.join('data', 'scans')
+INDEX_FILE = '_index.json'
+
+
+def window_key(close: np.ndarray, volume: np.ndarray, dates: pd.DatetimeIndex) -> Optional[str]:
+    """
+    Identity of a ticker's scan inputs: its last bar timestamp plus a hash
+    of the dates and values it traded on. None if the ticker has no bars.
+    """
+    traded = np.isfinite(close)
+    if not traded.any():
+        return None
+    digest = hashlib.sha1(np.asarray(dates[traded].asi8).tobytes())
+    digest.update(np.ascontiguousarray(close[traded]).tobytes())
+    digest.update(np.ascontiguousarray(volume[traded]).tobytes())
+    return f"{dates[traded][-1].isoformat()}:{digest.hexdigest()[:16]}"
+
+
+class ScanCache:
+    """
+    Persisted per-ticker scan results, kept apart per scanner configuration.
+    Each ticker's entry (its opportunity, or None when it was filtered out,
+    plus its ranking features) is stored with joblib next to an index of
+    the input window it was computed from, so a rescan only recomputes
+    tickers whose bars changed.
+    """
+
+    def __init__(self, root: str = DEFAULT_SCAN_CACHE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Dict[str, str]] = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _config_dir(self, config: str) -> str:
+        return os.path.join(self.root, config)
+
+    def _index(self, config: str) -> Dict[str, str]:
+        if config not in self._indexes:
+            path = os.path.join(self._config_dir(config), INDEX_FILE)
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._indexes[config] = json.load(f)
+            else:
+                self._indexes[config] = {}
+        return self._indexes[config]
+
+    def _save_index(self, config: str):
+        path = os.path.join(self._config_dir(config), INDEX_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._indexes[config], f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def path(self, config: str, symbol: str) -> str:
+        """Path of the joblib file holding a ticker's entry"""
+        return os.path.join(self._config_dir(config), f"{symbol.replace('/', '_')}.joblib")
+
+    def get(self, config: str, symbol: str, window: str) -> Optional[Dict]:
+        """A ticker's cached entry if it was computed from the same window, else None"""
+        import joblib
+
+        if window is None or self._index(config).get(symbol) != window:
+            return None
+        try:
+            return joblib.load(self.path(config, symbol))
+        except (OSError, EOFError):
+            return None
+
+    def put_many(self, config: str, entries: Dict[str, Dict], windows: Dict[str, str]):
+        """Persist the entries of several tickers and record their windows"""
+        import joblib
+
+        os.makedirs(self._config_dir(config), exist_ok=True)
+        for symbol, entry in entries.items():
+            if windows.get(symbol) is None:
+                continue
+            tmp_path = self.path(config, symbol) + '.tmp'
+            joblib.dump(entry, tmp_path)
+            os.replace(tmp_path, self.path(config, symbol))
+        with self._lock:
+            index = self._index(config)
+            index.update({symbol: windows[symbol] for symbol in entries if windows.get(symbol) is not None})
+            self._save_index(config)
+
+    def symbols(self, config: str) -> List[str]:
+        """Tickers with a cached entry for a configuration"""
+        return sorted(self._index(config))
@@ -0,0 +1,378 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the stage latency histogram buckets (plus +Inf)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Ticker counters: name -> (label names, help text)
+COUNTERS = {
+    'requested': ((), "Tickers a scan was asked for"),
+    'fetched': ((), "Tickers fetched with at least one bar"),
+    'cached': ((), "Tickers served from the scan cache without recomputation"),
+    'failed': (('stage', 'reason'), "Tickers dropped by an error, by stage and reason"),
+    'filtered': (('reason',), "Tickers dropped by the scan's filters, by reason"),
+    'scored': ((), "Tickers scored as opportunities"),
+    'scans': ((), "Completed scans"),
+}
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as exposed to Prometheus"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Per bucket, not cumulative; the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other: Dict):
+        self.counts = [a + b for a, b in zip(self.counts, other['counts'])]
+        self.sum += other['sum']
+        self.count += other['count']
+        self.max = max(self.max, other['max'])
+
+    def state(self) -> Dict:
+        return {'counts': list(self.counts), 'sum': self.sum, 'count': self.count, 'max': self.max}
+
+    def quantile(self, q: float, counts=None) -> float:
+        """Estimate of quantile q, interpolated within its bucket like Prometheus' histogram_quantile"""
+        counts = self.counts if counts is None else counts
+        total = sum(counts)
+        if not total:
+            return float('nan')
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+
+class _Stopwatch:
+    """Accumulates the time spent in several with-blocks into one observation"""
+
+    def __init__(self, metrics: 'ScanMetrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.elapsed = 0.0
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed += time.perf_counter() - self._start
+
+    def observe(self):
+        self.metrics.observe(self.stage, self.elapsed)
+
+
+class ScanMetrics:
+    """
+    Scan instrumentation: latency histograms per stage (fetch, indicators,
+    monte_carlo, score, rank and the whole scan), ticker counters (fetched,
+    cached, failed by stage and reason, filtered by reason, scored) and the
+    depth of the fetch ('io') and compute ('cpu') queues. Stages are timed
+    per batch; compute processes of a pipeline scan keep their own metrics
+    and hand them back with each batch's results.
+
+    Counters and histograms accumulate over the process lifetime, as
+    Prometheus expects. After every scan a JSON summary of that scan alone
+    is logged (and appended to log_path), and the Prometheus text
+    exposition is written to textfile (for node_exporter's textfile
+    collector) or served over HTTP with serve().
+    """
+    enabled = True
+
+    def __init__(self, textfile: str = None, log_path: str = None, buckets: Tuple[float, ...] = BUCKETS):
+        self.textfile = textfile
+        self.log_path = log_path
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.counters = Counter()  # (name, label values) -> count
+        self.histograms: Dict[str, Histogram] = {}
+        self.queue_depth = Counter()
+        self.queue_depth_max = Counter()
+
+    def count(self, name: str, n: int = 1, **labels):
+        if n:
+            key = (name, tuple(labels[label] for label in COUNTERS[name][0]))
+            with self._lock:
+                self.counters[key] += n
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = Histogram(self.buckets)
+            self.histograms[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def stopwatch(self, stage: str) -> _Stopwatch:
+        return _Stopwatch(self, stage)
+
+    def timed(self, stage: str, iterable: Iterable) -> Iterator:
+        """Iterate over iterable, timing the work done producing its items as one observation"""
+        watch = self.stopwatch(stage)
+        iterator = iter(iterable)
+        try:
+            while True:
+                with watch:
+                    item = next(iterator, watch)
+                if item is watch:
+                    return
+                yield item
+        finally:
+            watch.observe()
+
+    def queue_changed(self, pool: str, delta: int):
+        """Track items waiting in or running on a pool's queue"""
+        with self._lock:
+            self.queue_depth[pool] += delta
+            self.queue_depth_max[pool] = max(self.queue_depth_max[pool], self.queue_depth[pool])
+
+    def _state(self) -> Dict:
+        # Called with the lock held
+        return {
+            'counters': dict(self.counters),
+            'histograms': {stage: h.state() for stage, h in self.histograms.items()},
+            'queue_depth_max': dict(self.queue_depth_max)
+        }
+
+    def snapshot(self) -> Dict:
+        """Plain, picklable copy of every metric"""
+        with self._lock:
+            return self._state()
+
+    def drain(self) -> Dict:
+        """Snapshot, then reset, e.g. to return a worker process' metrics with each batch"""
+        with self._lock:
+            state = self._state()
+            self.counters.clear()
+            self.histograms.clear()
+            self.queue_depth_max.clear()
+            return state
+
+    def merge(self, state: Optional[Dict]):
+        """Add a snapshot of other metrics, e.g. drained from a worker process"""
+        if not state:
+            return
+        with self._lock:
+            self.counters.update(state['counters'])
+            for stage, other in state['histograms'].items():
+                if stage not in self.histograms:
+                    self.histograms[stage] = Histogram(self.buckets)
+                self.histograms[stage].merge(other)
+            for pool, depth in state['queue_depth_max'].items():
+                self.queue_depth_max[pool] = max(self.queue_depth_max[pool], depth)
+
+    def summary(self, since: Dict = None) -> Dict:
+        """
+        JSON-ready summary of the metrics recorded after the snapshot since
+        (everything if None): ticker counts, failures and filters by reason,
+        and count, total seconds and estimated p50, p95 and p99 latency per stage
+        """
+        current = self.snapshot()
+        before = since or {'counters': {}, 'histograms': {}}
+        counters = Counter(current['counters'])
+        counters.subtract(before['counters'])
+
+        tickers, failed, filtered = {}, {}, {}
+        for (name, labels), n in sorted(counters.items()):
+            if name == 'failed':
+                failed[':'.join(labels)] = n
+            elif name == 'filtered':
+                filtered[labels[0]] = n
+            elif name != 'scans':
+                tickers[name] = n
+        failed = {reason: n for reason, n in failed.items() if n}
+        filtered = {reason: n for reason, n in filtered.items() if n}
+
+        stages = {}
+        for stage, state in current['histograms'].items():
+            previous = before['histograms'].get(stage, {'counts': [0] * len(state['counts']), 'sum': 0.0, 'count': 0})
+            counts = [a - b for a, b in zip(state['counts'], previous['counts'])]
+            count = state['count'] - previous['count']
+            if not count:
+                continue
+            histogram = self.histograms[stage]
+            stages[stage] = {
+                'count': count,
+                'seconds': round(state['sum'] - previous['sum'], 6),
+                'p50': round(histogram.quantile(0.5, counts), 6),
+                'p95': round(histogram.quantile(0.95, counts), 6),
+                'p99': round(histogram.quantile(0.99, counts), 6)
+            }
+        return {'tickers': tickers, 'failed': failed, 'filtered': filtered, 'stages': stages,
+                'queue_depth_max': current['queue_depth_max']}
+
+    def publish(self, since: Dict = None):
+        """Log the JSON summary of a scan and export the metrics wherever configured"""
+        line = json.dumps({'event': 'scan_metrics', 'time': time.time(), **self.summary(since)})
+        logger.info(line)
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            with open(self.log_path, 'a') as f:
+                f.write(line + '\n')
+        if self.textfile:
+            self.write_prometheus(self.textfile)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4) of every metric"""
+        state = self.snapshot()
+        lines = []
+        for name, (label_names, help_text) in COUNTERS.items():
+            metric = 'scan_runs_total' if name == 'scans' else f'scan_tickers_{name}_total'
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+            series = {labels: n for (counter, labels), n in state['counters'].items() if counter == name}
+            if not label_names:
+                series.setdefault((), 0)
+            for labels, n in sorted(series.items()):
+                lines.append(f'{metric}{_labels(zip(label_names, labels))} {n}')
+
+        lines += ['# HELP scan_stage_seconds Latency of each scan stage, per batch',
+                  '# TYPE scan_stage_seconds histogram']
+        for stage, histogram in sorted(state['histograms'].items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), histogram['counts']):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'scan_stage_seconds_bucket{_labels([("stage", stage), ("le", le)])} {cumulative}')
+            lines.append(f'scan_stage_seconds_sum{_labels([("stage", stage)])} {histogram["sum"]!r}')
+            lines.append(f'scan_stage_seconds_count{_labels([("stage", stage)])} {histogram["count"]}')
+
+        with self._lock:
+            depths = dict(self.queue_depth)
+        for metric, values, help_text in (
+                ('scan_queue_depth', depths, "Batches queued or running on a scan pool"),
+                ('scan_queue_depth_max', state['queue_depth_max'], "Highest scan pool queue depth seen")):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+            for pool, depth in sorted(values.items()):
+                lines.append(f'{metric}{_labels([("pool", pool)])} {depth}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write the exposition atomically, so a collector never reads half a file"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve the exposition at http://host:port/metrics from a daemon thread; shutdown() stops it"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='scan-metrics', daemon=True).start()
+        return server
+
+
+class _NullStopwatch:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def observe(self):
+        pass
+
+
+class NullMetrics:
+    """
+    Disabled instrumentation: the same interface as ScanMetrics doing
+    nothing, so instrumented code needs no checks. Work done only to feed
+    metrics should still be guarded by `if metrics.enabled`.
+    """
+    enabled = False
+    _timer = nullcontext()
+    _stopwatch = _NullStopwatch()
+
+    def count(self, name: str, n: int = 1, **labels):
+        pass
+
+    def observe(self, stage: str, seconds: float):
+        pass
+
+    def timer(self, stage: str):
+        return self._timer
+
+    def stopwatch(self, stage: str):
+        return self._stopwatch
+
+    def timed(self, stage: str, iterable: Iterable) -> Iterable:
+        return iterable
+
+    def queue_changed(self, pool: str, delta: int):
+        pass
+
+    def snapshot(self):
+        return None
+
+    def drain(self):
+        return None
+
+    def merge(self, state: Optional[Dict]):
+        pass
+
+    def summary(self, since: Dict = None) -> Dict:
+        return {}
+
+    def publish(self, since: Dict = None):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def _labels(pairs) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in pairs]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
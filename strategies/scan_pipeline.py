@@ -0,0 +1,176 @@
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, ProcessPoolExecutor, wait
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Scanner rebuilt once in every compute process by _init_worker
+_worker_scanner = None
+
+
+class ScanPipeline:
+    """
+    Two-stage scan: a thread pool fetches batches concurrently (I/O bound)
+    and hands each batch's price arrays to a process pool (CPU bound)
+    through shared memory, so indicators, Monte Carlo and scoring run
+    outside the GIL of the fetching process. At most io_workers +
+    cpu_workers batches are in flight between their fetch and their
+    results.
+    """
+
+    def __init__(self, scanner, io_workers: int = 2, cpu_workers: int = None,
+                 mp_context: str = 'spawn'):
+        self.scanner = scanner
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers or multiprocessing.cpu_count()
+        self.mp_context = mp_context
+
+    def run(self, batches: List[List[str]], start_date: datetime, end_date: datetime,
+            progress: Callable[[int, int, List[Dict]], None] = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Scan ticker batches and return every opportunity found, plus the
+        ranking blocks. progress(tickers_done, tickers_total, batch_results)
+        is called as each batch finishes, in completion order.
+        """
+        total = sum(len(batch) for batch in batches)
+        done = 0
+
+        def finished(i, results):
+            nonlocal done
+            done += len(batches[i])
+            if progress is not None:
+                progress(done, total, results)
+
+        opportunities = []
+        ranking_blocks = {}
+        blocks = {}
+        contexts = {}
+        context = multiprocessing.get_context(self.mp_context)
+        
+        with ThreadPoolExecutor(max_workers=self.io_workers) as io_pool, \
+                ProcessPoolExecutor(max_workers=self.cpu_workers, mp_context=context,
+                                    initializer=_init_worker,
+                                    initargs=(self.scanner.monte_carlo, self.scanner.indicator_engine,
+                                              self.scanner.ranker, self.scanner.mc_budget,
+                                              self.scanner.metrics.enabled)) as cpu_pool:
+            metrics = self.scanner.metrics
+            # Batches between their fetch and the end of their compute: bounded, so that
+            # panels and shared-memory blocks of a large universe are not all alive at once
+            pending = {}
+            queued = iter(enumerate(batches))
+            max_in_flight = self.io_workers + self.cpu_workers
+
+            def fetched(i, future):
+                """As a fetch lands, publish its arrays and queue the compute"""
+                try:
+                    panel = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching batch starting at {batches[i][0]}: {str(e)}")
+                    self.scanner.record_fetch(batches[i], None)
+                    finished(i, [])
+                    return
+                self.scanner.record_fetch(batches[i], panel)
+                # Only tickers missing from the scan cache are sent to the workers
+                symbols = list(panel['Close'].columns)
+                cached, stale, windows = self.scanner.lookup_cached(panel)
+                contexts[i] = (symbols, cached, stale, windows)
+                if not stale:
+                    results, ranking_blocks[i] = self.scanner.merge_cached(symbols, cached, stale, windows, [], None)
+                    opportunities.extend(results)
+                    finished(i, results)
+                    return
+                columns = [symbols.index(symbol) for symbol in stale]
+                block, shape = _publish(panel['Close'].to_numpy(dtype=np.float64)[:, columns],
+                                        panel['Volume'].to_numpy(dtype=np.float64)[:, columns])
+                blocks[i] = block
+                metrics.queue_changed('cpu', 1)
+                computation = cpu_pool.submit(_process_shared_batch, block.name, shape, stale, i)
+                computation.add_done_callback(lambda _: metrics.queue_changed('cpu', -1))
+                pending[computation] = (computed, i)
+
+            def computed(i, future):
+                """Collect a batch's results and release its shared memory"""
+                results = []
+                try:
+                    results, ranking_block, worker_metrics = future.result()
+                    metrics.merge(worker_metrics)
+                    results, ranking_block = self.scanner.merge_cached(*contexts[i], results, ranking_block)
+                    opportunities.extend(results)
+                    ranking_blocks[i] = ranking_block
+                except Exception as e:
+                    logger.error(f"Error processing batch starting at {batches[i][0]}: {str(e)}")
+                    metrics.count('failed', len(contexts[i][2]), stage='compute', reason=type(e).__name__)
+                finally:
+                    finished(i, results)
+                    block = blocks.pop(i)
+                    block.close()
+                    block.unlink()
+
+            while True:
+                while len(pending) < max_in_flight:
+                    i, batch = next(queued, (None, None))
+                    if batch is None:
+                        break
+                    pending[self.scanner.submit_fetch(io_pool, batch, start_date, end_date)] = (fetched, i)
+                if not pending:
+                    break
+                ready, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in ready:
+                    handle, i = pending.pop(future)
+                    handle(i, future)
+        
+        # Batch order, so that the stacked ranking matrix does not depend on timing
+        return opportunities, [ranking_blocks[i] for i in sorted(ranking_blocks)]
+
+
+def _publish(close: np.ndarray, volume: np.ndarray) -> Tuple[SharedMemory, Tuple[int, int]]:
+    """Copy close and volume arrays into one new shared-memory block"""
+    shape = close.shape
+    block = SharedMemory(create=True, size=max(2 * close.nbytes, 1))
+    arrays = np.ndarray((2,) + shape, dtype=np.float64, buffer=block.buf)
+    arrays[0] = close
+    arrays[1] = volume
+    del arrays
+    return block, shape
+
+
+def _init_worker(monte_carlo, indicator_engine, ranker=None, mc_budget=None, metrics=False):
+    """Build a compute-only scanner once per worker process, with its own metrics if enabled"""
+    global _worker_scanner
+    from .scan_metrics import ScanMetrics
+    from .stock_scanner import StockScanner
+
+    _worker_scanner = StockScanner(monte_carlo=monte_carlo, mc_budget=mc_budget,
+                                   metrics=ScanMetrics() if metrics else None)
+    _worker_scanner.indicator_engine = indicator_engine
+    _worker_scanner.ranker = ranker
+
+
+def _process_shared_batch(name: str, shape: Tuple[int, int], symbols: List[str],
+                          batch_index: int) -> Tuple[List[Dict], Optional[Dict], Optional[Dict]]:
+    """
+    Score one batch whose price arrays live in shared memory. Also returns
+    the metrics the worker recorded for it (None when disabled).
+    """
+    block = SharedMemory(name=name)  # Tracked by the parent's resource tracker, which workers share
+    try:
+        # Independent, per-batch random stream whichever worker runs it
+        _worker_scanner.monte_carlo.reseed(batch_index)
+        results, ranking_block = _score_block(block, shape, symbols)
+        return results, ranking_block, _worker_scanner.metrics.drain()
+    finally:
+        try:
+            block.close()
+        except BufferError:
+            pass  # A failed batch's traceback still references the arrays
+
+
+def _score_block(block: SharedMemory, shape: Tuple[int, int],
+                 symbols: List[str]) -> Tuple[List[Dict], Optional[Dict]]:
+    arrays = np.ndarray((2,) + shape, dtype=np.float64, buffer=block.buf)
+    return _worker_scanner.score_arrays(symbols, arrays[0], arrays[1])
@@ -0,0 +1,125 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .stock_scanner import StockScanner
+
+logger = logging.getLogger(__name__)
+
+
+class ScanService:
+    """
+    Market scans run by one background thread on a schedule, every
+    interval after the last scan finished or as soon as a rescan is
+    requested. Readers only ever take a snapshot of the latest results, so
+    any number of dashboard sessions share a single scan. While a scan is
+    running the snapshot also carries its progress and the best
+    opportunities found so far.
+    """
+
+    def __init__(self, scanner: StockScanner, interval: timedelta = timedelta(minutes=30),
+                 tickers: List[str] = None, top_n: int = 5):
+        self.scanner = scanner
+        self.interval = interval
+        self.tickers = tickers  # None scans the scanner's default universe
+        self.top_n = top_n
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._finished = threading.Condition(self._lock)
+        self._stopped = False
+        self._thread = None
+        self._state = {
+            'opportunities': [],
+            'partial': [],
+            'done': 0,
+            'total': 0,
+            'running': False,
+            'started_at': None,
+            'completed_at': None,
+            'version': 0,  # Number of completed scans, for keying caches of the results
+            'error': None
+        }
+
+    def start(self) -> 'ScanService':
+        """Start the worker thread, which scans right away"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name='scan-service', daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Stop the worker after the scan in progress, if any"""
+        with self._lock:
+            self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def request_scan(self) -> bool:
+        """Ask for a scan now. False if one is already running, whose results will be shared."""
+        with self._lock:
+            if self._state['running']:
+                return False
+        self._wake.set()
+        return True
+
+    def snapshot(self) -> Dict:
+        """Copy of the latest results, scan progress and timestamps"""
+        with self._lock:
+            state = dict(self._state)
+            state['opportunities'] = list(state['opportunities'])
+            state['partial'] = list(state['partial'])
+            return state
+
+    def wait(self, version: int = None, timeout: float = None) -> bool:
+        """Block until scan number version (default: the next one) has completed"""
+        with self._finished:
+            version = self._state['version'] + 1 if version is None else version
+            return self._finished.wait_for(lambda: self._state['version'] >= version, timeout)
+
+    def next_scan_at(self) -> Optional[datetime]:
+        """When the next scheduled scan starts, None while one is running"""
+        with self._lock:
+            if self._state['running']:
+                return None
+            if self._state['completed_at'] is None:
+                return datetime.now()
+            return self._state['completed_at'] + self.interval
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+            self._scan()
+            self._wake.wait(self.interval.total_seconds())
+            self._wake.clear()
+
+    def _scan(self):
+        with self._lock:
+            self._state.update(running=True, started_at=datetime.now(), done=0, total=0, partial=[], error=None)
+        found = []
+
+        def progress(done, total, results):
+            found.extend(results)
+            found.sort(key=lambda x: x['score'], reverse=True)
+            del found[self.top_n:]
+            with self._lock:
+                self._state.update(done=done, total=total, partial=list(found))
+
+        try:
+            opportunities = self.scanner.scan_stocks(self.tickers, progress=progress)
+            error = None
+        except Exception as e:
+            logger.error(f"Error in background scan: {str(e)}")
+            opportunities, error = None, str(e)
+
+        with self._finished:
+            if opportunities is not None:
+                self._state['opportunities'] = opportunities[:self.top_n]
+            self._state.update(running=False, completed_at=datetime.now(), error=error,
+                               version=self._state['version'] + 1)
+            self._finished.notify_all()
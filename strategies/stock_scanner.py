@@ -1,39 +1,72 @@
+import heapq
 import pandas as pd
 import numpy as np
-from typing import List, Dict
-import yfinance as yf
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from sklearn.ensemble import GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
+from typing import Callable, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import time
 from datetime import datetime, timedelta
-import requests
 from .monte_carlo import MonteCarloSimulator
+from .price_store import PriceStore
+from .data_provider import DataProvider, YFinanceProvider, StoreBackedProvider
+from .scan_pipeline import ScanPipeline
+from .indicators import IndicatorEngine, metrics_for, valid_closes, panel_symbols
+from .cross_sectional import CrossSectionalRanker, split_block, merge_blocks
+from .scan_cache import ScanCache, window_key
+from .constituents import ConstituentsService
+from .model_registry import params_fingerprint
+from .chart_data import QUANTILES, N_SAMPLE_PATHS, MAX_POINTS, chart_payload, summarize_paths
+from .scan_metrics import NULL_METRICS, ScanMetrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class StockScanner:
-    def __init__(self):
-        self.scaler = StandardScaler()
-        self.model = GradientBoostingRegressor(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=4,
-            random_state=42
-        )
-        self.monte_carlo = MonteCarloSimulator()
+    def __init__(self, provider: DataProvider = None, price_store: PriceStore = None,
+                 offline: bool = False, lookback_days: int = 365, batch_size: int = 100,
+                 monte_carlo: MonteCarloSimulator = None, cpu_workers: int = 0, io_workers: int = 2,
+                 ml_ranking: bool = False, scan_cache: ScanCache = None,
+                 constituents: ConstituentsService = None, mc_budget: int = None,
+                 metrics: ScanMetrics = None):
+        if offline and price_store is None:
+            raise ValueError("Offline scanning requires a pre-populated price store")
+        self.price_store = price_store
+        self.offline = offline
+        self.lookback_days = lookback_days
+        self.batch_size = batch_size
+        self.cpu_workers = cpu_workers  # > 0 runs scans as an I/O thread / compute process pipeline
+        self.io_workers = io_workers
         
-    def get_sp500_tickers(self) -> List[str]:
-        """Get all S&P 500 tickers"""
-        try:
-            url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-            tables = pd.read_html(url)
-            sp500_table = tables[0]
-            return sp500_table['Symbol'].tolist()
-        except Exception as e:
-            logger.error(f"Error fetching S&P 500 tickers: {str(e)}")
-            return []
+        # Route every data access through a provider, cached in the store if given
+        self.provider = provider or YFinanceProvider(chunk_size=batch_size)
+        if price_store is not None:
+            self.provider = StoreBackedProvider(self.provider, price_store, offline=offline)
+        self.monte_carlo = monte_carlo or MonteCarloSimulator()
+        self.indicator_engine = IndicatorEngine()
+        # Optional learned cross-sectional ranking of the whole universe (sklearn is only imported for it)
+        self.scaler = self.model = self.ranker = None
+        if ml_ranking:
+            from sklearn.ensemble import GradientBoostingRegressor
+            from sklearn.preprocessing import StandardScaler
+
+            self.scaler = StandardScaler()
+            self.model = GradientBoostingRegressor(
+                n_estimators=100,
+                learning_rate=0.1,
+                max_depth=4,
+                random_state=42
+            )
+            self.ranker = CrossSectionalRanker(self.scaler, self.model)
+        self.scan_cache = scan_cache  # Per-ticker results reused while a ticker's bars are unchanged
+        # Cascade scans: only the mc_budget best screened tickers are simulated (None simulates every ticker)
+        self.mc_budget = mc_budget
+        self.fetch_failures: Dict[str, str] = {}  # Tickers of the last scan that came back without bars, and why
+        self.constituents = constituents or ConstituentsService()
+        self.metrics = metrics or NULL_METRICS  # Stage timings and ticker counters, a no-op unless given
+        
+    def get_sp500_tickers(self, as_of=None) -> List[str]:
+        """Get all S&P 500 tickers, today or as of a past date, from the constituents service"""
+        return self.constituents.members(as_of)
 
     def calculate_technical_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calculate technical indicators"""
@@ -66,40 +99,46 @@ class StockScanner:
         rs = gain / loss
         return 100 - (100 / (1 + rs))
 
-    def process_stock(self, symbol: str) -> Dict:
-        """Process individual stock data"""
+    def get_history_window(self) -> Tuple[datetime, datetime]:
+        """
+        Date range of the lookback window. Offline scans end the window at
+        the last bar held in the price store instead of today.
+        """
+        end_date = datetime.now()
+        if self.offline and self.price_store.latest_date() is not None:
+            end_date = self.price_store.latest_date() + timedelta(days=1)
+        return end_date - timedelta(days=self.lookback_days), end_date
+
+    def get_history(self, symbol: str) -> pd.DataFrame:
+        """Get the lookback window of daily bars for a ticker"""
+        start_date, end_date = self.get_history_window()
+        return self.provider.get_symbol_history(symbol, start_date, end_date)
+
+    def process_stock(self, symbol: str, data: pd.DataFrame = None) -> Dict:
+        """Process individual stock data, fetching it unless already provided"""
         try:
-            stock = yf.Ticker(symbol)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=365)
-            data = stock.history(start=start_date, end=end_date)
+            if data is None:
+                data = self.get_history(symbol)
             
             if len(data) < 200:
                 return None
                 
-            data = self.calculate_technical_indicators(data)
-            
-            returns = data['Daily_Return'].dropna()
-            
-            # Calculate metrics
-            annualized_return = returns.mean() * 252
-            annualized_vol = returns.std() * np.sqrt(252)
-            sharpe_ratio = annualized_return / annualized_vol if annualized_vol != 0 else 0
-            trend_strength = (data['Close'].iloc[-1] / data['Close'].iloc[-20] - 1) * 100
-            momentum = data['RSI'].iloc[-1]
-            volume_strength = data['Volume_Ratio'].iloc[-1]
-            
-            metrics = {
-                'sharpe_ratio': sharpe_ratio,
-                'trend_strength': trend_strength,
-                'momentum': momentum,
-                'volume_strength': volume_strength,
-                'current_price': data['Close'].iloc[-1],
-                'monthly_return': (data['Close'].iloc[-1] / data['Close'].iloc[-20] - 1) * 100
-            }
-            
+            indicators = self.indicator_engine.compute(data[['Close']].to_numpy(),
+                                                       data[['Volume']].to_numpy())
+            metrics = metrics_for(self.indicator_engine.summarize(indicators), 0)
+            simulation = self.monte_carlo.simulate_prices(pd.DataFrame({'Close': valid_closes(indicators, 0)}))
+            return self.evaluate_stock(symbol, metrics, simulation)
+                
+        except Exception as e:
+            logger.debug(f"Error processing {symbol}: {e!r}")
+            self.metrics.count('failed', stage='process', reason=type(e).__name__)
+            return None
+
+    def evaluate_stock(self, symbol: str, metrics: Dict, simulation: Tuple[np.ndarray, Dict]) -> Dict:
+        """Add Monte Carlo results to a ticker's indicator metrics, then score and filter it"""
+        try:
             # Add Monte Carlo simulation
-            price_paths, mc_metrics = self.monte_carlo.simulate_prices(data)
+            price_paths, mc_metrics = simulation
             
             metrics.update({
                 'expected_return': mc_metrics['expected_return'],
@@ -110,45 +149,327 @@ class StockScanner:
             
             # Update scoring to include Monte Carlo metrics
             score = (
-                metrics['sharpe_ratio'] * 0.25 +
-                metrics['trend_strength'] * 0.20 +
-                (metrics['momentum'] / 100) * 0.15 +
-                metrics['volume_strength'] * 0.15 +
+                self.screen_score(metrics) +
                 metrics['prob_positive'] * 0.15 +
                 (1 + metrics['expected_return']) * 0.10
             )
             
             # Update filtering criteria
-            if (metrics['sharpe_ratio'] > 1.0 and
-                metrics['trend_strength'] > 0 and
-                metrics['momentum'] > 40 and
+            if (self.passes_screen(metrics) and
                 metrics['prob_positive'] > 0.55 and  # Added probability threshold
                 metrics['var_95'] > -0.2):  # Added VaR threshold
                 
-                return {
+                result = {
                     'symbol': symbol,
                     'metrics': metrics,
-                    'score': score,
-                    'price_paths': price_paths
+                    'score': score
                 }
+                # Only a compact chart payload travels with the opportunity, never the full paths
+                if price_paths is not None:
+                    result['chart'] = summarize_paths(price_paths, metrics['current_price'])
+                elif 'quantile_bands' in mc_metrics:
+                    result['chart'] = chart_payload(metrics['current_price'], mc_metrics['quantile_bands'].T,
+                                                    QUANTILES, mc_metrics['mean_path'],
+                                                    mc_metrics['sample_paths'].T)
+                self.metrics.count('scored')
+                return result
+            self.metrics.count('filtered', reason='screen' if not self.passes_screen(metrics) else 'risk')
                 
-        except Exception:
+        except Exception as e:
+            logger.debug(f"Error evaluating {symbol}: {e!r}")
+            self.metrics.count('failed', stage='score', reason=type(e).__name__)
             return None
 
-    def scan_stocks(self) -> List[Dict]:
-        """Scan stocks and identify top opportunities using parallel processing"""
-        tickers = self.get_sp500_tickers()
+    @staticmethod
+    def screen_score(metrics: Dict):
+        """Part of the score that needs no simulation (per ticker, or arrays of an indicator summary)"""
+        return (
+            metrics['sharpe_ratio'] * 0.25 +
+            metrics['trend_strength'] * 0.20 +
+            (metrics['momentum'] / 100) * 0.15 +
+            metrics['volume_strength'] * 0.15
+        )
+
+    @staticmethod
+    def passes_screen(metrics: Dict):
+        """Filters that need no simulation (per ticker, or arrays of an indicator summary)"""
+        return (
+            (metrics['sharpe_ratio'] > 1.0) &
+            (metrics['trend_strength'] > 0) &
+            (metrics['momentum'] > 40)
+        )
+
+    def config_fingerprint(self) -> str:
+        """Hash of the scanner settings that determine a ticker's scan result"""
+        mc = self.monte_carlo
+        config = {
+            'lookback_days': self.lookback_days,
+            'monte_carlo': {
+                'n_simulations': mc.n_simulations,
+                'n_days': mc.n_days,
+                'vectorized': mc.vectorized,
+                'dtype': str(mc.dtype),
+                'seed': mc.seed,
+                'summary_only': mc.summary_only,
+                'time_chunk': mc.time_chunk,
+                'n_sample_paths': mc.n_sample_paths
+            },
+            'chart': {'quantiles': QUANTILES, 'samples': N_SAMPLE_PATHS, 'points': MAX_POINTS},
+            'cascade': self.mc_budget is not None,  # Cascade scans cache screened candidates instead
+            'indicators': vars(self.indicator_engine),
+            'ranking': None if self.ranker is None else {'horizon': self.ranker.horizon,
+                                                         'sample_every': self.ranker.sample_every}
+        }
+        return params_fingerprint(config)[:16]
+
+    def lookup_cached(self, panel: pd.DataFrame) -> Tuple[Dict[str, Dict], List[str], Dict[str, str]]:
+        """
+        Split a panel's tickers into cached entries (bars unchanged since they
+        were scanned) and stale tickers to recompute. Also returns the input
+        window of every ticker. Without a scan cache every ticker is stale.
+        """
+        symbols = panel_symbols(panel)
+        if self.scan_cache is None:
+            return {}, symbols, {}
+        
+        config = self.config_fingerprint()
+        close = panel['Close'].to_numpy(dtype=np.float64)
+        volume = panel['Volume'].to_numpy(dtype=np.float64)
+        windows = {symbol: window_key(close[:, j], volume[:, j], panel.index) for j, symbol in enumerate(symbols)}
+        cached = {}
+        for symbol in symbols:
+            entry = self.scan_cache.get(config, symbol, windows[symbol])
+            if entry is not None:
+                cached[symbol] = entry
+        self.metrics.count('cached', len(cached))
+        return cached, [symbol for symbol in symbols if symbol not in cached], windows
+
+    def merge_cached(self, symbols: List[str], cached: Dict[str, Dict], stale: List[str], windows: Dict[str, str],
+                     results: List[Dict], block: Optional[Dict]) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Cache the results of the recomputed (stale) tickers and merge them
+        with the cached entries, in panel order
+        """
+        if self.scan_cache is None:
+            return results, block
+        
+        by_symbol = {result['symbol']: result for result in results}
+        pieces = split_block(block) if block is not None else {}
+        computed = {symbol: {'result': by_symbol.get(symbol), 'ranking': pieces.get(symbol)} for symbol in stale}
+        self.scan_cache.put_many(self.config_fingerprint(), computed, windows)
+        
+        entries = {**cached, **computed}
+        results = [entries[symbol]['result'] for symbol in symbols
+                   if symbol in entries and entries[symbol]['result'] is not None]
+        if self.ranker is None:
+            return results, None
+        return results, merge_blocks({symbol: entries[symbol]['ranking'] for symbol in symbols if symbol in entries})
+
+    def scan_panel(self, panel: pd.DataFrame) -> Tuple[List[Dict], Optional[Dict]]:
+        """score_panel that only recomputes the tickers missing from the scan cache"""
+        cached, stale, windows = self.lookup_cached(panel)
+        if len(stale) == len(panel_symbols(panel)):
+            results, block = self.score_panel(panel)
+        elif stale:
+            results, block = self.score_panel(panel.loc[:, panel.columns.get_level_values('symbol').isin(stale)])
+        else:
+            results, block = [], None
+        return self.merge_cached(panel_symbols(panel), cached, stale, windows, results, block)
+
+    def process_batch(self, panel: pd.DataFrame) -> List[Dict]:
+        """Process a panel of tickers: batch indicators, batched Monte Carlo, then scoring"""
+        return self.score_panel(panel)[0]
+
+    def score_panel(self, panel: pd.DataFrame) -> Tuple[List[Dict], Optional[Dict]]:
+        """Score a panel of tickers, also returning its ranking block (see score_arrays)"""
+        return self.score_arrays(panel_symbols(panel),
+                                 panel['Close'].to_numpy(dtype=np.float64),
+                                 panel['Volume'].to_numpy(dtype=np.float64))
+
+    def process_arrays(self, symbols: List[str], close: np.ndarray, volume: np.ndarray) -> List[Dict]:
+        """Process (dates x tickers) close and volume arrays aligned on a common calendar"""
+        return self.score_arrays(symbols, close, volume)[0]
+
+    def score_arrays(self, symbols: List[str], close: np.ndarray,
+                     volume: np.ndarray) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Score (dates x tickers) close and volume arrays. Returns the
+        opportunities and, when ML ranking is enabled, the batch's block of
+        ranking features for CrossSectionalRanker (None otherwise).
+        
+        In cascade scans (mc_budget set) nothing is simulated here: the
+        returned entries are the tickers passing the screen, with their
+        cheap score ('prescore') and closes, for simulate_finalists.
+        """
+        if not len(close):
+            return [], None  # No bars at all, e.g. every fetch of the batch failed
+        with self.metrics.timer('indicators'):
+            indicators = self.indicator_engine.compute(close, volume)
+            block = self.ranker.block(symbols, indicators) if self.ranker is not None else None
+            summary = self.indicator_engine.summarize(indicators)
+        eligible = (summary['n_bars'] >= 200) & (summary['n_obs'] > 1)
+        if self.metrics.enabled:
+            fetched = summary['n_bars'] > 0  # Tickers without bars were counted as fetch failures
+            self.metrics.count('filtered', int(np.count_nonzero(fetched & ~eligible)), reason='short_history')
+        
+        if self.mc_budget is not None:
+            with np.errstate(invalid='ignore'):
+                passed = np.flatnonzero(eligible & self.passes_screen(summary))
+                prescores = self.screen_score(summary)
+            self.metrics.count('filtered', int(np.count_nonzero(eligible)) - len(passed), reason='screen')
+            return [{'symbol': symbols[j], 'metrics': metrics_for(summary, j), 'prescore': float(prescores[j]),
+                     'closes': valid_closes(indicators, j)} for j in passed], block
+        
+        candidates = np.flatnonzero(eligible)
+        simulations = self.metrics.timed('monte_carlo', self.monte_carlo.simulate_many(
+            [valid_closes(indicators, j) for j in candidates]))
+        results = []
+        scoring = self.metrics.stopwatch('score')
+        for simulation, j in zip(simulations, candidates):
+            with scoring:
+                result = self.evaluate_stock(symbols[j], metrics_for(summary, j), simulation)
+            if result is not None:
+                results.append(result)
+        scoring.observe()
+        return results, block
+
+    def simulate_finalists(self, candidates: List[Dict]) -> List[Dict]:
+        """
+        Expensive stage of a cascade scan: Monte Carlo simulation, final
+        filters and score for the mc_budget screened candidates with the
+        best cheap score, picked with a bounded heap
+        """
+        finalists = heapq.nlargest(self.mc_budget, candidates,
+                                   key=lambda c: -np.inf if np.isnan(c['prescore']) else c['prescore'])
+        self.metrics.count('filtered', len(candidates) - len(finalists), reason='mc_budget')
+        simulations = self.metrics.timed('monte_carlo', self.monte_carlo.simulate_many(
+            [candidate['closes'] for candidate in finalists]))
+        results = []
+        scoring = self.metrics.stopwatch('score')
+        for simulation, candidate in zip(simulations, finalists):
+            with scoring:
+                result = self.evaluate_stock(candidate['symbol'], dict(candidate['metrics']), simulation)
+            if result is not None:
+                results.append(result)
+        scoring.observe()
+        return results
+
+    def record_fetch(self, batch: List[str], panel: Optional[pd.DataFrame]):
+        """
+        Note the tickers of a fetched batch that have no bars (panel is None
+        when the whole request failed), with the provider's reason if known
+        """
+        reasons = getattr(self.provider, 'failures', {})
+        if panel is None:
+            missing = batch
+        else:
+            close = panel['Close']
+            missing = [symbol for symbol in batch if symbol not in close.columns or not close[symbol].notna().any()]
+        for symbol in missing:
+            self.fetch_failures[symbol] = reasons.get(symbol, 'no_data' if panel is not None else 'request_failed')
+            self.metrics.count('failed', stage='fetch', reason=self.fetch_failures[symbol])
+        self.metrics.count('fetched', len(batch) - len(missing))
+
+    def fetch_batch(self, batch: List[str], start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """One provider request for a batch of tickers, timed as the 'fetch' stage"""
+        with self.metrics.timer('fetch'):
+            return self.provider.get_history(batch, start_date, end_date)
+
+    def submit_fetch(self, executor, batch: List[str], start_date: datetime, end_date: datetime):
+        """Queue fetch_batch on an executor, tracking the 'io' queue depth"""
+        self.metrics.queue_changed('io', 1)
+        future = executor.submit(self.fetch_batch, batch, start_date, end_date)
+        future.add_done_callback(lambda _: self.metrics.queue_changed('io', -1))
+        return future
+
+    def _scan_batches(self, batches: List[List[str]], start_date: datetime, end_date: datetime,
+                      progress: Callable[[int, int, List[Dict]], None] = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Fetch the universe in bulk batches, one provider request each, and
+        download the next batch in the background while scoring this one.
+        Returns the opportunities and the batches' ranking blocks.
+        """
+        total = sum(len(batch) for batch in batches)
+        done = 0
         opportunities = []
+        blocks = []
+        if not batches:
+            return opportunities, blocks
         
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            future_to_symbol = {executor.submit(self.process_stock, symbol): symbol 
-                              for symbol in tickers}
-            
-            for future in as_completed(future_to_symbol):
-                result = future.result()
-                if result is not None:
-                    opportunities.append(result)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = self.submit_fetch(executor, batches[0], start_date, end_date)
+            for i, batch in enumerate(batches):
+                try:
+                    panel = pending.result()
+                except Exception as e:
+                    logger.error(f"Error fetching batch starting at {batch[0]}: {str(e)}")
+                    panel = None
+                if i + 1 < len(batches):
+                    pending = self.submit_fetch(executor, batches[i + 1], start_date, end_date)
+                self.record_fetch(batch, panel)
+                results = []
+                if panel is not None:
+                    # The per-batch random stream pipeline workers use, so seeded scans match across modes
+                    self.monte_carlo.reseed(i)
+                    results, block = self.scan_panel(panel)
+                    opportunities.extend(results)
+                    blocks.append(block)
+                done += len(batch)
+                if progress is not None:
+                    progress(done, total, results)
+        return opportunities, blocks
+
+    def scan_stocks(self, tickers: List[str] = None,
+                    progress: Callable[[int, int, List[Dict]], None] = None) -> List[Dict]:
+        """
+        Scan stocks and identify top opportunities using parallel processing.
+        progress(tickers_done, tickers_total, batch_opportunities) is called
+        as each batch finishes. Cascade scans screen every batch first and
+        report the simulated finalists once, at the end. With metrics
+        enabled, a JSON summary of the scan is logged and exported at the end.
+        """
+        if tickers is None:
+            if self.offline:
+                tickers = self.price_store.symbols()  # Scan whatever the store holds
+            else:
+                tickers = self.get_sp500_tickers()
+        start_date, end_date = self.get_history_window()
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        self.fetch_failures = {}
+        since = self.metrics.snapshot()
+        self.metrics.count('requested', len(tickers))
+        scan_start = time.perf_counter()
+        
+        batch_progress = progress
+        if self.mc_budget is not None and progress is not None:
+            # Screened candidates are not opportunities yet
+            batch_progress = lambda done, total, candidates: progress(done, total, [])
+        
+        if self.cpu_workers:
+            pipeline = ScanPipeline(self, io_workers=self.io_workers, cpu_workers=self.cpu_workers)
+            opportunities, blocks = pipeline.run(batches, start_date, end_date, batch_progress)
+        else:
+            opportunities, blocks = self._scan_batches(batches, start_date, end_date, batch_progress)
+        
+        if self.fetch_failures:
+            reasons = pd.Series(self.fetch_failures).value_counts().to_dict()
+            logger.warning(f"{len(self.fetch_failures)} of {len(tickers)} tickers had no data: {reasons}")
+        
+        if self.mc_budget is not None:
+            self.monte_carlo.reseed(len(batches))  # Whichever mode scored the batches
+            opportunities = self.simulate_finalists(opportunities)
+            if progress is not None:
+                progress(len(tickers), len(tickers), opportunities)
+        
+        with self.metrics.timer('rank'):
+            if self.ranker is not None:
+                # One model and one predict call for the whole universe
+                opportunities = self.ranker.rank(opportunities, blocks)
+            else:
+                # Sort opportunities by score
+                opportunities.sort(key=lambda x: x['score'], reverse=True)
         
-        # Sort opportunities by score
-        opportunities.sort(key=lambda x: x['score'], reverse=True)
+        self.metrics.observe('scan', time.perf_counter() - scan_start)
+        self.metrics.count('scans')
+        self.metrics.publish(since)
         return opportunities[:5]  # Return top 5 opportunities 
\ No newline at end of file
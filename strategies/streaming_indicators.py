@@ -0,0 +1,272 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+
+import pandas as pd
+
+NAN = float('nan')
+
+
+def _field(bar, name: str) -> float:
+    """Read a field from a bar given as a number, a mapping or a pandas row"""
+    if isinstance(bar, (int, float)):
+        return float(bar)
+    try:
+        return float(bar[name])
+    except (KeyError, IndexError):
+        return float(bar[name.title()])
+
+
+def _bars(history):
+    """Iterate over the bars of a Series (closes) or an OHLCV DataFrame"""
+    if isinstance(history, pd.Series):
+        return iter(history.tolist())
+    if isinstance(history, pd.DataFrame):
+        columns = [str(column).lower() for column in history.columns]
+        return (dict(zip(columns, row)) for row in history.itertuples(index=False, name=None))
+    return iter(history)
+
+
+class StreamingIndicator(ABC):
+    """
+    Incremental indicator: each update(bar) costs O(1) and returns the
+    indicator value after that bar, NaN until enough bars have been seen.
+    Values match the batch pandas calculations used by the strategies.
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def update(self, bar) -> float:
+        pass
+
+    @property
+    @abstractmethod
+    def value(self) -> float:
+        pass
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+    @classmethod
+    def from_history(cls, history, **kwargs):
+        """Warm-start an indicator by replaying historical bars"""
+        indicator = cls(**kwargs)
+        for bar in _bars(history):
+            indicator.update(bar)
+        return indicator
+
+
+class RollingMean(StreamingIndicator):
+    """Simple moving average, like rolling(window).mean()"""
+    __slots__ = ('window', 'field', '_values', '_sum', '_updates')
+
+    def __init__(self, window: int = 20, field: str = 'close'):
+        self.window = window
+        self.field = field
+        self._values = deque(maxlen=window)
+        self._sum = 0.0
+        self._updates = 0
+
+    def push(self, x: float) -> float:
+        if len(self._values) == self.window:
+            self._sum -= self._values[0]
+        self._values.append(x)
+        self._sum += x
+        # Re-sum the window now and then so rounding errors cannot accumulate
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._sum = math.fsum(self._values)
+        return self.value
+
+    def update(self, bar) -> float:
+        return self.push(_field(bar, self.field))
+
+    @property
+    def value(self) -> float:
+        if len(self._values) < self.window:
+            return NAN
+        return self._sum / self.window
+
+
+class RollingStd(StreamingIndicator):
+    """Rolling sample standard deviation using a sliding Welford update"""
+    __slots__ = ('window', 'field', 'ddof', '_values', '_mean', '_m2')
+
+    def __init__(self, window: int = 20, field: str = 'close', ddof: int = 1):
+        self.window = window
+        self.field = field
+        self.ddof = ddof
+        self._values = deque(maxlen=window)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, x: float) -> float:
+        n = len(self._values)
+        if n < self.window:
+            self._values.append(x)
+            delta = x - self._mean
+            self._mean += delta / (n + 1)
+            self._m2 += delta * (x - self._mean)
+        else:
+            old = self._values[0]
+            self._values.append(x)
+            old_mean = self._mean
+            self._mean += (x - old) / n
+            self._m2 += (x - old) * (x - self._mean + old - old_mean)
+        return self.value
+
+    def update(self, bar) -> float:
+        return self.push(_field(bar, self.field))
+
+    @property
+    def value(self) -> float:
+        if len(self._values) < self.window:
+            return NAN
+        return math.sqrt(max(self._m2, 0.0) / (self.window - self.ddof))
+
+
+class EMA(StreamingIndicator):
+    """Exponential moving average, like ewm(span=span).mean() with adjust=True"""
+    __slots__ = ('span', 'field', '_decay', '_numerator', '_denominator')
+
+    def __init__(self, span: int = 12, field: str = 'close'):
+        self.span = span
+        self.field = field
+        self._decay = 1 - 2 / (span + 1)
+        self._numerator = 0.0
+        self._denominator = 0.0
+
+    def push(self, x: float) -> float:
+        self._numerator = x + self._decay * self._numerator
+        self._denominator = 1.0 + self._decay * self._denominator
+        return self.value
+
+    def update(self, bar) -> float:
+        return self.push(_field(bar, self.field))
+
+    @property
+    def value(self) -> float:
+        if self._denominator == 0:
+            return NAN
+        return self._numerator / self._denominator
+
+
+class MACD(StreamingIndicator):
+    """MACD line: fast EMA minus slow EMA of the close"""
+    __slots__ = ('_fast', '_slow')
+
+    def __init__(self, fast: int = 12, slow: int = 26, field: str = 'close'):
+        self._fast = EMA(fast, field)
+        self._slow = EMA(slow, field)
+
+    def update(self, bar) -> float:
+        self._fast.update(bar)
+        self._slow.update(bar)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._fast.value - self._slow.value
+
+
+class RSI(StreamingIndicator):
+    """
+    Relative Strength Index with simple moving averages of gains and losses,
+    as in calculate_rsi of StockScanner and MovingAverageCrossover.
+    """
+    __slots__ = ('period', 'field', '_gain', '_loss', '_previous')
+
+    def __init__(self, period: int = 14, field: str = 'close'):
+        self.period = period
+        self.field = field
+        self._gain = RollingMean(period)
+        self._loss = RollingMean(period)
+        self._previous = None
+
+    def update(self, bar) -> float:
+        price = _field(bar, self.field)
+        # The first bar has no change and counts as zero, like diff().where()
+        delta = 0.0 if self._previous is None else price - self._previous
+        self._previous = price
+        self._gain.push(delta if delta > 0 else 0.0)
+        self._loss.push(-delta if delta < 0 else 0.0)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        gain = self._gain.value
+        loss = self._loss.value
+        if math.isnan(gain):
+            return NAN
+        if loss == 0:
+            return NAN if gain == 0 else 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+
+class Volatility(StreamingIndicator):
+    """Rolling standard deviation of daily returns, as in the scanner"""
+    __slots__ = ('field', '_std', '_previous')
+
+    def __init__(self, window: int = 20, field: str = 'close'):
+        self.field = field
+        self._std = RollingStd(window)
+        self._previous = None
+
+    def update(self, bar) -> float:
+        price = _field(bar, self.field)
+        if self._previous is not None:
+            self._std.push(price / self._previous - 1)
+        self._previous = price
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._std.value
+
+
+class ATR(StreamingIndicator):
+    """Average True Range, as in TrendFollowing.calculate_atr"""
+    __slots__ = ('_mean', '_previous_close')
+
+    def __init__(self, period: int = 14):
+        self._mean = RollingMean(period)
+        self._previous_close = None
+
+    def update(self, bar) -> float:
+        high = _field(bar, 'high')
+        low = _field(bar, 'low')
+        true_range = high - low
+        if self._previous_close is not None:
+            true_range = max(true_range,
+                             abs(high - self._previous_close),
+                             abs(low - self._previous_close))
+        self._previous_close = _field(bar, 'close')
+        return self._mean.push(true_range)
+
+    @property
+    def value(self) -> float:
+        return self._mean.value
+
+
+class ADX(StreamingIndicator):
+    """
+    Simplified ADX of TrendFollowing.calculate_adx: the rolling mean of the
+    absolute `period`-bar percentage change, times 100.
+    """
+    __slots__ = ('field', '_closes', '_mean')
+
+    def __init__(self, period: int = 14, field: str = 'close'):
+        self.field = field
+        self._closes = deque(maxlen=period + 1)
+        self._mean = RollingMean(period)
+
+    def update(self, bar) -> float:
+        self._closes.append(_field(bar, self.field))
+        if len(self._closes) == self._closes.maxlen:
+            self._mean.push(abs(self._closes[-1] / self._closes[0] - 1))
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._mean.value * 100
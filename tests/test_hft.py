@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from strategies import hft
+from strategies.hft import QuoteImbalance, TickEngine, synthetic_ticks
+
+BOOK_FIELDS = ('ts', 'bid', 'bid_size', 'ask', 'ask_size', 'last_price', 'last_size')
+
+
+def replay(ticks, batched):
+    strategy = QuoteImbalance()
+    engine = TickEngine(strategy, trade_capacity=50, quote_capacity=500, batched=batched)
+    # Two replays, so that ring buffers wrap across chunks
+    engine.replay(ticks[:30_000])
+    stats = engine.replay(ticks[30_000:])
+    return strategy, engine, stats
+
+
+@pytest.mark.skipif(hft.njit is None, reason="numba is not installed")
+def test_compiled_quote_imbalance_matches_callbacks():
+    ticks = synthetic_ticks(100_000, n_symbols=3)
+    expected, expected_engine, expected_stats = replay(ticks, batched=False)
+    strategy, engine, stats = replay(ticks, batched=True)
+
+    assert stats['batched_events'] == len(ticks) and expected_stats['batched_events'] == 0
+    assert (stats['trades'], stats['quotes']) == (expected_stats['trades'], expected_stats['quotes'])
+    assert strategy.n_orders == expected.n_orders
+    assert strategy.positions == expected.positions
+    assert strategy.cash == pytest.approx(expected.cash)
+    assert strategy.pnl() == pytest.approx(expected.pnl())
+    for symbol, state in expected_engine.states.items():
+        book, expected_book = engine.states[symbol].book, state.book
+        for field in BOOK_FIELDS:
+            assert getattr(book, field) == pytest.approx(getattr(expected_book, field), nan_ok=True)
+        for ring_name in ('trades', 'quotes'):
+            ring, expected_ring = getattr(engine.states[symbol], ring_name), getattr(state, ring_name)
+            assert ring.count == expected_ring.count
+            for field in ring.fields:
+                np.testing.assert_array_equal(ring.last(field), expected_ring.last(field))
+
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import synthetic_universe
+from strategies.data_provider import SyntheticProvider, panel_to_frame
+from strategies.indicators import IndicatorEngine, panel_symbols
+from strategies.stock_scanner import StockScanner
+
+INDICATORS = ['SMA_20', 'SMA_50', 'SMA_200', 'RSI', 'MACD', 'Daily_Return', 'Volatility',
+              'Volume_MA', 'Volume_Ratio']
+
+
+@pytest.fixture(scope='module')
+def panel() -> pd.DataFrame:
+    """Universe where some tickers miss bars: a single day, a week, and history before a listing date"""
+    panel = synthetic_universe(4, 2).copy()
+    close = panel['Close'].columns
+    panel.loc[panel.index[300], ('Close', close[1])] = np.nan
+    panel.loc[panel.index[250:255], ('Close', close[2])] = np.nan
+    panel.loc[panel.index[:100], ('Close', close[3])] = np.nan
+    return panel
+
+
+def test_engine_matches_per_ticker_indicators(panel):
+    indicators = IndicatorEngine().compute_panel(panel)
+    scanner = StockScanner(provider=SyntheticProvider())
+    for j, symbol in enumerate(panel_symbols(panel)):
+        expected = scanner.calculate_technical_indicators(panel_to_frame(panel, symbol))
+        valid = indicators['valid'][:, j]
+        assert list(panel.index[valid]) == list(expected.index)
+        for name in INDICATORS:
+            np.testing.assert_allclose(indicators[name][valid, j], expected[name].to_numpy(),
+                                       rtol=1e-9, atol=1e-9, err_msg=f"{symbol} {name}")
+
+
+def test_missing_bars_stay_blank(panel):
+    indicators = IndicatorEngine().compute_panel(panel)
+    missing = ~np.isfinite(panel['Close'].to_numpy())
+    assert not indicators['valid'][missing].any()
+    assert np.isnan(indicators['SMA_20'][missing]).all()
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from benchmarks.stub_server import StubServer
+from strategies.data_provider import AsyncHTTPProvider, SyntheticProvider
+from strategies.market_data_client import MarketDataClient, parse_chart
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 7, 1)
+SYMBOLS = [f"T{i:02d}" for i in range(30)] + ['ZZZ']
+
+
+def test_parse_chart_stamps_bars_at_midnight_like_the_other_providers():
+    with StubServer() as server:
+        data = parse_chart(server.chart('AAPL', pd.Timestamp(START), pd.Timestamp(END)))
+    expected = SyntheticProvider().get_symbol_history('AAPL', START, END)
+    assert data.index.name == 'Date'
+    assert (data.index == data.index.normalize()).all()
+    assert data.index.equals(expected.index)
+
+
+def test_provider_survives_errors_and_throttling_within_its_connection_pool():
+    with StubServer(error_rate=0.1, rate_limit=20, missing=['ZZZ']) as server:
+        client = MarketDataClient(base_url=server.url, max_concurrency=4, rate=100, max_retries=8,
+                                  backoff=0.05, max_backoff=0.5)
+        provider = AsyncHTTPProvider(client)
+        try:
+            panel = provider.get_history(SYMBOLS, START, END)
+        finally:
+            client.close()
+        connections = server.counters['connections']
+
+    fetched = [symbol for symbol in SYMBOLS if panel['Close'][symbol].notna().any()]
+    assert fetched == SYMBOLS[:-1]
+    assert provider.failures == {'ZZZ': 'not_found'}
+    assert connections <= client.max_concurrency
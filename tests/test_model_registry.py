@@ -0,0 +1,39 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+pytest.importorskip('joblib')
+
+from strategies.model_registry import INDEX_FILE, ModelRegistry
+
+
+def _put_models(registry: ModelRegistry, worker: int, n: int):
+    for i in range(n):
+        registry.put(f"w{worker}-{i}", {'worker': worker, 'i': i})
+
+
+def test_reads_are_persisted_for_lru_eviction_in_later_processes(tmp_path):
+    registry = ModelRegistry(str(tmp_path), max_models=2)
+    registry.put('old', 'model-a')
+    registry.put('new', 'model-b')
+    assert registry.get('old') == 'model-a'
+    registry.flush()
+
+    # A fresh process evicts the model that was only written, not the one read since
+    ModelRegistry(str(tmp_path), max_models=2).put('newest', 'model-c')
+    index = json.loads((tmp_path / INDEX_FILE).read_text())
+    assert sorted(index) == ['newest', 'old']
+    assert not os.path.exists(registry.path('new'))
+
+
+def test_concurrent_puts_from_worker_processes_keep_every_entry(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_put_models, [registry] * 4, range(4), [10] * 4))
+
+    index = json.loads((tmp_path / INDEX_FILE).read_text())
+    assert len(index) == 40
+    assert all(os.path.exists(registry.path(key)) for key in index)
+    assert ModelRegistry(str(tmp_path)).get('w3-9') == {'worker': 3, 'i': 9}
@@ -0,0 +1,7 @@
+from main import STARTUP_BUDGET, measure_startup
+
+
+def test_importing_main_stays_within_budget_and_loads_no_heavy_modules():
+    startup = measure_startup(runs=5)
+    assert startup['heavy_modules'] == []
+    assert startup['import_time'] <= STARTUP_BUDGET
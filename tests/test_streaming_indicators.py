@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fixtures import synthetic_frame
+from strategies.data_provider import SyntheticProvider
+from strategies.moving_average_crossover import MovingAverageCrossover
+from strategies.stock_scanner import StockScanner
+from strategies.streaming_indicators import (ADX, ATR, EMA, MACD, RSI, RollingMean, RollingStd,
+                                             StreamingIndicator, Volatility)
+from strategies.trend_following import TrendFollowing
+
+WARMUP = 300  # Bars replayed by from_history; the rest arrive one update at a time
+
+
+@pytest.fixture(scope='module')
+def bars() -> pd.DataFrame:
+    return synthetic_frame(3)
+
+
+@pytest.fixture(scope='module')
+def scanner_indicators(bars) -> pd.DataFrame:
+    return StockScanner(provider=SyntheticProvider()).calculate_technical_indicators(bars)
+
+
+@pytest.fixture(scope='module')
+def trend_following(bars) -> TrendFollowing:
+    strategy = TrendFollowing(synthetic_frame(3, lower=True))
+    strategy.calculate_atr()
+    strategy.calculate_adx()
+    return strategy
+
+
+def streamed(cls, bars: pd.DataFrame, **kwargs) -> pd.Series:
+    """Indicator values after every bar: warm-started on the first WARMUP bars, then updated"""
+    indicator = cls.from_history(bars.iloc[:WARMUP], **kwargs)
+    values = [np.nan] * (WARMUP - 1) + [indicator.value]
+    for _, bar in bars.iloc[WARMUP:].iterrows():
+        values.append(indicator.update(bar))
+    return pd.Series(values, index=bars.index)
+
+
+def assert_matches(actual: pd.Series, expected: pd.Series):
+    expected = expected.reindex(actual.index).iloc[WARMUP - 1:]
+    actual = actual.iloc[WARMUP - 1:]
+    assert expected.notna().all()
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-7, atol=1e-9)
+
+
+def test_streaming_indicator_is_abstract():
+    with pytest.raises(TypeError):
+        StreamingIndicator()
+
+
+@pytest.mark.parametrize('window', [20, 50, 200])
+def test_rolling_mean_matches_scanner_sma(bars, scanner_indicators, window):
+    assert_matches(streamed(RollingMean, bars, window=window), scanner_indicators[f'SMA_{window}'])
+
+
+def test_rolling_std_matches_pandas(bars):
+    assert_matches(streamed(RollingStd, bars, window=20), bars['Close'].rolling(20).std())
+
+
+def test_ema_matches_pandas(bars):
+    assert_matches(streamed(EMA, bars, span=12), bars['Close'].ewm(span=12).mean())
+
+
+def test_macd_matches_scanner(bars, scanner_indicators):
+    assert_matches(streamed(MACD, bars), scanner_indicators['MACD'])
+
+
+def test_rsi_matches_scanner_and_moving_average_crossover(bars, scanner_indicators):
+    rsi = streamed(RSI, bars)
+    assert_matches(rsi, scanner_indicators['RSI'])
+    crossover = MovingAverageCrossover(synthetic_frame(3, lower=True))
+    assert_matches(rsi, crossover.calculate_rsi(crossover.data['close']))
+
+
+def test_volatility_matches_scanner(bars, scanner_indicators):
+    assert_matches(streamed(Volatility, bars), scanner_indicators['Volatility'])
+
+
+def test_atr_and_adx_match_trend_following(bars, trend_following):
+    assert_matches(streamed(ATR, bars), trend_following.data['atr'])
+    assert_matches(streamed(ADX, bars), trend_following.data['adx'])